@@ -0,0 +1,54 @@
+"""Benchmark: broadcast to a large team, per-recipient sends vs messaging.broadcast.
+
+    python benchmarks/bench_broadcast.py --members 50 --rounds 20
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from opencode_teams import messaging
+
+TEAM = "bench"
+
+
+def loop_send(base: Path, names: list[str]) -> None:
+    """The pre-broadcast send_message(type="broadcast") body."""
+    for name in names:
+        messaging.send_plain_message(TEAM, "team-lead", name, "status update", summary="bench", base_dir=base)
+
+
+def batched(base: Path, names: list[str]) -> None:
+    messaging.broadcast(TEAM, "team-lead", names, "status update", summary="bench", base_dir=base)
+
+
+def measure(fn, members: int, rounds: int) -> list[float]:
+    base = Path(tempfile.mkdtemp(prefix="bench_bcast_"))
+    names = [f"agent-{i}" for i in range(members)]
+    for n in names:
+        messaging.ensure_inbox(TEAM, n, base)
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn(base, names)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--members", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"broadcast to {args.members} members, {args.rounds} rounds")
+    for label, fn in (("per-recipient", loop_send), ("broadcast", batched)):
+        samples = measure(fn, args.members, args.rounds)
+        print(f"{label:<14} median {statistics.median(samples) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
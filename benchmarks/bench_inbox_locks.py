@@ -0,0 +1,55 @@
+"""Benchmark: concurrent sends to distinct recipients, shared vs per-inbox lock.
+
+Each worker process sends --messages messages to its own recipient. The
+"shared" mode reinstates the old single ``inboxes/.lock`` for comparison.
+
+    python benchmarks/bench_inbox_locks.py --workers 8 --messages 200
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from opencode_teams import messaging
+
+TEAM = "bench"
+
+
+def _worker(args: tuple[str, str, int, str]) -> None:
+    mode, base, count, agent = args
+    if mode == "shared":
+        messaging._inbox_lock_path = lambda path: path.parent / ".lock"
+    base_dir = Path(base)
+    for i in range(count):
+        messaging.send_plain_message(TEAM, "lead", agent, f"msg {i}", summary="bench", base_dir=base_dir)
+        if i % 10 == 0:
+            messaging.read_inbox(TEAM, agent, unread_only=True, base_dir=base_dir)
+
+
+def run(mode: str, workers: int, count: int) -> float:
+    base = tempfile.mkdtemp(prefix="bench_locks_")
+    jobs = [(mode, base, count, f"agent-{i}") for i in range(workers)]
+    with multiprocessing.Pool(workers) as pool:
+        start = time.perf_counter()
+        pool.map(_worker, jobs)
+        elapsed = time.perf_counter() - start
+    return workers * count / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--messages", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers x {args.messages} messages, distinct recipients")
+    for mode in ("shared", "per-inbox"):
+        rate = run(mode, args.workers, args.messages)
+        print(f"{mode:<10} {rate:>10.0f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark: tool-layer inbox read cost, model round trip vs raw dicts.
+
+Builds a --messages inbox and times what the ``read_inbox`` tool does per
+call: the old path validates every line into ``InboxMessage`` and dumps it
+back to an alias dict, the raw path returns the stored dicts. Reads are
+non-consuming so every iteration sees the full inbox. "warm" reuses the
+in-process parse cache, "cold" disables it so each read re-parses the file.
+
+    python benchmarks/bench_inbox_read.py --messages 5000 --iterations 20
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from opencode_teams import messaging
+
+TEAM = "bench"
+AGENT = "reader"
+
+
+def _fill(base_dir: Path, count: int) -> None:
+    path = messaging.inbox_path(TEAM, AGENT, base_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    msg = messaging.InboxMessage(
+        from_="lead", text="x" * 200, timestamp=messaging.now_iso(), summary="bench"
+    )
+    _entry, line = messaging._serialize(msg)
+    path.write_bytes(line * count)
+
+
+def _model_path(base_dir: Path) -> list[dict]:
+    page, _ = messaging.query_inbox(TEAM, AGENT, mark_as_read=False, base_dir=base_dir)
+    return [m.model_dump(by_alias=True, exclude_none=True) for _seq, m in page]
+
+
+def _raw_path(base_dir: Path) -> list[dict]:
+    page, _ = messaging.query_inbox_raw(TEAM, AGENT, mark_as_read=False, base_dir=base_dir)
+    return [entry for _seq, entry in page]
+
+
+def run(fn, base_dir: Path, iterations: int) -> float:
+    fn(base_dir)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(base_dir)
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    base_dir = Path(tempfile.mkdtemp(prefix="bench_read_"))
+    _fill(base_dir, args.messages)
+
+    print(f"{args.messages} messages, {args.iterations} iterations")
+    print(f"{'cache':<6} {'path':<6} {'ms/read':>10}")
+    for cache in ("warm", "cold"):
+        messaging.INBOX_CACHE_SIZE = 64 if cache == "warm" else 0
+        messaging._inbox_cache.clear()
+        for name, fn in (("model", _model_path), ("raw", _raw_path)):
+            elapsed = run(fn, base_dir, args.iterations)
+            print(f"{cache:<6} {name:<6} {elapsed * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Benchmark: poll_inbox wake latency and idle CPU with N concurrent pollers.
+
+Compares the original 500 ms sleep-and-reparse loop against the
+InboxWatcher-driven wait (inotify where available, stat polling otherwise).
+
+    python benchmarks/bench_poll_inbox.py --pollers 20 --rounds 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from opencode_teams import messaging
+from opencode_teams.inbox_watch import InboxWatcher
+
+TEAM = "bench"
+
+
+async def sleep_loop_poll(agent: str, base: Path, timeout: float) -> float | None:
+    """The pre-watcher poll_inbox body: re-read every 0.5 s."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if messaging.read_inbox(TEAM, agent, unread_only=True, mark_as_read=True, base_dir=base):
+            return time.monotonic()
+        await asyncio.sleep(0.5)
+    return None
+
+
+async def watcher_poll(
+    watcher: InboxWatcher, agent: str, base: Path, timeout: float
+) -> float | None:
+    path = messaging.inbox_path(TEAM, agent, base)
+    deadline = time.monotonic() + timeout
+    while True:
+        ticket = watcher.subscribe(path)
+        try:
+            if messaging.read_inbox(TEAM, agent, unread_only=True, mark_as_read=True, base_dir=base):
+                return time.monotonic()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            await watcher.wait(ticket, remaining)
+        finally:
+            watcher.unsubscribe(path, ticket)
+
+
+async def run(mode: str, pollers: int, rounds: int, idle: float) -> dict:
+    base = Path(tempfile.mkdtemp(prefix="bench_poll_"))
+    agents = [f"agent-{i}" for i in range(pollers)]
+    for a in agents:
+        messaging.ensure_inbox(TEAM, a, base)
+    watcher = InboxWatcher(use_inotify=(mode == "inotify"))
+
+    def start(agent: str, timeout: float):
+        if mode == "sleep":
+            return asyncio.create_task(sleep_loop_poll(agent, base, timeout))
+        return asyncio.create_task(watcher_poll(watcher, agent, base, timeout))
+
+    # Idle CPU: every poller waits with nothing arriving.
+    cpu0 = time.process_time()
+    idle_tasks = [start(a, idle) for a in agents]
+    await asyncio.gather(*idle_tasks)
+    idle_cpu = (time.process_time() - cpu0) / idle
+
+    # Wake latency: all pollers wait, then each inbox receives one message.
+    latencies: list[float] = []
+    for _ in range(rounds):
+        tasks = [start(a, 10.0) for a in agents]
+        await asyncio.sleep(0.05)
+        sent: dict[int, float] = {}
+
+        def send_all() -> None:
+            # Sent from another thread, like a sender in another process.
+            for i, a in enumerate(agents):
+                sent[i] = time.monotonic()
+                messaging.send_plain_message(TEAM, "lead", a, "ping", summary="bench", base_dir=base)
+                time.sleep(0.005)
+
+        await asyncio.to_thread(send_all)
+        woke = await asyncio.gather(*tasks)
+        latencies.extend(w - sent[i] for i, w in enumerate(woke) if w is not None)
+    backend = watcher.backend
+    watcher.close()
+    return {
+        "mode": f"{mode} ({backend})" if mode != "sleep" else "sleep-0.5s",
+        "median_ms": statistics.median(latencies) * 1000,
+        "p95_ms": statistics.quantiles(latencies, n=20)[-1] * 1000,
+        "idle_cpu_pct": idle_cpu * 100,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pollers", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--idle", type=float, default=2.0, help="idle window in seconds")
+    args = parser.parse_args()
+
+    print(f"{args.pollers} concurrent pollers, {args.rounds} rounds")
+    print(f"{'mode':<20} {'median wake':>12} {'p95 wake':>10} {'idle CPU':>9}")
+    for mode in ("sleep", "stat", "inotify"):
+        r = asyncio.run(run(mode, args.pollers, args.rounds, args.idle))
+        print(
+            f"{r['mode']:<20} {r['median_ms']:>10.2f}ms {r['p95_ms']:>8.2f}ms "
+            f"{r['idle_cpu_pct']:>8.2f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
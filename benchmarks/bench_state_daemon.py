@@ -0,0 +1,97 @@
+"""Benchmark: N agent processes draining one board, per storage engine.
+
+Each worker process claims and completes tasks until none are left, the
+way spawned teammates' servers do. "remote" runs the same loop against a
+state daemon started for the run, so only the daemon touches the state.
+
+    python benchmarks/bench_state_daemon.py --workers 8 --tasks 400
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from opencode_teams.models import TaskSpec
+from opencode_teams.sqlite.db import DB_ENV, STORAGE_ENV
+from opencode_teams.state_daemon import SOCKET_ENV
+
+TEAM = "bench"
+ENGINES = ["json", "sqlite", "remote"]
+
+
+def _modules():
+    from opencode_teams.storage import tasks, teams
+
+    return teams, tasks
+
+
+def _worker(args: tuple[str, str]) -> int:
+    name, base = args
+    _, tasks = _modules()
+    base_dir = Path(base)
+    done = 0
+    while (task := tasks.claim_next_task(TEAM, name, base_dir=base_dir)) is not None:
+        tasks.update_task(TEAM, task.id, status="completed", base_dir=base_dir)
+        done += 1
+    return done
+
+
+def _wait_for(path: Path, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not path.exists():
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"state daemon did not start at {path}")
+        time.sleep(0.05)
+
+
+def run(engine: str, workers: int, count: int) -> float:
+    base_dir = Path(tempfile.mkdtemp(prefix=f"bench_daemon_{engine}_"))
+    (base_dir / "teams").mkdir()
+    (base_dir / "tasks").mkdir()
+    os.environ[STORAGE_ENV] = engine
+    os.environ[DB_ENV] = str(base_dir / "state.db")
+    os.environ[SOCKET_ENV] = str(base_dir / "state.sock")
+    daemon = None
+    if engine == "remote":
+        daemon = subprocess.Popen(
+            [sys.executable, "-m", "opencode_teams.state_daemon"], stdout=subprocess.DEVNULL
+        )
+        _wait_for(base_dir / "state.sock")
+    try:
+        teams, tasks = _modules()
+        teams.create_team(TEAM, "sess", base_dir=base_dir)
+        tasks.create_tasks(TEAM, [TaskSpec(subject=f"task {i}") for i in range(count)],
+                           base_dir=base_dir)
+        jobs = [(f"w{i}", str(base_dir)) for i in range(workers)]
+        with multiprocessing.Pool(workers) as pool:
+            start = time.perf_counter()
+            done = sum(pool.map(_worker, jobs))
+            elapsed = time.perf_counter() - start
+        assert done == count, (engine, done)
+    finally:
+        if daemon is not None:
+            daemon.terminate()
+            daemon.wait()
+    return count / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--tasks", type=int, default=400)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} " + " ".join(f"{e + ' tasks/s':>16}" for e in ENGINES))
+    for workers in args.workers:
+        rates = [run(engine, workers, args.tasks) for engine in ENGINES]
+        print(f"{workers:>8} " + " ".join(f"{r:>16.0f}" for r in rates))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark: the JSON-file, SQLite and in-memory engines on the same workload.
+
+For each board size the benchmark creates N tasks, then times the calls
+the server makes most: claiming the next ready task, completing it, a
+filtered page of task_list, and an append + unread read of one inbox.
+
+    python benchmarks/bench_storage_engines.py --sizes 100 1000 5000
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import tempfile
+import time
+from pathlib import Path
+
+from opencode_teams.models import InboxMessage, TaskSpec
+from opencode_teams.sqlite.db import MemoryDatabase, close_all, use_memory
+
+TEAM = "bench"
+ENGINES = {
+    "json": "opencode_teams.{}",
+    "sqlite": "opencode_teams.sqlite.{}",
+    "memory": "opencode_teams.sqlite.{}",
+}
+
+
+def _modules(engine: str):
+    return [importlib.import_module(ENGINES[engine].format(m))
+            for m in ("teams", "tasks", "messaging")]
+
+
+def _timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(engine: str, size: int, repeat: int) -> dict[str, float]:
+    if engine != "memory":
+        return _run(engine, size, repeat)
+    memory = MemoryDatabase()
+    try:
+        with use_memory(memory):
+            return _run(engine, size, repeat)
+    finally:
+        memory.close()
+
+
+def _run(engine: str, size: int, repeat: int) -> dict[str, float]:
+    teams, tasks, messaging = _modules(engine)
+    base_dir = Path(tempfile.mkdtemp(prefix=f"bench_{engine}_"))
+    (base_dir / "teams").mkdir()
+    (base_dir / "tasks").mkdir()
+    teams.create_team(TEAM, "sess", base_dir=base_dir)
+    specs = [TaskSpec(subject=f"task {i}", description="x" * 200) for i in range(size)]
+    results = {"create": _timed(lambda: tasks.create_tasks(TEAM, specs, base_dir=base_dir), 1)}
+
+    def claim_and_complete() -> None:
+        task = tasks.claim_next_task(TEAM, "w", base_dir=base_dir)
+        tasks.update_task(TEAM, task.id, status="completed", base_dir=base_dir)
+
+    results["claim+complete"] = _timed(claim_and_complete, repeat)
+    results["list page"] = _timed(
+        lambda: tasks.query_tasks(TEAM, status="pending", limit=50, base_dir=base_dir), repeat
+    )
+    msg = InboxMessage(from_="lead", text="hello", timestamp=messaging.now_iso(), read=False)
+
+    def message_round_trip() -> None:
+        messaging.append_message(TEAM, "w", msg, base_dir=base_dir)
+        messaging.read_inbox(TEAM, "w", unread_only=True, base_dir=base_dir)
+
+    results["message"] = _timed(message_round_trip, repeat)
+    close_all()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    ops = ["create", "claim+complete", "list page", "message"]
+    print(f"{'tasks':>7} {'engine':>7} " + " ".join(f"{op + ' ms':>18}" for op in ops))
+    for size in args.sizes:
+        for engine in ENGINES:
+            r = run(engine, size, args.repeat)
+            print(f"{size:>7} {engine:>7} " + " ".join(f"{r[op]:>18.2f}" for op in ops))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark: task reads with and without the in-process task cache.
+
+Builds a board of --size tasks and times list_tasks and get_task. "cold"
+clears the cache before every call, which is what every read cost before
+the cache existed; "warm" leaves it in place, so calls only check the
+team's index.version. "churn" interleaves an update_task before each
+list_tasks to show that the writer keeps the cache current.
+
+    python benchmarks/bench_task_cache.py --size 2000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from opencode_teams import tasks, teams
+from opencode_teams.models import TaskSpec
+
+TEAM = "bench"
+
+
+def _time(fn, iterations: int, cold: bool) -> float:
+    total = 0.0
+    for i in range(iterations):
+        if cold:
+            tasks._task_cache.clear()
+        start = time.perf_counter()
+        fn(i)
+        total += time.perf_counter() - start
+    return total / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    base_dir = Path(tempfile.mkdtemp(prefix="bench_cache_"))
+    teams.create_team(TEAM, "sess", base_dir=base_dir)
+    specs = [TaskSpec(subject=f"task {i}", description="x" * 500) for i in range(args.size)]
+    tasks.create_tasks(TEAM, specs, base_dir=base_dir)
+
+    def list_all(_i: int) -> None:
+        tasks.list_tasks(TEAM, base_dir=base_dir)
+
+    def get_one(i: int) -> None:
+        tasks.get_task(TEAM, str(i % args.size + 1), base_dir=base_dir)
+
+    def churn(i: int) -> None:
+        tasks.update_task(TEAM, str(i % args.size + 1), owner=f"w{i}", base_dir=base_dir)
+        tasks.list_tasks(TEAM, base_dir=base_dir)
+
+    print(f"{args.size} tasks, {args.iterations} iterations")
+    print(f"{'call':<10} {'cold ms':>10} {'warm ms':>10}")
+    for name, fn in (("list", list_all), ("get", get_one), ("churn", churn)):
+        list_all(0)
+        cold = _time(fn, args.iterations, cold=True)
+        list_all(0)
+        warm = _time(fn, args.iterations, cold=False)
+        print(f"{name:<10} {cold * 1000:>10.2f} {warm * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
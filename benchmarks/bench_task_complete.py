@@ -0,0 +1,89 @@
+"""Benchmark: completing tasks on large boards, directory scan vs task index.
+
+Each board has N tasks where every even task is blocked by the odd task
+before it. The benchmark completes --completions odd tasks. "scan" mirrors
+the old update_task behaviour of parsing every task file to strip the
+completed id; "index" is the current update_task, which only opens the
+dependents recorded in index.json.
+
+    python benchmarks/bench_task_complete.py --sizes 100 1000 10000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from opencode_teams import tasks, teams
+from opencode_teams._filelock import file_lock
+from opencode_teams.models import TaskFile
+from opencode_teams.task_index import load_index
+
+TEAM = "bench"
+
+
+def _board(size: int) -> tuple[Path, Path]:
+    base_dir = Path(tempfile.mkdtemp(prefix="bench_tasks_"))
+    teams.create_team(TEAM, "sess", base_dir=base_dir)
+    team_dir = base_dir / "tasks" / TEAM
+    for i in range(1, size + 1):
+        task = TaskFile(id=str(i), subject=f"task {i}", description="x" * 200)
+        if i % 2 == 0:
+            task.blocked_by = [str(i - 1)]
+        else:
+            task.blocks = [str(i + 1)] if i < size else []
+        (team_dir / f"{i}.json").write_text(
+            json.dumps(task.model_dump(by_alias=True, exclude_none=True))
+        )
+    with file_lock(team_dir / ".lock"):
+        load_index(team_dir)
+    return base_dir, team_dir
+
+
+def _scan_complete(team_dir: Path, task_id: str) -> None:
+    with file_lock(team_dir / ".lock"):
+        fpath = team_dir / f"{task_id}.json"
+        task = TaskFile(**json.loads(fpath.read_text()))
+        task.status = "completed"
+        writes: dict[Path, TaskFile] = {}
+        for f in team_dir.glob("*.json"):
+            if not f.stem.isdigit() or f.stem == task_id:
+                continue
+            other = TaskFile(**json.loads(f.read_text()))
+            if task_id in other.blocked_by:
+                other.blocked_by.remove(task_id)
+                writes[f] = other
+        fpath.write_text(json.dumps(task.model_dump(by_alias=True, exclude_none=True)))
+        for f, other in writes.items():
+            f.write_text(json.dumps(other.model_dump(by_alias=True, exclude_none=True)))
+
+
+def run(mode: str, size: int, completions: int) -> float:
+    base_dir, team_dir = _board(size)
+    ids = [str(i) for i in range(1, min(size, 2 * completions), 2)]
+    start = time.perf_counter()
+    for task_id in ids:
+        if mode == "scan":
+            _scan_complete(team_dir, task_id)
+        else:
+            tasks.update_task(TEAM, task_id, status="completed", base_dir=base_dir)
+    return (time.perf_counter() - start) / len(ids)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--completions", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'tasks':>7} {'scan ms':>10} {'index ms':>10}")
+    for size in args.sizes:
+        scan = run("scan", size, args.completions)
+        indexed = run("index", size, args.completions)
+        print(f"{size:>7} {scan * 1000:>10.2f} {indexed * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
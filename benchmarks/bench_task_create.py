@@ -0,0 +1,47 @@
+"""Benchmark: bulk task creation throughput as the board grows.
+
+Creates --sizes tasks one create_task call at a time and reports the total
+time and the per-task cost of the last tenth, which stays flat when
+creation is O(1) in the number of existing tasks.
+
+    python benchmarks/bench_task_create.py --sizes 500 1000 2000 4000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from opencode_teams import tasks, teams
+
+TEAM = "bench"
+
+
+def run(size: int) -> tuple[float, float]:
+    base_dir = Path(tempfile.mkdtemp(prefix="bench_create_"))
+    teams.create_team(TEAM, "sess", base_dir=base_dir)
+    tail = max(1, size // 10)
+    start = time.perf_counter()
+    for i in range(size - tail):
+        tasks.create_task(TEAM, f"task {i}", "desc", base_dir=base_dir)
+    tail_start = time.perf_counter()
+    for i in range(tail):
+        tasks.create_task(TEAM, f"task {i}", "desc", base_dir=base_dir)
+    end = time.perf_counter()
+    return end - start, (end - tail_start) / tail
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000, 4000])
+    args = parser.parse_args()
+
+    print(f"{'tasks':>7} {'total s':>9} {'last-10% ms/task':>18}")
+    for size in args.sizes:
+        total, per_task = run(size)
+        print(f"{size:>7} {total:>9.2f} {per_task * 1000:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark: dependency cycle checks on a long task chain.
+
+Builds a chain of --size tasks (task i blocked by task i-1) and times three
+edge insertions through update_task:
+
+  append   a new task blocked by the tail (agrees with the order)
+  cycle    the head blocked by the tail (rejected; worst case)
+  shortcut a late task blocked by an early one (agrees with the order)
+
+"disk" times only the old breadth-first search that parsed a task file per
+visited node; "index" times the whole update_task call, including its
+in-memory incremental check and the writes.
+
+    python benchmarks/bench_task_cycles.py --size 5000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from collections import deque
+from pathlib import Path
+
+from opencode_teams import tasks, teams
+from opencode_teams.models import TaskFile, TaskSpec
+
+TEAM = "bench"
+
+
+def _disk_would_create_cycle(team_dir: Path, from_id: str, to_id: str) -> bool:
+    visited: set[str] = set()
+    queue = deque([to_id])
+    while queue:
+        current = queue.popleft()
+        if current == from_id:
+            return True
+        if current in visited:
+            continue
+        visited.add(current)
+        fpath = team_dir / f"{current}.json"
+        if fpath.exists():
+            task = TaskFile(**json.loads(fpath.read_text()))
+            queue.extend(d for d in task.blocked_by if d not in visited)
+    return False
+
+
+def _time(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=5000)
+    args = parser.parse_args()
+
+    base_dir = Path(tempfile.mkdtemp(prefix="bench_cycles_"))
+    teams.create_team(TEAM, "sess", base_dir=base_dir)
+    team_dir = base_dir / "tasks" / TEAM
+    specs = [
+        TaskSpec(ref=str(i), subject=f"step {i}", blocked_by=[str(i - 1)] if i else [])
+        for i in range(args.size)
+    ]
+    tasks.create_tasks(TEAM, specs, base_dir=base_dir)
+    extra = tasks.create_task(TEAM, "extra", "d", base_dir=base_dir).id
+    head, tail, late = "1", str(args.size), str(args.size - 10)
+
+    def update(task_id: str, blocker: str) -> None:
+        try:
+            tasks.update_task(TEAM, task_id, add_blocked_by=[blocker], base_dir=base_dir)
+        except ValueError:
+            pass
+
+    # Warm the in-process index (first use builds the order).
+    update(extra, tail)
+    cases = [
+        ("append", extra, str(args.size - 1)),
+        ("cycle", head, tail),
+        ("shortcut", late, "2"),
+    ]
+    print(f"chain of {args.size} tasks, ms per edge insertion")
+    print(f"{'case':<9} {'disk':>10} {'index':>10}")
+    for name, task_id, blocker in cases:
+        disk = _time(lambda: _disk_would_create_cycle(team_dir, task_id, blocker))
+        indexed = _time(lambda: update(task_id, blocker))
+        print(f"{name:<9} {disk:>10.2f} {indexed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark: task_list cost on large boards, full listing vs projected page.
+
+Builds a board of --size tasks with 500-byte descriptions and times three
+listings: "full" is the unfiltered list_tasks that parses every task file,
+"projected" asks query_tasks for id/subject/status/owner of every task, and
+"page" does the same with --limit. Response size is the JSON payload length.
+
+    python benchmarks/bench_task_list.py --size 2000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from opencode_teams import tasks, teams
+from opencode_teams.models import TaskSpec
+
+TEAM = "bench"
+FIELDS = ["id", "subject", "status", "owner"]
+
+
+def _time(fn, iterations: int) -> tuple[float, object]:
+    result = fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    base_dir = Path(tempfile.mkdtemp(prefix="bench_list_"))
+    teams.create_team(TEAM, "sess", base_dir=base_dir)
+    specs = [
+        TaskSpec(subject=f"task {i}", description="x" * 500, metadata={"n": i})
+        for i in range(args.size)
+    ]
+    tasks.create_tasks(TEAM, specs, base_dir=base_dir)
+
+    def full():
+        return [t.model_dump(by_alias=True, exclude_none=True)
+                for t in tasks.list_tasks(TEAM, base_dir=base_dir)]
+
+    def projected():
+        return tasks.query_tasks(TEAM, fields=FIELDS, base_dir=base_dir)[0]
+
+    def page():
+        return tasks.query_tasks(TEAM, fields=FIELDS, limit=args.limit, base_dir=base_dir)[0]
+
+    print(f"{args.size} tasks, {args.iterations} iterations")
+    print(f"{'listing':<10} {'ms/call':>10} {'bytes':>10}")
+    for name, fn in (("full", full), ("projected", projected), ("page", page)):
+        elapsed, result = _time(fn, args.iterations)
+        size = len(json.dumps(result))
+        print(f"{name:<10} {elapsed * 1000:>10.2f} {size:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark: releasing a departing agent's tasks, directory scan vs owner index.
+
+Each board has N tasks spread over --agents owners. The benchmark releases
+one agent's claims, as force_kill_teammate and process_shutdown_approved
+do. "scan" mirrors the old reset_owner_tasks, which parsed every task file
+to find the agent's; "index" is the current reset_owner_tasks, which reads
+only the tasks the index lists under that owner.
+
+    python benchmarks/bench_task_reset_owner.py --sizes 100 1000 10000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from opencode_teams import tasks, teams
+from opencode_teams._filelock import file_lock
+from opencode_teams.models import TaskFile
+from opencode_teams.task_index import load_index, task_files
+
+TEAM = "bench"
+
+
+def _board(size: int, agents: int) -> tuple[Path, Path]:
+    base_dir = Path(tempfile.mkdtemp(prefix="bench_tasks_"))
+    teams.create_team(TEAM, "sess", base_dir=base_dir)
+    team_dir = base_dir / "tasks" / TEAM
+    for i in range(1, size + 1):
+        task = TaskFile(
+            id=str(i),
+            subject=f"task {i}",
+            description="x" * 200,
+            status="in_progress",
+            owner=f"w{i % agents}",
+        )
+        (team_dir / f"{i}.json").write_text(
+            json.dumps(task.model_dump(by_alias=True, exclude_none=True))
+        )
+    with file_lock(team_dir / ".lock"):
+        load_index(team_dir)
+    return base_dir, team_dir
+
+
+def _scan_reset(team_dir: Path, agent: str) -> None:
+    with file_lock(team_dir / ".lock"):
+        for f in task_files(team_dir):
+            task = TaskFile(**json.loads(f.read_text()))
+            if task.owner == agent:
+                task.status = "pending"
+                task.owner = None
+                f.write_text(json.dumps(task.model_dump(by_alias=True, exclude_none=True)))
+
+
+def run(mode: str, size: int, agents: int) -> float:
+    base_dir, team_dir = _board(size, agents)
+    start = time.perf_counter()
+    for n in range(agents):
+        if mode == "scan":
+            _scan_reset(team_dir, f"w{n}")
+        else:
+            tasks.reset_owner_tasks(TEAM, f"w{n}", base_dir=base_dir)
+    return (time.perf_counter() - start) / agents
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--agents", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'tasks':>7} {'scan ms':>10} {'index ms':>10}")
+    for size in args.sizes:
+        scan = run("scan", size, args.agents)
+        indexed = run("index", size, args.agents)
+        print(f"{size:>7} {scan * 1000:>10.2f} {indexed * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Benchmark: latency of task/inbox tools while slow subprocess tools run.
+
+Drives the server in-process with a mix of concurrent calls: --slow
+callers repeatedly run check_agent_health, whose ``tmux capture-pane``
+is replaced by a --slow-ms sleep, while --fast callers loop over
+task_create, claim_next_task, task_list and read_inbox. Reports
+percentiles of the fast calls.
+
+"shared" runs every tool body on anyio's default thread pool (how the
+synchronous tools ran before); "split" uses the server's per-category
+pools, where subprocess work cannot take the threads disk work needs.
+
+    python benchmarks/bench_tool_latency.py --slow 60 --fast 8 --seconds 5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import statistics
+import tempfile
+import time
+import unittest.mock
+from pathlib import Path
+
+import anyio.to_thread
+from fastmcp import Client
+
+from opencode_teams import messaging, tasks, teams
+from opencode_teams.executors import ToolExecutors
+from opencode_teams.models import AgentHealthStatus, TeammateMember
+from opencode_teams.server import mcp
+
+TEAM = "bench"
+
+
+async def _shared_run(self, category, fn, /, *args, **kwargs):
+    return await anyio.to_thread.run_sync(lambda: fn(*args, **kwargs))
+
+
+async def _slow_caller(client: Client, stop: float) -> None:
+    while time.monotonic() < stop:
+        await client.call_tool("check_agent_health", {"team_name": TEAM, "agent_name": "slow"})
+
+
+async def _fast_caller(client: Client, name: str, stop: float, latencies: list[float]) -> None:
+    calls = [
+        ("task_create", {"team_name": TEAM, "subject": name, "description": "d"}),
+        ("claim_next_task", {"team_name": TEAM, "agent_name": name}),
+        ("task_list", {"team_name": TEAM, "status": "pending", "limit": 20}),
+        ("read_inbox", {"team_name": TEAM, "agent_name": name, "unread_only": True}),
+    ]
+    while time.monotonic() < stop:
+        for tool, args in calls:
+            start = time.perf_counter()
+            await client.call_tool(tool, args)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run(mode: str, slow: int, fast: int, seconds: float, slow_ms: float) -> list[float]:
+    base = Path(tempfile.mkdtemp(prefix=f"bench_latency_{mode}_"))
+    latencies: list[float] = []
+
+    def slow_health(member, **kwargs):
+        time.sleep(slow_ms / 1000)
+        return AgentHealthStatus(agent_name=member.name, pane_id="%1", status="alive")
+
+    with (
+        unittest.mock.patch.object(teams, "TEAMS_DIR", base / "teams"),
+        unittest.mock.patch.object(teams, "TASKS_DIR", base / "tasks"),
+        unittest.mock.patch.object(tasks, "TASKS_DIR", base / "tasks"),
+        unittest.mock.patch.object(messaging, "TEAMS_DIR", base / "teams"),
+        unittest.mock.patch("opencode_teams.server.check_single_agent_health", slow_health),
+        unittest.mock.patch(
+            "opencode_teams.server.discover_opencode_binary", lambda: "/usr/bin/echo"
+        ),
+    ):
+        if mode == "shared":
+            pools = unittest.mock.patch.object(ToolExecutors, "run", _shared_run)
+        else:
+            pools = contextlib.nullcontext()
+        with pools:
+            async with Client(mcp) as client:
+                await client.call_tool("team_create", {"team_name": TEAM})
+                teams.add_member(TEAM, TeammateMember(
+                    agent_id=f"slow@{TEAM}", name="slow", agent_type="general-purpose",
+                    model="m", prompt="p", color="blue", joined_at=0,
+                    tmux_pane_id="%1", cwd="/tmp",
+                ))
+                stop = time.monotonic() + seconds
+                await asyncio.gather(
+                    *(_slow_caller(client, stop) for _ in range(slow)),
+                    *(_fast_caller(client, f"w{i}", stop, latencies) for i in range(fast)),
+                )
+    return latencies
+
+
+def _pct(values: list[float], p: float) -> float:
+    return statistics.quantiles(values, n=100)[int(p) - 1] if len(values) > 1 else values[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slow", type=int, default=60)
+    parser.add_argument("--fast", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--slow-ms", type=float, default=500.0)
+    args = parser.parse_args()
+    logging.getLogger("opencode-teams").setLevel(logging.ERROR)  # "No models found"
+
+    print(f"{'mode':>7} {'calls':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for mode in ("shared", "split"):
+        lat = asyncio.run(run(mode, args.slow, args.fast, args.seconds, args.slow_ms))
+        print(
+            f"{mode:>7} {len(lat):>7} {_pct(lat, 50):>9.1f} {_pct(lat, 95):>9.1f} "
+            f"{_pct(lat, 99):>9.1f} {max(lat):>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -100,10 +100,12 @@ def generate_agent_config(
         - `opencode-teams_poll_inbox` — long-poll for new messages
 
         **Task Management:**
-        - `opencode-teams_task_list` — list all tasks for the team
+        - `opencode-teams_task_list` — list tasks (filter by status/owner, project with `fields`)
         - `opencode-teams_task_get` — get details of a specific task
         - `opencode-teams_task_create` — create a new task
         - `opencode-teams_task_update` — update task status or claim a task
+        - `opencode-teams_claim_next_task` — atomically claim the next ready task
+        - `opencode-teams_task_heartbeat` — keep your claimed tasks leased while working
 
         **Lifecycle:**
         - `opencode-teams_check_agent_health` — check health of a single agent
@@ -127,8 +129,8 @@ def generate_agent_config(
         Follow this loop while working:
 
         1. **Check inbox** — call `opencode-teams_read_inbox(team_name="{team_name}", agent_name="{name}")` every 3-5 tool calls. Always check before starting new work.
-        2. **Check tasks** — call `opencode-teams_task_list(team_name="{team_name}")` to find available tasks. Claim one with `opencode-teams_task_update(team_name="{team_name}", task_id="<id>", status="in_progress", owner="{name}")`.
-        3. **Do the work** — use your tools to complete the task.
+        2. **Claim a task** — call `opencode-teams_claim_next_task(team_name="{team_name}", agent_name="{name}")`; it returns the next ready task already set to in_progress and owned by you (or null when nothing is ready). Use `opencode-teams_task_list(team_name="{team_name}", fields=["id", "subject", "status", "owner"])` only when you need an overview.
+        3. **Do the work** — use your tools to complete the task. Your claim is a lease: any `task_update` on the task renews it, and on long stretches without one call `opencode-teams_task_heartbeat(team_name="{team_name}", agent_name="{name}")` every few minutes, or the task is handed to someone else.
         4. **Report progress** — send updates to team-lead via `opencode-teams_send_message(team_name="{team_name}", type="message", recipient="team-lead", content="<update>", summary="<short>", sender="{name}")`.
         5. **Mark done** — call `opencode-teams_task_update(team_name="{team_name}", task_id="<id>", status="completed", owner="{name}")` when finished.""")
     )
@@ -0,0 +1,66 @@
+"""Bounded thread pools for the blocking work behind the MCP tools.
+
+Tool bodies take file locks, read and write state, and shell out to tmux
+and ``opencode``. Running them on the event loop would stall every other
+call (``poll_inbox`` waiters included), and one shared pool lets a burst
+of slow subprocess calls occupy every thread. Each category of work gets
+its own pool instead, so a hung ``tmux capture-pane`` or a 15 s
+``opencode models`` can only delay other subprocess calls.
+
+The server lifespan creates one ``ToolExecutors`` and shuts it down.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+DISK = "disk"
+SUBPROCESS = "subprocess"
+
+# Threads per category. Disk calls are short and mostly wait on locks;
+# subprocess calls can run for seconds, so fewer of them run at once.
+DEFAULT_LIMITS = {DISK: 8, SUBPROCESS: 4}
+
+
+class ToolExecutors:
+    """One bounded thread pool per category of blocking work."""
+
+    def __init__(self, limits: dict[str, int] | None = None) -> None:
+        self.limits = dict(limits or DEFAULT_LIMITS)
+        self._pools = {
+            category: ThreadPoolExecutor(max_workers=n, thread_name_prefix=f"tool-{category}")
+            for category, n in self.limits.items()
+        }
+        self._pending = dict.fromkeys(self.limits, 0)
+
+    async def run(self, category: str, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """Run ``fn(*args, **kwargs)`` on the *category* pool and await it.
+
+        The caller's context variables (the MCP request context among them)
+        are visible to *fn*.
+        """
+        pool = self._pools[category]
+        call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+        self._pending[category] += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, call)
+        finally:
+            self._pending[category] -= 1
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Workers and calls submitted but not finished, per category."""
+        return {
+            category: {"workers": n, "pending": self._pending[category]}
+            for category, n in self.limits.items()
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the pools; calls not yet started are cancelled."""
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait, cancel_futures=True)
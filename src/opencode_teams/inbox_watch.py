@@ -0,0 +1,276 @@
+"""Asyncio-native change notification for inbox files.
+
+Lets ``poll_inbox`` sleep until an inbox is actually written instead of
+re-reading it on a timer. On Linux the watcher uses inotify through ctypes
+(one watch per inbox directory, shared by every waiter in the process);
+elsewhere, or when inotify is unavailable, it falls back to a cheap
+stat(mtime, size) poll that only runs while someone is waiting. With
+``watch_files=False`` it touches no files at all and only ``notify``
+wakes waiters, for engines that report deliveries in-process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+from pathlib import Path
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_IGNORED = 0x00008000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+DEFAULT_POLL_INTERVAL = 0.05
+
+
+class _Inotify:
+    """Minimal ctypes binding for the Linux inotify API."""
+
+    def __init__(self) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._libc = libc
+        self._fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def add_watch(self, directory: Path) -> int:
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(directory), ctypes.c_uint32(_WATCH_MASK)
+        )
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), str(directory))
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        self._libc.inotify_rm_watch(self._fd, wd)
+
+    def read_events(self) -> list[tuple[int, int, str]]:
+        """Drain pending events as ``(wd, mask, name)`` tuples."""
+        events: list[tuple[int, int, str]] = []
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            if not data:
+                return events
+            pos = 0
+            while pos + _EVENT_HEADER.size <= len(data):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, pos)
+                pos += _EVENT_HEADER.size
+                name = data[pos : pos + length].split(b"\0", 1)[0]
+                pos += length
+                events.append((wd, mask, os.fsdecode(name)))
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def _stat_signature(path: Path) -> tuple[int, int, int] | None:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class InboxWatcher:
+    """Wake asyncio waiters when an inbox file changes.
+
+    Usage is subscribe-then-check so a write landing between the check and
+    the wait is never missed::
+
+        ticket = watcher.subscribe(path)
+        try:
+            if not has_messages():
+                await watcher.wait(ticket, timeout)
+        finally:
+            watcher.unsubscribe(path, ticket)
+    """
+
+    def __init__(
+        self,
+        *,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        use_inotify: bool = True,
+        watch_files: bool = True,
+    ) -> None:
+        self._poll_interval = poll_interval
+        self._use_inotify = use_inotify
+        self._watch_files = watch_files
+        self._inotify: _Inotify | None = None
+        self._inotify_failed = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._waiters: dict[Path, set[asyncio.Future]] = {}
+        # inotify bookkeeping: one watch per directory, refcounted by waiters
+        self._dir_wds: dict[Path, int] = {}
+        self._wd_dirs: dict[int, Path] = {}
+        self._dir_refs: dict[Path, int] = {}
+        self._watched: dict[Path, Path] = {}
+        # stat fallback bookkeeping
+        self._polled: dict[Path, tuple[int, int, int] | None] = {}
+        self._poll_task: asyncio.Task | None = None
+
+    @property
+    def backend(self) -> str:
+        if not self._watch_files:
+            return "notify"
+        return "inotify" if self._inotify is not None else "stat"
+
+    def _ensure_inotify(self) -> _Inotify | None:
+        if self._inotify is not None or self._inotify_failed or not self._use_inotify:
+            return self._inotify
+        try:
+            self._inotify = _Inotify()
+        except (OSError, AttributeError):
+            self._inotify_failed = True
+            return None
+        assert self._loop is not None
+        self._loop.add_reader(self._inotify.fileno(), self._on_inotify_readable)
+        return self._inotify
+
+    def _watch_dir(self, path: Path) -> bool:
+        inotify = self._ensure_inotify()
+        if inotify is None:
+            return False
+        directory = path.parent
+        if directory not in self._dir_wds:
+            try:
+                wd = inotify.add_watch(directory)
+            except OSError:
+                return False
+            self._dir_wds[directory] = wd
+            self._wd_dirs[wd] = directory
+            self._dir_refs[directory] = 0
+        self._dir_refs[directory] += 1
+        self._watched[path] = directory
+        return True
+
+    def _unwatch_dir(self, path: Path) -> None:
+        directory = self._watched.pop(path, None)
+        if directory is None:
+            return
+        self._dir_refs[directory] -= 1
+        if self._dir_refs[directory] <= 0:
+            del self._dir_refs[directory]
+            wd = self._dir_wds.pop(directory)
+            self._wd_dirs.pop(wd, None)
+            if self._inotify is not None:
+                self._inotify.rm_watch(wd)
+
+    def subscribe(self, path: Path) -> asyncio.Future:
+        """Register interest in the next change to *path*."""
+        loop = asyncio.get_running_loop()
+        if self._loop is None:
+            self._loop = loop
+        path = Path(path)
+        fut: asyncio.Future = loop.create_future()
+        waiters = self._waiters.get(path)
+        if waiters is None:
+            waiters = self._waiters[path] = set()
+            if self._watch_files and not self._watch_dir(path):
+                self._polled[path] = _stat_signature(path)
+                self._ensure_poll_task()
+        waiters.add(fut)
+        return fut
+
+    def unsubscribe(self, path: Path, fut: asyncio.Future) -> None:
+        path = Path(path)
+        if not fut.done():
+            fut.cancel()
+        waiters = self._waiters.get(path)
+        if waiters is None:
+            return
+        waiters.discard(fut)
+        if not waiters:
+            self._release(path)
+
+    def _release(self, path: Path) -> None:
+        self._waiters.pop(path, None)
+        self._polled.pop(path, None)
+        self._unwatch_dir(path)
+
+    async def wait(self, fut: asyncio.Future, timeout: float) -> bool:
+        """Wait for a subscribed change. Returns False on timeout."""
+        if timeout <= 0:
+            return fut.done()
+        done, _ = await asyncio.wait({fut}, timeout=timeout)
+        return bool(done)
+
+    def notify(self, path: Path) -> None:
+        """Wake every waiter on *path*."""
+        path = Path(path)
+        waiters = self._waiters.get(path)
+        if not waiters:
+            return
+        for fut in waiters:
+            if not fut.done():
+                fut.set_result(None)
+        self._release(path)
+
+    def _on_inotify_readable(self) -> None:
+        assert self._inotify is not None
+        for wd, mask, name in self._inotify.read_events():
+            directory = self._wd_dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & _IN_IGNORED:
+                # Directory was removed; fall waiters back to stat polling.
+                self._wd_dirs.pop(wd, None)
+                self._dir_wds.pop(directory, None)
+                self._dir_refs.pop(directory, None)
+                for path, d in list(self._watched.items()):
+                    if d == directory:
+                        del self._watched[path]
+                        self._polled[path] = _stat_signature(path)
+                self._ensure_poll_task()
+                continue
+            if name:
+                self.notify(directory / name)
+
+    def _ensure_poll_task(self) -> None:
+        if self._polled and (self._poll_task is None or self._poll_task.done()):
+            assert self._loop is not None
+            self._poll_task = self._loop.create_task(self._poll_loop())
+
+    async def _poll_loop(self) -> None:
+        while self._polled:
+            await asyncio.sleep(self._poll_interval)
+            for path, previous in list(self._polled.items()):
+                current = _stat_signature(path)
+                if current != previous:
+                    self.notify(path)
+
+    def close(self) -> None:
+        for path in list(self._waiters):
+            for fut in self._waiters[path]:
+                if not fut.done():
+                    fut.cancel()
+            self._release(path)
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            self._poll_task = None
+        if self._inotify is not None:
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.remove_reader(self._inotify.fileno())
+            self._inotify.close()
+            self._inotify = None
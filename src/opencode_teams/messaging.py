@@ -1,12 +1,19 @@
 from __future__ import annotations
 
+import bisect
+import gzip
 import json
+import os
+import threading
 import time
+from collections import OrderedDict
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import NamedTuple
 
 from pydantic import BaseModel
 
+from opencode_teams._fileio import atomic_write
 from opencode_teams._filelock import file_lock
 from opencode_teams.models import (
     InboxMessage,
@@ -17,6 +24,13 @@ from opencode_teams.models import (
 
 TEAMS_DIR = Path.home() / ".opencode-teams" / "teams"
 
+# Read messages kept in the live inbox before compaction archives them.
+INBOX_RETAIN_READ = 200
+INBOX_RETAIN_SECONDS = 24 * 60 * 60
+
+# Parsed inboxes kept in memory per server process.
+INBOX_CACHE_SIZE = 64
+
 
 def _teams_dir(base_dir: Path | None = None) -> Path:
     return (base_dir / "teams") if base_dir else TEAMS_DIR
@@ -28,54 +42,656 @@ def now_iso() -> str:
 
 
 def inbox_path(team_name: str, agent_name: str, base_dir: Path | None = None) -> Path:
-    return _teams_dir(base_dir) / team_name / "inboxes" / f"{agent_name}.json"
+    return _teams_dir(base_dir) / team_name / "inboxes" / f"{agent_name}.jsonl"
+
+
+def _legacy_inbox_path(path: Path) -> Path:
+    return path.with_suffix(".json")
+
+
+def _cursor_path(path: Path) -> Path:
+    return path.with_suffix(".cursor")
+
+
+def _inbox_lock_path(path: Path) -> Path:
+    """Lock guarding a single agent's inbox and cursor.
+
+    ``inboxes/.lock`` is reserved for operations that span several inboxes,
+    so traffic to different recipients never serializes on one lock.
+    """
+    return path.with_suffix(".lock")
+
+
+class _Cursor(NamedTuple):
+    """Read high-water mark of an inbox.
+
+    ``seq`` is the sequence number of the last consumed message; ``offset``
+    is the byte position just past it, so unread reads can seek straight to
+    the first unconsumed line. ``base`` is the sequence number preceding the
+    first line still in the live file (compaction archives the head).
+    ``ahead`` holds messages above the mark that were read out of order by a
+    filtered read; the mark absorbs them once the gap below is read.
+    """
+
+    offset: int = 0
+    seq: int = 0
+    base: int = 0
+    ahead: tuple[int, ...] = ()
+
+    def start(self) -> _Cursor:
+        """Cursor positioned before the first live line."""
+        return _Cursor(0, self.base, self.base)
+
+
+def _count_lines(path: Path, end: int) -> int:
+    with open(path, "rb") as f:
+        data = f.read(end)
+    return sum(1 for line in data.split(b"\n") if line.strip())
+
+
+def _read_cursor(path: Path) -> _Cursor:
+    try:
+        raw = json.loads(_cursor_path(path).read_text())
+        offset = int(raw["offset"])
+    except (FileNotFoundError, ValueError, KeyError, TypeError):
+        return _Cursor()
+    base = int(raw.get("base", 0))
+    if "seq" not in raw:
+        # Cursor written before sequence numbers existed.
+        return _Cursor(offset, base + _count_lines(path, offset), base)
+    return _Cursor(offset, int(raw["seq"]), base, tuple(raw.get("ahead", ())))
+
+
+def _write_cursor(path: Path, cursor: _Cursor) -> None:
+    raw: dict = {"offset": cursor.offset, "seq": cursor.seq, "base": cursor.base}
+    if cursor.ahead:
+        raw["ahead"] = list(cursor.ahead)
+    atomic_write(_cursor_path(path), json.dumps(raw).encode())
+
+
+def _advance(cursor: _Cursor, read: set[int], ends: dict[int, int]) -> _Cursor:
+    """Move the high-water mark over every contiguous read message.
+
+    *read* holds sequence numbers now known to be read and *ends* maps each
+    scanned sequence number to the byte offset just past its line.
+    """
+    ahead = set(cursor.ahead) | read
+    seq, offset = cursor.seq, cursor.offset
+    while seq + 1 in ahead and seq + 1 in ends:
+        seq += 1
+        offset = ends[seq]
+    return _Cursor(offset, seq, cursor.base, tuple(sorted(s for s in ahead if s > seq)))
+
+
+def _migrate_legacy_inbox(path: Path) -> None:
+    """Convert a pre-JSONL ``<agent>.json`` array inbox in place.
+
+    Must be called with the inbox lock held. Stored ``read`` flags are kept
+    on each line, so history migrated from the old format stays read.
+    """
+    legacy = _legacy_inbox_path(path)
+    if not legacy.exists():
+        return
+    try:
+        raw_list = json.loads(legacy.read_text() or "[]")
+    except json.JSONDecodeError:
+        raw_list = []
+    # Normalize through the model once here so every line on disk is in the
+    # validated alias form the raw read path hands out.
+    data = "".join(
+        json.dumps(InboxMessage.model_validate(entry).model_dump(by_alias=True, exclude_none=True))
+        + "\n"
+        for entry in raw_list
+    )
+    with open(path, "ab") as f:
+        f.write(data.encode())
+    legacy.unlink()
+
+
+def _read_entries(
+    path: Path, start: _Cursor = _Cursor()
+) -> tuple[list[tuple[int, int, dict]], int]:
+    """Parse complete JSONL lines after *start*.
+
+    Returns ``(seq, end_offset, entry)`` triples and the offset just past
+    the last complete line. A trailing partial line (a write in flight) is
+    left for the next reader.
+    """
+    try:
+        with open(path, "rb") as f:
+            f.seek(start.offset)
+            data = f.read()
+    except FileNotFoundError:
+        return [], start.offset
+    entries: list[tuple[int, int, dict]] = []
+    seq = start.seq
+    pos = 0
+    while True:
+        nl = data.find(b"\n", pos)
+        if nl < 0:
+            break
+        line = data[pos:nl]
+        pos = nl + 1
+        if line.strip():
+            seq += 1
+            entries.append((seq, start.offset + pos, json.loads(line)))
+    return entries, start.offset + pos
+
+
+# --- Parsed-inbox cache -----------------------------------------------------
+
+
+class _CachedInbox:
+    __slots__ = ("key", "base", "parsed_upto", "entries")
+
+    def __init__(
+        self,
+        key: tuple[int, int, int],
+        base: int,
+        parsed_upto: int,
+        entries: list[tuple[int, int, dict]],
+    ) -> None:
+        self.key = key  # (mtime_ns, size, inode) the entries reflect
+        self.base = base
+        self.parsed_upto = parsed_upto
+        self.entries = entries
+
+
+_inbox_cache: OrderedDict[Path, _CachedInbox] = OrderedDict()
+_inbox_cache_lock = threading.Lock()
+_inbox_cache_stats = {"hits": 0, "misses": 0, "extends": 0}
+
+
+def inbox_cache_stats() -> dict:
+    """Counters for the in-process parsed-inbox cache."""
+    with _inbox_cache_lock:
+        return dict(_inbox_cache_stats, entries=len(_inbox_cache), max_entries=INBOX_CACHE_SIZE)
+
+
+def _stat_key(st: os.stat_result) -> tuple[int, int, int]:
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _load_entries(path: Path, cursor: _Cursor, from_cursor: bool) -> list[tuple[int, int, dict]]:
+    """Entries of the live inbox, served from the cache when unchanged.
+
+    Must be called with the inbox lock held. A cached inbox that only grew
+    (same inode) is extended by parsing just the new bytes. Reads that only
+    need lines after the cursor do not populate the cache on a miss, so
+    unread-only polling never parses consumed history.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return []
+    key = _stat_key(st)
+    with _inbox_cache_lock:
+        cached = _inbox_cache.get(path)
+        if cached is not None and (
+            cached.base != cursor.base
+            or cached.key[2] != key[2]
+            or key[1] < cached.parsed_upto
+            or (key[1] == cached.key[1] and key != cached.key)
+        ):
+            del _inbox_cache[path]
+            cached = None
+        if cached is not None:
+            _inbox_cache.move_to_end(path)
+            if cached.key == key:
+                _inbox_cache_stats["hits"] += 1
+            else:
+                _inbox_cache_stats["extends"] += 1
+        else:
+            _inbox_cache_stats["misses"] += 1
+
+    if cached is None:
+        if from_cursor:
+            entries, _ = _read_entries(path, cursor)
+            return entries
+        entries, parsed_upto = _read_entries(path, cursor.start())
+        cached = _CachedInbox(key, cursor.base, parsed_upto, entries)
+        with _inbox_cache_lock:
+            _inbox_cache[path] = cached
+            while len(_inbox_cache) > INBOX_CACHE_SIZE:
+                _inbox_cache.popitem(last=False)
+    elif cached.key != key:
+        last_seq = cached.entries[-1][0] if cached.entries else cached.base
+        more, parsed_upto = _read_entries(path, _Cursor(cached.parsed_upto, last_seq, cached.base))
+        cached.entries.extend(more)
+        cached.parsed_upto = parsed_upto
+        cached.key = key
+
+    entries = cached.entries
+    if from_cursor:
+        return entries[bisect.bisect_right(entries, cursor.seq, key=lambda e: e[0]) :]
+    return entries
+
+
+def _note_append(path: Path, st: os.stat_result, line: bytes, entry: dict) -> None:
+    """Extend a cached inbox in place after this process appended *line*."""
+    with _inbox_cache_lock:
+        cached = _inbox_cache.get(path)
+        if cached is None:
+            return
+        if (
+            cached.key[2] == st.st_ino
+            and cached.key[1] == cached.parsed_upto == st.st_size - len(line)
+        ):
+            last_seq = cached.entries[-1][0] if cached.entries else cached.base
+            cached.entries.append((last_seq + 1, st.st_size, entry))
+            cached.parsed_upto = st.st_size
+            cached.key = _stat_key(st)
+        else:
+            del _inbox_cache[path]
+
+
+def _drop_cached(path: Path) -> None:
+    with _inbox_cache_lock:
+        _inbox_cache.pop(path, None)
+
+
+def _append_line(path: Path, line: bytes) -> os.stat_result:
+    flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+    fd = os.open(path, flags, 0o644)
+    try:
+        os.write(fd, line)
+        return os.fstat(fd)
+    finally:
+        os.close(fd)
 
 
 def ensure_inbox(team_name: str, agent_name: str, base_dir: Path | None = None) -> Path:
     path = inbox_path(team_name, agent_name, base_dir)
     path.parent.mkdir(parents=True, exist_ok=True)
+    if _legacy_inbox_path(path).exists():
+        with file_lock(_inbox_lock_path(path)):
+            _migrate_legacy_inbox(path)
     if not path.exists():
-        path.write_text("[]")
+        path.touch()
     return path
 
 
+def message_type(entry: dict) -> str:
+    """Structured ``type`` carried in a raw inbox entry's text, else "message"."""
+    text = entry.get("text", "")
+    if text.startswith("{") and '"type"' in text:
+        try:
+            payload = json.loads(text)
+        except json.JSONDecodeError:
+            return "message"
+        if isinstance(payload, dict) and isinstance(payload.get("type"), str):
+            return payload["type"]
+    return "message"
+
+
+def _query(
+    team_name: str,
+    agent_name: str,
+    *,
+    unread_only: bool,
+    mark_as_read: bool,
+    since_seq: int | None,
+    limit: int | None,
+    from_: str | None,
+    message_types: list[str] | None,
+    base_dir: Path | None,
+) -> tuple[list[tuple[int, dict, bool]], int | None]:
+    """Select raw entries and advance the cursor.
+
+    Returns ``(seq, entry, read)`` triples where ``read`` is the state the
+    caller should report, and the ``since_seq`` for the next page. Entries
+    may be shared with the inbox cache and must not be mutated.
+    """
+    if limit is not None and limit < 1:
+        raise ValueError("limit must be at least 1")
+    path = inbox_path(team_name, agent_name, base_dir)
+    if not path.exists() and not _legacy_inbox_path(path).exists():
+        return [], None
+    types = set(message_types) if message_types else None
+
+    # Compaction rewrites the head of the file, so offsets are only stable
+    # while the inbox lock is held.
+    with file_lock(_inbox_lock_path(path)):
+        _migrate_legacy_inbox(path)
+        cursor = _read_cursor(path)
+        # Reads that only need messages above the mark are a slice from the
+        # cursor; consumed history is never parsed.
+        from_cursor = unread_only or (since_seq is not None and since_seq >= cursor.seq)
+        entries = _load_entries(path, cursor, from_cursor)
+        ahead = set(cursor.ahead)
+
+        selected: list[tuple[int, dict, bool]] = []
+        ends: dict[int, int] = {}
+        already_read: set[int] = set()
+        next_seq = None
+        for seq, end, entry in entries:
+            ends[seq] = end
+            # A stored ``read: true`` only survives from inboxes migrated out
+            # of the old array format.
+            is_read = seq <= cursor.seq or seq in ahead or bool(entry.get("read"))
+            if is_read and seq > cursor.seq:
+                already_read.add(seq)
+            if since_seq is not None and seq <= since_seq:
+                continue
+            if unread_only and is_read:
+                continue
+            if from_ is not None and entry.get("from") != from_:
+                continue
+            if types is not None and message_type(entry) not in types:
+                continue
+            if limit is not None and len(selected) >= limit:
+                next_seq = selected[-1][0]
+                break
+            selected.append((seq, entry, is_read))
+
+        advanced = False
+        if mark_as_read and selected:
+            selected = [(seq, entry, True) for seq, entry, _read in selected]
+            marked = already_read | {seq for seq, _e, _r in selected}
+            new_cursor = _advance(cursor, marked, ends)
+            if new_cursor != cursor:
+                _write_cursor(path, new_cursor)
+                advanced = new_cursor.seq > cursor.seq
+                cursor = new_cursor
+
+    if advanced and _needs_compaction(path, cursor):
+        compact_inbox(team_name, agent_name, base_dir=base_dir)
+    return selected, next_seq
+
+
+def query_inbox(
+    team_name: str,
+    agent_name: str,
+    *,
+    unread_only: bool = False,
+    mark_as_read: bool = True,
+    since_seq: int | None = None,
+    limit: int | None = None,
+    from_: str | None = None,
+    message_types: list[str] | None = None,
+    base_dir: Path | None = None,
+) -> tuple[list[tuple[int, InboxMessage]], int | None]:
+    """Read an inbox with optional paging and filters.
+
+    Selectors are applied to the raw line dicts, so only matching messages
+    are validated into ``InboxMessage``. ``since_seq`` skips messages at or
+    below that sequence number, ``from_`` matches the sender and
+    ``message_types`` matches the structured ``type`` inside the text
+    ("message" for plain text). Returns ``(seq, message)`` pairs and the
+    ``since_seq`` for the next page when *limit* cut the result short.
+    """
+    selected, next_seq = _query(
+        team_name,
+        agent_name,
+        unread_only=unread_only,
+        mark_as_read=mark_as_read,
+        since_seq=since_seq,
+        limit=limit,
+        from_=from_,
+        message_types=message_types,
+        base_dir=base_dir,
+    )
+    result: list[tuple[int, InboxMessage]] = []
+    for seq, entry, is_read in selected:
+        msg = InboxMessage.model_validate(entry)
+        msg.read = is_read
+        result.append((seq, msg))
+    return result, next_seq
+
+
+def query_inbox_raw(
+    team_name: str,
+    agent_name: str,
+    *,
+    unread_only: bool = False,
+    mark_as_read: bool = True,
+    since_seq: int | None = None,
+    limit: int | None = None,
+    from_: str | None = None,
+    message_types: list[str] | None = None,
+    base_dir: Path | None = None,
+) -> tuple[list[tuple[int, dict]], int | None]:
+    """Like ``query_inbox`` but returns the on-disk alias-form dicts.
+
+    Every line was validated when it was written (or migrated), so the
+    dicts are returned as-is with only ``read`` filled in; this is what the
+    tool layer serializes, without a model round trip per message.
+    """
+    selected, next_seq = _query(
+        team_name,
+        agent_name,
+        unread_only=unread_only,
+        mark_as_read=mark_as_read,
+        since_seq=since_seq,
+        limit=limit,
+        from_=from_,
+        message_types=message_types,
+        base_dir=base_dir,
+    )
+    return [(seq, dict(entry, read=is_read)) for seq, entry, is_read in selected], next_seq
+
+
 def read_inbox(
     team_name: str,
     agent_name: str,
     unread_only: bool = False,
     mark_as_read: bool = True,
     base_dir: Path | None = None,
+    *,
+    since_seq: int | None = None,
+    limit: int | None = None,
+    from_: str | None = None,
+    message_types: list[str] | None = None,
 ) -> list[InboxMessage]:
+    page, _next = query_inbox(
+        team_name,
+        agent_name,
+        unread_only=unread_only,
+        mark_as_read=mark_as_read,
+        since_seq=since_seq,
+        limit=limit,
+        from_=from_,
+        message_types=message_types,
+        base_dir=base_dir,
+    )
+    return [m for _seq, m in page]
+
+
+# --- Retention / archival ---------------------------------------------------
+
+
+def _archive_dir(path: Path) -> Path:
+    return path.parent / "archive" / path.stem
+
+
+def _archive_lock_path(path: Path) -> Path:
+    return path.with_suffix(".archive.lock")
+
+
+def parse_timestamp(ts: str) -> float | None:
+    try:
+        dt = datetime.strptime(ts, "%Y-%m-%dT%H:%M:%S.%fZ")
+    except (TypeError, ValueError):
+        return None
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _first_line(path: Path) -> dict | None:
+    try:
+        with open(path, "rb") as f:
+            line = f.readline()
+    except FileNotFoundError:
+        return None
+    if not line.endswith(b"\n"):
+        return None
+    return json.loads(line)
+
+
+def _needs_compaction(path: Path, cursor: _Cursor) -> bool:
+    """Cheap check run after each cursor advance (amortizes compaction)."""
+    live_read = cursor.seq - cursor.base
+    if live_read <= 0:
+        return False
+    if live_read > 2 * INBOX_RETAIN_READ:
+        return True
+    head = _first_line(path)
+    ts = parse_timestamp(head.get("timestamp", "")) if head else None
+    return ts is not None and time.time() - ts > INBOX_RETAIN_SECONDS
+
+
+def _load_archive_index(archive_dir: Path) -> dict:
+    try:
+        return json.loads((archive_dir / "index.json").read_text())
+    except FileNotFoundError:
+        return {"last_seq": 0, "segments": {}}
+
+
+def compact_inbox(
+    team_name: str,
+    agent_name: str,
+    *,
+    retain_read: int | None = None,
+    max_age_seconds: float | None = None,
+    base_dir: Path | None = None,
+) -> int:
+    """Move old read messages from the live inbox into per-day archives.
+
+    A read message is archived when more than *retain_read* newer read
+    messages exist or when it is older than *max_age_seconds*. Archiving
+    stops at the first message that must stay, so the live inbox remains a
+    contiguous tail. Unread messages are never archived. Archives are
+    gzip-compressed JSONL segments named ``<YYYY-MM-DD>.jsonl.gz`` under
+    ``inboxes/archive/<agent>/``, each line carrying its ``seq``.
+
+    The inbox lock is only held to snapshot the cursor and to swap in the
+    trimmed file; reading and compressing history happens without it, so
+    senders are not blocked. Returns the number of messages archived.
+    """
+    retain = INBOX_RETAIN_READ if retain_read is None else retain_read
+    max_age = INBOX_RETAIN_SECONDS if max_age_seconds is None else max_age_seconds
     path = inbox_path(team_name, agent_name, base_dir)
     if not path.exists():
-        return []
+        return 0
+
+    with file_lock(_archive_lock_path(path)):
+        with file_lock(_inbox_lock_path(path)):
+            cursor = _read_cursor(path)
+        # Bytes before the cursor are immutable except through compaction,
+        # which the archive lock serializes.
+        with open(path, "rb") as f:
+            head = f.read(cursor.offset)
 
-    if mark_as_read:
-        lock_path = path.parent / ".lock"
-        with file_lock(lock_path):
-            raw_list = json.loads(path.read_text())
-            all_msgs = [InboxMessage.model_validate(entry) for entry in raw_list]
+        lines: list[tuple[int, bytes, dict]] = []
+        pos = 0
+        seq = cursor.base
+        while pos < len(head):
+            nl = head.index(b"\n", pos)
+            line = head[pos:nl]
+            pos = nl + 1
+            if line.strip():
+                seq += 1
+                lines.append((pos, line, json.loads(line)))
 
-            if unread_only:
-                result = [m for m in all_msgs if not m.read]
+        now = time.time()
+        excess = len(lines) - retain
+        count = 0
+        cut = 0
+        for i, (end, _line, entry) in enumerate(lines):
+            ts = parse_timestamp(entry.get("timestamp", ""))
+            too_old = ts is not None and now - ts > max_age
+            if i < excess or too_old:
+                count = i + 1
+                cut = end
             else:
-                result = list(all_msgs)
+                break
+        if count == 0:
+            return 0
 
-            if result:
-                for m in all_msgs:
-                    if m in result:
-                        m.read = True
-                serialized = [m.model_dump(by_alias=True, exclude_none=True) for m in all_msgs]
-                path.write_text(json.dumps(serialized))
+        archive_dir = _archive_dir(path)
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        index = _load_archive_index(archive_dir)
+        by_day: dict[str, list[bytes]] = {}
+        for i, (_end, _line, entry) in enumerate(lines[:count]):
+            msg_seq = cursor.base + i + 1
+            if msg_seq <= index["last_seq"]:
+                continue  # archived by a compaction that crashed before trimming
+            day = str(entry.get("timestamp", ""))[:10] or "unknown"
+            record = dict(entry, seq=msg_seq, read=True)
+            by_day.setdefault(day, []).append((json.dumps(record) + "\n").encode())
+            first, last = index["segments"].get(f"{day}.jsonl.gz", [msg_seq, msg_seq])
+            index["segments"][f"{day}.jsonl.gz"] = [min(first, msg_seq), max(last, msg_seq)]
+        for day, records in by_day.items():
+            with gzip.open(archive_dir / f"{day}.jsonl.gz", "ab") as gz:
+                gz.write(b"".join(records))
+        index["last_seq"] = max(index["last_seq"], cursor.base + count)
+        atomic_write(archive_dir / "index.json", json.dumps(index).encode())
 
-            return result
-    else:
-        raw_list = json.loads(path.read_text())
-        all_msgs = [InboxMessage.model_validate(entry) for entry in raw_list]
+        with file_lock(_inbox_lock_path(path)):
+            current = _read_cursor(path)
+            with open(path, "rb") as f:
+                f.seek(cut)
+                tail = f.read()
+            atomic_write(path, tail)
+            _drop_cached(path)
+            _write_cursor(
+                path,
+                _Cursor(current.offset - cut, current.seq, current.base + count, current.ahead),
+            )
+    return count
 
-        if unread_only:
-            return [m for m in all_msgs if not m.read]
-        return list(all_msgs)
+
+def read_inbox_history(
+    team_name: str,
+    agent_name: str,
+    *,
+    since_seq: int = 0,
+    limit: int = 50,
+    day: str | None = None,
+    base_dir: Path | None = None,
+) -> tuple[list[dict], int | None]:
+    """Page through archived messages in sequence order.
+
+    Returns archived message dicts (with their ``seq``) after *since_seq* and
+    the ``since_seq`` to pass for the next page, or None when exhausted.
+    Only archive segments that can contain later messages are opened.
+    """
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    archive_dir = _archive_dir(inbox_path(team_name, agent_name, base_dir))
+    index = _load_archive_index(archive_dir)
+    segments = sorted(
+        (first, last, name)
+        for name, (first, last) in index["segments"].items()
+        if last > since_seq and (day is None or name == f"{day}.jsonl.gz")
+    )
+    found: list[dict] = []
+    for first, _last, name in segments:
+        if len(found) >= limit and first > found[limit - 1]["seq"]:
+            break
+        with gzip.open(archive_dir / name, "rb") as gz:
+            for line in gz:
+                if line.strip():
+                    record = json.loads(line)
+                    if record["seq"] > since_seq:
+                        found.append(record)
+        found.sort(key=lambda r: r["seq"])
+    page = found[:limit]
+    has_more = len(found) > limit or (
+        bool(page) and any(last > page[-1]["seq"] for _f, last, _n in segments)
+    )
+    return page, (page[-1]["seq"] if page and has_more else None)
+
+
+def _serialize(message: InboxMessage) -> tuple[dict, bytes]:
+    entry = message.model_dump(by_alias=True, exclude_none=True)
+    return entry, (json.dumps(entry) + "\n").encode()
+
+
+def _deliver(path: Path, entry: dict, line: bytes) -> None:
+    with file_lock(_inbox_lock_path(path)):
+        _migrate_legacy_inbox(path)
+        st = _append_line(path, line)
+        _note_append(path, st, line, entry)
 
 
 def append_message(
@@ -84,33 +700,161 @@ def append_message(
     message: InboxMessage,
     base_dir: Path | None = None,
 ) -> None:
-    path = ensure_inbox(team_name, agent_name, base_dir)
-    lock_path = path.parent / ".lock"
+    path = inbox_path(team_name, agent_name, base_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    entry, line = _serialize(message)
+    _deliver(path, entry, line)
 
-    with file_lock(lock_path):
-        raw_list = json.loads(path.read_text())
-        raw_list.append(message.model_dump(by_alias=True, exclude_none=True))
-        path.write_text(json.dumps(raw_list))
 
+def broadcast(
+    team_name: str,
+    from_name: str,
+    recipients: list[str],
+    text: str,
+    summary: str,
+    color: str | None = None,
+    base_dir: Path | None = None,
+    *,
+    topic: str | None = None,
+) -> dict[str, str]:
+    """Deliver one plain message to many inboxes.
 
-def send_plain_message(
+    The message is built and serialized once, then appended to every
+    recipient's inbox in turn on the calling thread; each append only holds
+    that inbox's lock. Returns a per-recipient status: ``"delivered"`` or
+    the error that prevented it.
+    """
+    if not recipients:
+        return {}
+    entry, line = _serialize(plain_message(from_name, text, summary, color, topic=topic))
+    inbox_dir = inbox_path(team_name, recipients[0], base_dir).parent
+    inbox_dir.mkdir(parents=True, exist_ok=True)
+
+    def deliver(name: str) -> str:
+        try:
+            _deliver(inbox_path(team_name, name, base_dir), entry, line)
+        except OSError as e:
+            return f"failed: {e}"
+        return "delivered"
+
+    return {name: deliver(name) for name in recipients}
+
+
+class _TopicIndex(NamedTuple):
+    key: tuple[int, int, int]
+    subscribers: dict[str, tuple[str, ...]]
+
+
+# topic -> subscribers per team config, rebuilt when config.json changes
+# (config writes replace the file, so the stat key always moves).
+_topic_index: dict[Path, _TopicIndex] = {}
+_topic_index_lock = threading.Lock()
+
+
+def topic_subscribers(
+    team_name: str, topic: str, base_dir: Path | None = None
+) -> list[str]:
+    """Members subscribed to *topic*, in team order."""
+    config_path = _teams_dir(base_dir) / team_name / "config.json"
+    try:
+        st = config_path.stat()
+    except FileNotFoundError:
+        raise ValueError(f"Team {team_name!r} does not exist") from None
+    key = _stat_key(st)
+    with _topic_index_lock:
+        index = _topic_index.get(config_path)
+    if index is None or index.key != key:
+        raw = json.loads(config_path.read_text())
+        subscribers: dict[str, list[str]] = {}
+        for member in raw.get("members", []):
+            for t in member.get("subscriptions", []):
+                subscribers.setdefault(t, []).append(member["name"])
+        index = _TopicIndex(key, {t: tuple(names) for t, names in subscribers.items()})
+        with _topic_index_lock:
+            _topic_index[config_path] = index
+    return list(index.subscribers.get(topic, ()))
+
+
+def publish(
     team_name: str,
     from_name: str,
-    to_name: str,
+    topic: str,
     text: str,
     summary: str,
     color: str | None = None,
     base_dir: Path | None = None,
-) -> None:
-    msg = InboxMessage(
+) -> dict[str, str]:
+    """Deliver a message only to the members subscribed to *topic*.
+
+    The sender never receives its own publication. Returns the same
+    per-recipient status map as ``broadcast`` (empty when nobody listens).
+    """
+    recipients = [n for n in topic_subscribers(team_name, topic, base_dir) if n != from_name]
+    return broadcast(
+        team_name, from_name, recipients, text, summary, color, base_dir, topic=topic
+    )
+
+
+def plain_message(
+    from_name: str,
+    text: str,
+    summary: str,
+    color: str | None = None,
+    *,
+    topic: str | None = None,
+) -> InboxMessage:
+    return InboxMessage(
         from_=from_name,
         text=text,
         timestamp=now_iso(),
         read=False,
         summary=summary,
         color=color,
+        topic=topic,
+    )
+
+
+def structured_message(
+    from_name: str, payload: BaseModel, color: str | None = None
+) -> InboxMessage:
+    return InboxMessage(
+        from_=from_name,
+        text=payload.model_dump_json(by_alias=True),
+        timestamp=now_iso(),
+        read=False,
+        color=color,
+    )
+
+
+def task_assignment(task: TaskFile, assigned_by: str) -> TaskAssignment:
+    return TaskAssignment(
+        task_id=task.id,
+        subject=task.subject,
+        description=task.description,
+        assigned_by=assigned_by,
+        timestamp=now_iso(),
+    )
+
+
+def shutdown_request(recipient: str, reason: str = "") -> ShutdownRequest:
+    return ShutdownRequest(
+        request_id=f"shutdown-{int(time.time() * 1000)}@{recipient}",
+        from_="team-lead",
+        reason=reason,
+        timestamp=now_iso(),
     )
-    append_message(team_name, to_name, msg, base_dir)
+
+
+def send_plain_message(
+    team_name: str,
+    from_name: str,
+    to_name: str,
+    text: str,
+    summary: str,
+    color: str | None = None,
+    base_dir: Path | None = None,
+) -> None:
+    append_message(team_name, to_name, plain_message(from_name, text, summary, color), base_dir)
 
 
 def send_structured_message(
@@ -121,15 +865,7 @@ def send_structured_message(
     color: str | None = None,
     base_dir: Path | None = None,
 ) -> None:
-    serialized = payload.model_dump_json(by_alias=True)
-    msg = InboxMessage(
-        from_=from_name,
-        text=serialized,
-        timestamp=now_iso(),
-        read=False,
-        color=color,
-    )
-    append_message(team_name, to_name, msg, base_dir)
+    append_message(team_name, to_name, structured_message(from_name, payload, color), base_dir)
 
 
 def send_task_assignment(
@@ -138,13 +874,7 @@ def send_task_assignment(
     assigned_by: str,
     base_dir: Path | None = None,
 ) -> None:
-    payload = TaskAssignment(
-        task_id=task.id,
-        subject=task.subject,
-        description=task.description,
-        assigned_by=assigned_by,
-        timestamp=now_iso(),
-    )
+    payload = task_assignment(task, assigned_by)
     send_structured_message(team_name, assigned_by, task.owner, payload, base_dir=base_dir)
 
 
@@ -154,12 +884,6 @@ def send_shutdown_request(
     reason: str = "",
     base_dir: Path | None = None,
 ) -> str:
-    request_id = f"shutdown-{int(time.time() * 1000)}@{recipient}"
-    payload = ShutdownRequest(
-        request_id=request_id,
-        from_="team-lead",
-        reason=reason,
-        timestamp=now_iso(),
-    )
+    payload = shutdown_request(recipient, reason)
     send_structured_message(team_name, "team-lead", recipient, payload, base_dir=base_dir)
-    return request_id
+    return payload.request_id
@@ -10,6 +10,8 @@ import json
 import os
 import shutil
 import subprocess
+import threading
+import time
 from pathlib import Path
 from typing import Any, Literal
 
@@ -234,6 +236,103 @@ def discover_models(config: dict[str, Any] | None = None) -> list[ModelInfo]:
     return models
 
 
+def discover_spawnable_models(
+    opencode_binary: str | None = None, project_dir: Path | None = None
+) -> list[ModelInfo]:
+    """Configured models that ``opencode models`` reports, minus deprecated ones.
+
+    Falls back to every configured model when runtime enumeration fails.
+    """
+    discovered = discover_models(load_opencode_config(project_dir))
+    runtime_models = get_runtime_available_model_strings(opencode_binary)
+    return filter_models(
+        discovered,
+        runtime_available=runtime_models or None,
+        include_deprecated=False,
+    )
+
+
+# How long a discovered model list is served before it is refreshed.
+MODEL_CACHE_TTL = 300.0
+
+
+class ModelCatalog:
+    """Cached result of ``discover_spawnable_models``.
+
+    ``get`` answers from the cache and only discovers on the very first
+    call. The cache goes stale after ``ttl`` seconds or when the global or
+    project opencode.json changes; stale entries keep being served until
+    someone calls ``refresh`` (the server does so in the background), so
+    callers never wait on ``opencode models`` once a list is loaded.
+    """
+
+    def __init__(
+        self,
+        opencode_binary: str | None = None,
+        ttl: float = MODEL_CACHE_TTL,
+        project_dir: Path | None = None,
+    ) -> None:
+        self.opencode_binary = opencode_binary
+        self.ttl = ttl
+        self.project_dir = project_dir
+        # (models, monotonic load time, config stamp), replaced as a whole.
+        self._entry: tuple[list[ModelInfo], float, tuple] | None = None
+        self._refresh_lock = threading.Lock()
+        self.refreshes = 0
+        self.refresh_seconds: float | None = None
+
+    def _config_stamp(self) -> tuple:
+        stamp = []
+        for path in (_get_global_config_path(), _get_project_config_path(self.project_dir)):
+            try:
+                st = path.stat()
+            except OSError:
+                stamp.append(None)
+            else:
+                stamp.append((st.st_mtime_ns, st.st_size))
+        return tuple(stamp)
+
+    def is_stale(self) -> bool:
+        entry = self._entry
+        if entry is None:
+            return True
+        _, loaded_at, stamp = entry
+        return time.monotonic() - loaded_at >= self.ttl or self._config_stamp() != stamp
+
+    def refresh(self, force: bool = False) -> list[ModelInfo]:
+        """Rediscover the models if stale (or *force*), and return them.
+
+        Concurrent calls share one discovery.
+        """
+        with self._refresh_lock:
+            if not force and not self.is_stale():
+                return self._entry[0]
+            stamp = self._config_stamp()
+            start = time.monotonic()
+            models = discover_spawnable_models(self.opencode_binary, self.project_dir)
+            end = time.monotonic()
+            self._entry = (models, end, stamp)
+            self.refreshes += 1
+            self.refresh_seconds = end - start
+            return models
+
+    def get(self) -> list[ModelInfo]:
+        """The cached models, possibly stale; discovers only if none are loaded."""
+        entry = self._entry
+        return entry[0] if entry is not None else self.refresh()
+
+    def stats(self) -> dict[str, Any]:
+        entry = self._entry
+        return {
+            "age_seconds": round(time.monotonic() - entry[1], 3) if entry else None,
+            "refresh_seconds": (
+                round(self.refresh_seconds, 3) if self.refresh_seconds is not None else None
+            ),
+            "refreshes": self.refreshes,
+            "stale": self.is_stale(),
+        }
+
+
 def select_model_by_preference(
     models: list[ModelInfo],
     preference: ModelPreference,
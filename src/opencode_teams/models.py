@@ -87,6 +87,20 @@ class TaskFile(BaseModel):
     blocked_by: list[str] = Field(alias="blockedBy", default_factory=list)
     owner: str | None = Field(default=None)
     metadata: dict[str, Any] | None = Field(default=None)
+    lease_expires_at: int | None = Field(alias="leaseExpiresAt", default=None)
+
+
+class TaskSpec(BaseModel):
+    """One entry of a batch create; ``blocked_by`` may name other entries' refs."""
+
+    model_config = {"populate_by_name": True}
+
+    ref: str | None = None
+    subject: str
+    description: str = ""
+    active_form: str = Field(alias="activeForm", default="")
+    metadata: dict[str, Any] | None = Field(default=None)
+    blocked_by: list[str] = Field(alias="blockedBy", default_factory=list)
 
 
 class InboxMessage(BaseModel):
@@ -98,6 +112,7 @@ class InboxMessage(BaseModel):
     read: bool = False
     summary: str | None = Field(default=None)
     color: str | None = Field(default=None)
+    topic: str | None = Field(default=None)
 
 
 class IdleNotification(BaseModel):
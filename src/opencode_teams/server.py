@@ -1,4 +1,6 @@
 import asyncio
+import contextlib
+import functools
 import sys
 import time
 import traceback
@@ -9,15 +11,14 @@ from typing import Any, Literal
 
 from fastmcp import Context, FastMCP
 from fastmcp.exceptions import ToolError
+from fastmcp.server.dependencies import get_context
 from fastmcp.server.lifespan import lifespan
 
-from opencode_teams import messaging, tasks, teams
-from opencode_teams.model_discovery import (
-    discover_models,
-    filter_models,
-    get_runtime_available_model_strings,
-    resolve_model_string,
-)
+from opencode_teams.sqlite.db import MemoryDatabase, snapshot_path, use_memory
+from opencode_teams.storage import engine_name, messaging, open_memory, tasks, teams
+from opencode_teams.executors import DISK, SUBPROCESS, ToolExecutors
+from opencode_teams.inbox_watch import InboxWatcher
+from opencode_teams.model_discovery import ModelCatalog, resolve_model_string
 from opencode_teams.task_analysis import infer_model_preference
 from opencode_teams.models import (
     AgentHealthStatus,
@@ -28,6 +29,7 @@ from opencode_teams.models import (
     SendMessageResult,
     ShutdownApproved,
     SpawnResult,
+    TaskSpec,
     TeammateMember,
 )
 from opencode_teams.spawner import (
@@ -47,25 +49,72 @@ from opencode_teams.spawner import (
 )
 
 
-def _discover_available_models(opencode_binary: str | None) -> list[ModelInfo]:
-    """Discover spawnable models and filter stale/deprecated entries."""
-    discovered = discover_models()
-    runtime_models = get_runtime_available_model_strings(opencode_binary)
+def _available_models(ls: dict[str, Any]) -> list[ModelInfo]:
+    """Spawnable models from the session's catalog, without waiting on a refresh."""
+    catalog: ModelCatalog = ls["model_catalog"]
+    return catalog.get()
 
-    # If runtime enumeration failed, fall back to discovered config models.
-    runtime_filter = runtime_models if runtime_models else None
-    return filter_models(
-        discovered,
-        runtime_available=runtime_filter,
-        include_deprecated=False,
-    )
+
+MODEL_REFRESH_CHECK_INTERVAL = 2.0
+
+
+async def _model_refresher(
+    catalog: ModelCatalog,
+    executors: ToolExecutors,
+    interval: float = MODEL_REFRESH_CHECK_INTERVAL,
+) -> None:
+    """Rediscover models once the catalog is past its TTL or a config changed."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if catalog.is_stale():
+                models = await executors.run(SUBPROCESS, catalog.refresh)
+                _log_activity(
+                    f"MODELS REFRESHED: {len(models)} models in {catalog.refresh_seconds:.2f}s"
+                )
+        except Exception as e:  # keep refreshing on transient errors
+            _log_activity(f"MODEL REFRESH ERROR: {type(e).__name__}: {e}")
+
+
+LEASE_REAP_INTERVAL = 30.0
+
+
+async def _lease_reaper(
+    state: dict[str, Any], executors: ToolExecutors, interval: float = LEASE_REAP_INTERVAL
+) -> None:
+    """Requeue tasks of the session's team whose claim lease expired."""
+    while True:
+        await asyncio.sleep(interval)
+        team = state.get("active_team")
+        if not team:
+            continue
+        try:
+            requeued = await executors.run(DISK, tasks.expire_leases, team)
+        except Exception as e:  # keep reaping on transient errors
+            _log_activity(f"LEASE REAPER ERROR: {type(e).__name__}: {e}")
+            continue
+        for task in requeued:
+            _log_activity(
+                f"LEASE EXPIRED: team={team} task={task.id} owner={task.owner} - requeued"
+            )
 
 
-def _refresh_available_models(ls: dict[str, Any]) -> list[ModelInfo]:
-    """Refresh model list from current config/runtime."""
-    models = _discover_available_models(ls.get("opencode_binary"))
-    ls["available_models"] = models
-    return models
+MEMORY_SNAPSHOT_INTERVAL = 30.0
+
+
+async def _memory_snapshots(
+    memory: MemoryDatabase,
+    path: Path,
+    executors: ToolExecutors,
+    interval: float = MEMORY_SNAPSHOT_INTERVAL,
+) -> None:
+    """Periodically copy the in-memory state database to *path*."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await executors.run(DISK, memory.save_snapshot, path)
+        except Exception as e:  # keep snapshotting on transient errors
+            _log_activity(f"SNAPSHOT ERROR: {type(e).__name__}: {e}")
 
 
 @lifespan
@@ -76,9 +125,10 @@ async def app_lifespan(server):
 
     _log_activity("SERVER STARTING - lifespan begin")
 
+    executors = ToolExecutors()
     opencode_binary = None
     try:
-        opencode_binary = discover_opencode_binary()
+        opencode_binary = await executors.run(SUBPROCESS, discover_opencode_binary)
         _log_activity(f"OpenCode binary found: {opencode_binary}")
     except (FileNotFoundError, RuntimeError) as e:
         # Log but don't fail - the error will be reported when tools are called
@@ -86,7 +136,8 @@ async def app_lifespan(server):
         _log_activity(f"OpenCode binary not found: {e}")
 
     # Discover available models from OpenCode config/runtime
-    available_models = _discover_available_models(opencode_binary)
+    model_catalog = ModelCatalog(opencode_binary)
+    available_models = await executors.run(SUBPROCESS, model_catalog.refresh)
     if not available_models:
         logger.warning(
             "No models found in OpenCode config. "
@@ -97,16 +148,50 @@ async def app_lifespan(server):
         _log_activity(f"Discovered {len(available_models)} models")
 
     session_id = str(uuid.uuid4())
+    # This server's own state under OPENCODE_TEAMS_STORAGE=memory. Deliveries
+    # to it wake poll_inbox directly, so the watcher needs no files.
+    memory = open_memory()
+    inbox_watcher = InboxWatcher(watch_files=memory is None)
+    if memory is not None:
+        loop = asyncio.get_running_loop()
+        memory.on_delivery = functools.partial(
+            loop.call_soon_threadsafe, inbox_watcher.notify
+        )
     _log_activity(f"SERVER READY - session_id={session_id}")
-    try:
-        yield {
-            "opencode_binary": opencode_binary,
-            "session_id": session_id,
-            "active_team": None,
-            "available_models": available_models,
-        }
-    finally:
-        _log_activity("SERVER SHUTTING DOWN - lifespan end")
+    state: dict[str, Any] = {
+        "opencode_binary": opencode_binary,
+        "session_id": session_id,
+        "active_team": None,
+        "model_catalog": model_catalog,
+        "inbox_watcher": inbox_watcher,
+        "executors": executors,
+    }
+    with use_memory(memory) if memory is not None else contextlib.nullcontext():
+        # Started inside the block, so they and every tool call see memory.
+        reaper = asyncio.create_task(_lease_reaper(state, executors))
+        refresher = asyncio.create_task(_model_refresher(model_catalog, executors))
+        snapshot_file = snapshot_path() if memory is not None else None
+        snapshots = (
+            asyncio.create_task(_memory_snapshots(memory, snapshot_file, executors))
+            if snapshot_file
+            else None
+        )
+        try:
+            yield state
+        finally:
+            reaper.cancel()
+            refresher.cancel()
+            if snapshots is not None:
+                snapshots.cancel()
+                # Synchronous: an await here can be cancelled along with the
+                # lifespan, and nothing else runs on the loop during shutdown.
+                memory.save_snapshot(snapshot_file)
+            inbox_watcher.close()
+            executors.shutdown()
+            if memory is not None:
+                memory.on_delivery = None
+                memory.close()
+            _log_activity("SERVER SHUTTING DOWN - lifespan end")
 
 
 mcp = FastMCP(
@@ -129,7 +214,7 @@ Do NOT create your own coordination frameworks or agent patterns.
 
 ### Model Discovery
 - `list_available_models(provider?, reasoning_effort?)` — List currently available, spawnable models.
-  - Refreshed on every call from current config/runtime.
+  - Cached; refreshed in the background when opencode.json changes and every few minutes.
   - Deprecated aliases (like `google/antigravity-*`) are excluded.
 
 ### Agent Spawning
@@ -151,14 +236,22 @@ Do NOT create your own coordination frameworks or agent patterns.
 
 ### Messaging
 - `send_message(team_name, type, recipient, content, summary, sender)` — Send messages.
-- `read_inbox(team_name, agent_name)` — Read an agent's inbox.
+- `read_inbox(team_name, agent_name, since_seq?, limit?, from_?, message_types?)` — Read an agent's inbox, optionally filtered/paged.
 - `poll_inbox(team_name, agent_name, timeout_ms)` — Long-poll for new messages.
+- `inbox_history(team_name, agent_name, since_seq?, limit?)` — Page through archived (old, read) messages.
+- `topic_subscribe(team_name, agent_name, topic)` / `topic_unsubscribe(...)` — Manage an agent's topic subscriptions.
+- `topic_publish(team_name, topic, content, summary, sender)` — Send to a topic's subscribers only (cheaper than broadcast).
 
 ### Task Tracking
 - `task_create(team_name, subject, description)` — Create a task.
+- `task_create_batch(team_name, items)` — Create many tasks with dependencies (by `ref`) in one call.
 - `task_update(team_name, task_id, status, owner, ...)` — Update a task.
-- `task_list(team_name)` — List all tasks.
+- `task_list(team_name, status?, owner?, ready_only?, limit?, cursor?, fields?)` — List tasks; filter, page and project (e.g. `fields=["id","subject","status","owner"]`) to keep responses small.
+- `claim_next_task(team_name, agent_name, metadata?)` — Atomically take the next ready task (priority, then FIFO).
+- `task_heartbeat(team_name, agent_name)` — Renew an agent's task leases; expired claims are requeued automatically.
 - `task_get(team_name, task_id)` — Get task details.
+- `task_changes(team_name, since_seq?)` — Poll task changes since a seq instead of re-listing.
+- `tasks_by_owner(team_name, owner?, status?)` — Owned tasks grouped by agent (workload view).
 
 ## Workflow
 1. `list_available_models` — get exact model strings for this run
@@ -180,12 +273,28 @@ def _get_lifespan(ctx: Context) -> dict[str, Any]:
     return ctx.lifespan_context
 
 
+def _blocking(category: str):
+    """Make a blocking tool body async by running it on the lifespan's
+    *category* pool (see ``executors``)."""
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        async def run(*args, **kwargs):
+            executors: ToolExecutors = get_context().lifespan_context["executors"]
+            return await executors.run(category, fn, *args, **kwargs)
+
+        return run
+
+    return decorate
+
+
 @mcp.tool
+@_blocking(DISK)
 def server_status(ctx: Context) -> dict:
     """Check MCP server health. Returns session info, active team, and server version.
     Use this tool to verify the MCP connection is working correctly."""
     ls = _get_lifespan(ctx)
-    models = _refresh_available_models(ls)
+    models = _available_models(ls)
     return {
         "status": "ok",
         "server": "opencode-teams",
@@ -193,10 +302,14 @@ def server_status(ctx: Context) -> dict:
         "active_team": ls.get("active_team"),
         "opencode_binary": ls.get("opencode_binary") or "not found",
         "available_models_count": len(models),
+        "model_cache": ls["model_catalog"].stats(),
+        "inbox_cache": messaging.inbox_cache_stats(),
+        "executors": ls["executors"].stats(),
     }
 
 
 @mcp.tool
+@_blocking(DISK)
 def list_available_models(
     ctx: Context,
     provider: str | None = None,
@@ -204,7 +317,8 @@ def list_available_models(
 ) -> list[dict]:
     """List spawnable models from current OpenCode config/runtime.
 
-    Models are refreshed on every call and filtered to avoid stale/deprecated aliases.
+    Models come from a cache that is refreshed in the background when opencode.json
+    changes and every few minutes, and are filtered to avoid stale/deprecated aliases.
     Use this to get exact model strings accepted by spawn_teammate.
 
     Args:
@@ -215,7 +329,7 @@ def list_available_models(
         List of model info dicts with provider, modelId, name, contextWindow, etc.
     """
     ls = _get_lifespan(ctx)
-    models = _refresh_available_models(ls)
+    models = _available_models(ls)
 
     # Apply filters
     filtered = models
@@ -228,6 +342,7 @@ def list_available_models(
 
 
 @mcp.tool
+@_blocking(DISK)
 def team_create(
     team_name: str,
     ctx: Context,
@@ -252,6 +367,7 @@ def team_create(
 
 
 @mcp.tool
+@_blocking(DISK)
 def team_delete(team_name: str, ctx: Context) -> dict:
     """Delete a team and all its data. Fails if any teammates are still active.
     Removes both team config and task directories."""
@@ -264,6 +380,7 @@ def team_delete(team_name: str, ctx: Context) -> dict:
 
 
 @mcp.tool(name="spawn_teammate")
+@_blocking(SUBPROCESS)
 def spawn_teammate_tool(
     team_name: str,
     name: str,
@@ -311,6 +428,14 @@ def spawn_teammate_tool(
     _log_activity(
         f"TOOL CALL: spawn_teammate team={team_name} name={name} model={model}"
     )
+    if engine_name() == "memory":
+        # A teammate's own server cannot reach this server's database and
+        # would fall back to the JSON files, never seeing its inbox.
+        raise ToolError(
+            "Cannot spawn teammates with OPENCODE_TEAMS_STORAGE=memory: the state "
+            "lives in this server process only. Run `opencode-teams-daemon --storage "
+            "memory` and set OPENCODE_TEAMS_STORAGE=remote to share in-memory state."
+        )
     ls = _get_lifespan(ctx)
     opencode_binary = ls.get("opencode_binary")
     if opencode_binary is None:
@@ -329,7 +454,7 @@ def spawn_teammate_tool(
             prefer_speed=prefer_speed,
         )
     preference = infer_model_preference(prompt, explicit=explicit_pref)
-    available_models = _refresh_available_models(ls)
+    available_models = _available_models(ls)
 
     try:
         resolved_model = resolve_model_string(
@@ -372,10 +497,7 @@ def spawn_teammate_tool(
 
     # Backfill project_dir on team config if not already set (pre-existing teams)
     try:
-        config = teams.read_config(team_name)
-        if config.project_dir is None:
-            config.project_dir = str(Path.cwd())
-            teams.write_config(team_name, config)
+        teams.set_default_project_dir(team_name, Path.cwd())
     except Exception:
         pass  # Best effort
 
@@ -403,6 +525,7 @@ def spawn_teammate_tool(
 
 
 @mcp.tool
+@_blocking(DISK)
 def send_message(
     team_name: str,
     type: Literal[
@@ -468,21 +591,19 @@ def send_message(
         if not summary:
             raise ToolError("Broadcast summary must not be empty")
         config = teams.read_config(team_name)
-        count = 0
-        for m in config.members:
-            if isinstance(m, TeammateMember):
-                messaging.send_plain_message(
-                    team_name,
-                    "team-lead",
-                    m.name,
-                    content,
-                    summary=summary,
-                    color=None,
-                )
-                count += 1
+        recipients = [m.name for m in config.members if isinstance(m, TeammateMember)]
+        delivery = messaging.broadcast(
+            team_name,
+            "team-lead",
+            recipients,
+            content,
+            summary=summary,
+        )
+        count = sum(1 for status in delivery.values() if status == "delivered")
         return SendMessageResult(
-            success=True,
+            success=count == len(recipients),
             message=f"Broadcast sent to {count} teammate(s)",
+            routing={"sender": "team-lead", "delivery": delivery},
         ).model_dump(exclude_none=True)
 
     elif type == "shutdown_request":
@@ -573,6 +694,7 @@ def send_message(
 
 
 @mcp.tool
+@_blocking(DISK)
 def task_create(
     team_name: str,
     subject: str,
@@ -590,6 +712,25 @@ def task_create(
 
 
 @mcp.tool
+@_blocking(DISK)
+def task_create_batch(team_name: str, items: list[TaskSpec]) -> dict:
+    """Create many tasks at once, wiring dependencies in the same call.
+    Give entries a `ref` and list other refs (or existing task ids) in
+    `blockedBy`. The whole batch is validated (including cycle detection)
+    before anything is written. Returns the assigned ids in input order and
+    the ref -> id mapping."""
+    try:
+        created = tasks.create_tasks(team_name, items)
+    except ValueError as e:
+        raise ToolError(str(e))
+    return {
+        "ids": [t.id for t in created],
+        "refs": {spec.ref: t.id for spec, t in zip(items, created) if spec.ref is not None},
+    }
+
+
+@mcp.tool
+@_blocking(DISK)
 def task_update(
     team_name: str,
     task_id: str,
@@ -628,16 +769,112 @@ def task_update(
 
 
 @mcp.tool
-def task_list(team_name: str) -> list[dict]:
-    """List all tasks for a team with their current status and assignments."""
+@_blocking(DISK)
+def claim_next_task(team_name: str, agent_name: str, metadata: dict | None = None) -> dict:
+    """Claim the next ready task for an agent: pending, unowned and with all
+    blockers completed. Highest metadata `priority` first (a number, or
+    low/normal/high/urgent), then oldest. The task is set to in_progress and
+    owned by the agent atomically, so agents never race for the same task.
+    Optional `metadata` only matches tasks whose metadata has those values.
+    Returns {"task": null} when nothing is ready."""
+    try:
+        task = tasks.claim_next_task(team_name, agent_name, metadata)
+    except ValueError as e:
+        raise ToolError(str(e))
+    return {"task": task.model_dump(by_alias=True, exclude_none=True) if task else None}
+
+
+@mcp.tool
+@_blocking(DISK)
+def task_heartbeat(team_name: str, agent_name: str) -> dict:
+    """Renew the claim lease on every in_progress task the agent owns. Claims
+    that go un-renewed (no heartbeat or task_update from the owner) for the
+    lease period are requeued as pending for other agents."""
+    renewed = tasks.renew_leases(team_name, agent_name)
+    return {
+        "renewed": [t.id for t in renewed],
+        "leaseExpiresAt": renewed[0].lease_expires_at if renewed else None,
+    }
+
+
+@mcp.tool
+@_blocking(DISK)
+def task_list(
+    team_name: str,
+    status: Literal["pending", "in_progress", "completed"] | None = None,
+    owner: str | None = None,
+    ready_only: bool = False,
+    limit: int | None = None,
+    cursor: str | None = None,
+    fields: list[str] | None = None,
+) -> list[dict] | dict:
+    """List a team's tasks in id order. Filter by `status`, `owner`, or
+    `ready_only` (claimable: pending, unowned, blockers done). `fields`
+    projects each task, e.g. ["id", "subject", "status", "owner"]; those,
+    blocks, blockedBy and leaseExpiresAt are answered without reading task
+    files. With `limit` or `cursor` the result is {"tasks", "next_cursor"};
+    pass next_cursor back to get the following page (null when done)."""
+    if limit is not None and limit < 1:
+        raise ToolError("limit must be at least 1")
+    try:
+        page, next_cursor = tasks.query_tasks(
+            team_name,
+            status=status,
+            owner=owner,
+            ready_only=ready_only,
+            limit=limit,
+            cursor=cursor,
+            fields=fields,
+        )
+    except ValueError as e:
+        raise ToolError(str(e))
+    if limit is None and cursor is None:
+        return page
+    return {"tasks": page, "next_cursor": next_cursor}
+
+
+@mcp.tool
+@_blocking(DISK)
+def task_changes(team_name: str, since_seq: int = 0, limit: int | None = None) -> dict:
+    """Poll for task changes instead of re-listing every task. Returns
+    {"changes": [...], "seq": N}; each change has its `seq`, `ts`, `action`
+    (create/update/delete/claim/reset/renew/expire), the full new contents
+    of every task it wrote in `tasks`, and deleted ids in `removed`. Pass
+    `seq` back as since_seq for the next call. If the changes since
+    since_seq are no longer kept (or since_seq is 0 on a team with
+    history), the result also has "tasks": the whole current task list to
+    start from."""
+    if limit is not None and limit < 1:
+        raise ToolError("limit must be at least 1")
+    try:
+        changes, seq, snapshot = tasks.task_changes(team_name, since_seq, limit)
+    except ValueError as e:
+        raise ToolError(str(e))
+    result: dict[str, Any] = {"changes": changes, "seq": seq}
+    if snapshot is not None:
+        result["tasks"] = snapshot
+    return result
+
+
+@mcp.tool
+@_blocking(DISK)
+def tasks_by_owner(
+    team_name: str,
+    owner: str | None = None,
+    status: Literal["pending", "in_progress", "completed"] | None = None,
+) -> dict:
+    """Per-agent workload view: owned tasks grouped by owner, each as
+    {"id", "subject", "status"} (plus leaseExpiresAt while claimed). Pass
+    `owner` for a single agent and `status` (e.g. "in_progress") to keep
+    only tasks in that state. Unowned tasks are not included."""
     try:
-        result = tasks.list_tasks(team_name)
+        return tasks.tasks_by_owner(team_name, owner, status)
     except ValueError as e:
         raise ToolError(str(e))
-    return [t.model_dump(by_alias=True, exclude_none=True) for t in result]
 
 
 @mcp.tool
+@_blocking(DISK)
 def task_get(team_name: str, task_id: str) -> dict:
     """Get full details of a specific task by ID."""
     try:
@@ -647,22 +884,125 @@ def task_get(team_name: str, task_id: str) -> dict:
     return task.model_dump(by_alias=True, exclude_none=True)
 
 
+def _inbox_response(
+    page: list[tuple[int, dict]], next_seq: int | None, paged: bool
+) -> list[dict] | dict:
+    if not paged:
+        return [entry for _seq, entry in page]
+    return {
+        "messages": [dict(entry, seq=seq) for seq, entry in page],
+        "next_since_seq": next_seq,
+    }
+
+
 @mcp.tool
+@_blocking(DISK)
 def read_inbox(
     team_name: str,
     agent_name: str,
     unread_only: bool = False,
     mark_as_read: bool = True,
-) -> list[dict]:
+    since_seq: int | None = None,
+    limit: int | None = None,
+    from_: str | None = None,
+    message_types: list[str] | None = None,
+) -> list[dict] | dict:
     """Read messages from an agent's inbox. Returns all messages by default.
-    Set unread_only=True to get only unprocessed messages."""
-    msgs = messaging.read_inbox(
-        team_name, agent_name, unread_only=unread_only, mark_as_read=mark_as_read
+    Set unread_only=True to get only unprocessed messages.
+
+    Selectors: `from_` keeps one sender; `message_types` keeps structured
+    message types (e.g. ["shutdown_approved", "task_assignment"]; "message"
+    means plain text). When `since_seq` or `limit` is given the result is a
+    page: {"messages": [... each with "seq"], "next_since_seq": N or null};
+    pass next_since_seq back as since_seq to continue."""
+    if limit is not None and limit < 1:
+        raise ToolError("limit must be at least 1")
+    page, next_seq = messaging.query_inbox_raw(
+        team_name,
+        agent_name,
+        unread_only=unread_only,
+        mark_as_read=mark_as_read,
+        since_seq=since_seq,
+        limit=limit,
+        from_=from_,
+        message_types=message_types,
+    )
+    return _inbox_response(page, next_seq, since_seq is not None or limit is not None)
+
+
+@mcp.tool
+@_blocking(DISK)
+def inbox_history(
+    team_name: str,
+    agent_name: str,
+    since_seq: int = 0,
+    limit: int = 50,
+    day: str | None = None,
+) -> dict:
+    """Page through an agent's archived inbox messages (old read messages that
+    compaction moved out of the live inbox). Messages carry a `seq`; pass the
+    returned `next_since_seq` back as `since_seq` for the next page (null when
+    there are no more). Optionally restrict to one archive day (YYYY-MM-DD)."""
+    if limit < 1:
+        raise ToolError("limit must be at least 1")
+    page, next_seq = messaging.read_inbox_history(
+        team_name, agent_name, since_seq=since_seq, limit=limit, day=day
     )
-    return [m.model_dump(by_alias=True, exclude_none=True) for m in msgs]
+    return {"messages": page, "next_since_seq": next_seq}
+
+
+@mcp.tool
+@_blocking(DISK)
+def topic_subscribe(team_name: str, agent_name: str, topic: str) -> dict:
+    """Subscribe an agent to a topic so it receives messages published to it
+    with topic_publish. Returns the agent's subscriptions."""
+    try:
+        subs = teams.subscribe_topic(team_name, agent_name, topic)
+    except ValueError as e:
+        raise ToolError(str(e))
+    return {"agent": agent_name, "subscriptions": subs}
+
+
+@mcp.tool
+@_blocking(DISK)
+def topic_unsubscribe(team_name: str, agent_name: str, topic: str) -> dict:
+    """Stop delivering a topic's messages to an agent. Returns the agent's
+    remaining subscriptions."""
+    try:
+        subs = teams.unsubscribe_topic(team_name, agent_name, topic)
+    except ValueError as e:
+        raise ToolError(str(e))
+    return {"agent": agent_name, "subscriptions": subs}
+
+
+@mcp.tool
+@_blocking(DISK)
+def topic_publish(
+    team_name: str,
+    topic: str,
+    content: str,
+    summary: str,
+    sender: str = "team-lead",
+) -> dict:
+    """Publish a message to every agent subscribed to a topic (the sender is
+    skipped). Use this instead of a broadcast for updates only some teammates
+    care about. Messages carry the topic in their `topic` field."""
+    if not summary:
+        raise ToolError("Publish summary must not be empty")
+    try:
+        delivery = messaging.publish(team_name, sender, topic, content, summary=summary)
+    except ValueError as e:
+        raise ToolError(str(e))
+    count = sum(1 for status in delivery.values() if status == "delivered")
+    return SendMessageResult(
+        success=count == len(delivery),
+        message=f"Published to {count} subscriber(s) of {topic!r}",
+        routing={"sender": sender, "topic": topic, "delivery": delivery},
+    ).model_dump(exclude_none=True)
 
 
 @mcp.tool
+@_blocking(DISK)
 def read_config(team_name: str) -> dict:
     """Read the current team configuration including all members."""
     try:
@@ -673,6 +1013,7 @@ def read_config(team_name: str) -> dict:
 
 
 @mcp.tool
+@_blocking(SUBPROCESS)
 def force_kill_teammate(team_name: str, agent_name: str) -> dict:
     """Forcibly kill a teammate. For tmux backend, kills the tmux pane.
     For desktop backend, terminates the desktop process. Removes member
@@ -704,28 +1045,56 @@ def force_kill_teammate(team_name: str, agent_name: str) -> dict:
 async def poll_inbox(
     team_name: str,
     agent_name: str,
+    ctx: Context,
     timeout_ms: int = 30000,
-) -> list[dict]:
+    since_seq: int | None = None,
+    limit: int | None = None,
+    from_: str | None = None,
+    message_types: list[str] | None = None,
+) -> list[dict] | dict:
     """Poll an agent's inbox for new unread messages, waiting up to timeout_ms.
-    Returns unread messages and marks them as read. Convenience tool for MCP
-    clients that cannot watch the filesystem."""
-    msgs = messaging.read_inbox(
-        team_name, agent_name, unread_only=True, mark_as_read=True
-    )
-    if msgs:
-        return [m.model_dump(by_alias=True, exclude_none=True) for m in msgs]
-    deadline = time.time() + timeout_ms / 1000.0
-    while time.time() < deadline:
-        await asyncio.sleep(0.5)
-        msgs = messaging.read_inbox(
-            team_name, agent_name, unread_only=True, mark_as_read=True
-        )
-        if msgs:
-            return [m.model_dump(by_alias=True, exclude_none=True) for m in msgs]
-    return []
+    Returns unread messages and marks them as read. Returns as soon as a
+    message arrives (the server watches the inbox file), so prefer this over
+    calling read_inbox in a loop. Accepts the same selectors as read_inbox;
+    only matching messages end the wait."""
+    if limit is not None and limit < 1:
+        raise ToolError("limit must be at least 1")
+    ls = _get_lifespan(ctx)
+    watcher: InboxWatcher = ls["inbox_watcher"]
+    executors: ToolExecutors = ls["executors"]
+    # Under the remote engine this is a round trip to the state daemon.
+    path = await executors.run(DISK, messaging.inbox_path, team_name, agent_name)
+    paged = since_seq is not None or limit is not None
+    deadline = time.monotonic() + timeout_ms / 1000.0
+    while True:
+        # Subscribe before reading so an append between the read and the
+        # wait still wakes us.
+        ticket = watcher.subscribe(path)
+        try:
+            page, next_seq = await executors.run(
+                DISK,
+                messaging.query_inbox_raw,
+                team_name,
+                agent_name,
+                unread_only=True,
+                mark_as_read=True,
+                since_seq=since_seq,
+                limit=limit,
+                from_=from_,
+                message_types=message_types,
+            )
+            if page:
+                return _inbox_response(page, next_seq, paged)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return _inbox_response([], None, paged)
+            await watcher.wait(ticket, remaining)
+        finally:
+            watcher.unsubscribe(path, ticket)
 
 
 @mcp.tool
+@_blocking(DISK)
 def process_shutdown_approved(team_name: str, agent_name: str) -> dict:
     """Process a teammate's shutdown by removing them from config and resetting
     their tasks. Call this after confirming shutdown_approved in the lead inbox."""
@@ -739,6 +1108,7 @@ def process_shutdown_approved(team_name: str, agent_name: str) -> dict:
 
 
 @mcp.tool
+@_blocking(SUBPROCESS)
 def check_agent_health(
     team_name: str,
     agent_name: str,
@@ -786,6 +1156,7 @@ def check_agent_health(
 
 
 @mcp.tool
+@_blocking(SUBPROCESS)
 def check_all_agents_health(
     team_name: str,
 ) -> list[dict]:
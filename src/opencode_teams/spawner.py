@@ -13,7 +13,8 @@ import sys
 import time
 from pathlib import Path
 
-from opencode_teams import messaging, teams
+from opencode_teams._fileio import atomic_write
+from opencode_teams.storage import messaging, server_env, teams
 from opencode_teams.config_gen import (
     cleanup_agent_config,
     generate_agent_config,
@@ -186,7 +187,11 @@ def spawn_teammate(
             custom_instructions=custom_instructions,
         )
         write_agent_config(project, name, config_content)
-        ensure_opencode_json(project, mcp_server_command="uv run opencode-teams")
+        ensure_opencode_json(
+            project,
+            mcp_server_command="uv run opencode-teams",
+            mcp_server_env=server_env() or None,
+        )
 
         if backend_type == "desktop":
             if not desktop_binary:
@@ -194,23 +199,16 @@ def spawn_teammate(
                     "desktop_binary is required when backend_type='desktop'"
                 )
             pid = launch_desktop_app(desktop_binary, member.cwd)
-            config = teams.read_config(team_name, base_dir)
-            for m in config.members:
-                if isinstance(m, TeammateMember) and m.name == name:
-                    m.process_id = pid
-                    m.backend_type = "desktop"
-                    break
-            teams.write_config(team_name, config, base_dir)
+            teams.update_member(
+                team_name, name, base_dir=base_dir, process_id=pid, backend_type="desktop"
+            )
             member.process_id = pid
         elif backend_type == "windows_terminal":
             pid = spawn_windows_terminal(member, opencode_binary, auto_close=auto_close)
-            config = teams.read_config(team_name, base_dir)
-            for m in config.members:
-                if isinstance(m, TeammateMember) and m.name == name:
-                    m.process_id = pid
-                    m.backend_type = "windows_terminal"
-                    break
-            teams.write_config(team_name, config, base_dir)
+            teams.update_member(
+                team_name, name, base_dir=base_dir,
+                process_id=pid, backend_type="windows_terminal",
+            )
             member.process_id = pid
         else:
             cmd = build_opencode_run_command(member, opencode_binary)
@@ -221,12 +219,7 @@ def spawn_teammate(
                 check=True,
             )
             pane_id = result.stdout.strip()
-            config = teams.read_config(team_name, base_dir)
-            for m in config.members:
-                if isinstance(m, TeammateMember) and m.name == name:
-                    m.tmux_pane_id = pane_id
-                    break
-            teams.write_config(team_name, config, base_dir)
+            teams.update_member(team_name, name, base_dir=base_dir, tmux_pane_id=pane_id)
             member.tmux_pane_id = pane_id
 
     except Exception:
@@ -449,7 +442,8 @@ def save_health_state(
     teams_dir = (base_dir / "teams") if base_dir else teams.TEAMS_DIR
     health_path = teams_dir / team_name / "health.json"
     health_path.parent.mkdir(parents=True, exist_ok=True)
-    health_path.write_text(json.dumps(state, indent=2))
+    # Atomic: health checks run concurrently and must never read half a file.
+    atomic_write(health_path, json.dumps(state, indent=2).encode())
 
 
 def check_single_agent_health(
@@ -0,0 +1,6 @@
+"""SQLite storage engine.
+
+``teams``, ``tasks`` and ``messaging`` here mirror the public functions of
+the JSON-file modules of the same names over one database; select the
+engine with ``opencode_teams.storage``.
+"""
@@ -0,0 +1,257 @@
+"""Connections and schema of the SQLite storage engine.
+
+One database file holds every team: ``<base_dir>/state.db`` when a
+``base_dir`` is passed (as the JSON engine's functions accept), otherwise
+``$OPENCODE_TEAMS_DB`` or ``~/.opencode-teams/state.db``. The database runs
+in WAL mode, so readers never wait for the writer, and each thread keeps
+its own connection. Writes go through ``transaction``, which takes the
+write lock up front (``BEGIN IMMEDIATE``) and so serializes writers across
+processes the way the JSON engine's lock files do; reads go through
+``snapshot``.
+
+A ``MemoryDatabase`` holds the same schema in an in-process ``:memory:``
+database instead, for the ``memory`` engine. Each instance is its own
+state: whoever opens one (a server, the daemon, a test) runs its calls
+against it inside ``use_memory``, and ``connect``, ``transaction`` and
+``snapshot`` then use it in place of any file. Every thread shares its one
+connection, so ``transaction`` and ``snapshot`` also take its lock.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+STORAGE_ENV = "OPENCODE_TEAMS_STORAGE"
+DB_ENV = "OPENCODE_TEAMS_DB"
+SNAPSHOT_ENV = "OPENCODE_TEAMS_SNAPSHOT"
+DEFAULT_DB = Path.home() / ".opencode-teams" / "state.db"
+
+# Writers wait this long for the write lock before giving up.
+BUSY_TIMEOUT_SECONDS = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS teams (
+    name TEXT PRIMARY KEY,
+    config TEXT NOT NULL,
+    next_task_id INTEGER NOT NULL DEFAULT 1,
+    event_seq INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    team TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    subject TEXT NOT NULL,
+    status TEXT NOT NULL,
+    owner TEXT,
+    priority REAL NOT NULL DEFAULT 0,
+    lease_expires_at INTEGER,
+    data TEXT NOT NULL,
+    PRIMARY KEY (team, id)
+);
+CREATE INDEX IF NOT EXISTS tasks_by_status ON tasks (team, status);
+CREATE INDEX IF NOT EXISTS tasks_by_owner ON tasks (team, owner);
+CREATE INDEX IF NOT EXISTS tasks_by_lease ON tasks (team, lease_expires_at)
+    WHERE lease_expires_at IS NOT NULL;
+
+-- One row per entry of a task's blocks / blockedBy list.
+CREATE TABLE IF NOT EXISTS task_edges (
+    team TEXT NOT NULL,
+    task INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    other INTEGER NOT NULL,
+    PRIMARY KEY (team, task, kind, other)
+);
+CREATE INDEX IF NOT EXISTS task_edges_by_other ON task_edges (team, other, kind);
+
+CREATE TABLE IF NOT EXISTS task_events (
+    team TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (team, seq)
+);
+
+CREATE TABLE IF NOT EXISTS inboxes (
+    team TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    last_seq INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (team, agent)
+);
+
+CREATE TABLE IF NOT EXISTS messages (
+    team TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    sender TEXT,
+    type TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    read INTEGER NOT NULL DEFAULT 0,
+    archived INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL,
+    PRIMARY KEY (team, agent, seq)
+);
+CREATE INDEX IF NOT EXISTS messages_unread ON messages (team, agent, seq)
+    WHERE read = 0;
+CREATE INDEX IF NOT EXISTS messages_live ON messages (team, agent, seq)
+    WHERE archived = 0;
+"""
+
+
+def db_path(base_dir: Path | None = None) -> Path:
+    if base_dir:
+        return base_dir / "state.db"
+    env = os.environ.get(DB_ENV)
+    return Path(env) if env else DEFAULT_DB
+
+
+def snapshot_path() -> Path | None:
+    env = os.environ.get(SNAPSHOT_ENV)
+    return Path(env) if env else None
+
+
+def ring_doorbell(path: Path) -> None:
+    """Rewrite an inbox's doorbell file, waking whoever watches it."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"1")
+
+
+_local = threading.local()
+
+
+def _open(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(
+        path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None, check_same_thread=False
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class MemoryDatabase:
+    """One in-process database, optionally starting from a snapshot file.
+
+    There are no doorbell files: after each delivery commits, the engine
+    calls ``on_delivery`` (when set) with the inbox's ``inbox_path``, and
+    the owner wakes its waiters from there.
+    """
+
+    def __init__(self, restore_from: Path | None = None) -> None:
+        self.conn = sqlite3.connect(":memory:", isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        if restore_from is not None and restore_from.exists():
+            disk = sqlite3.connect(restore_from)
+            try:
+                disk.backup(self.conn)
+            finally:
+                disk.close()
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.RLock()
+        self.on_delivery: Callable[[Path], None] | None = None
+
+    def save_snapshot(self, path: Path) -> None:
+        """Copy the database to *path*, replacing it atomically."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.unlink(missing_ok=True)
+        with self.lock:
+            disk = sqlite3.connect(tmp)
+            try:
+                self.conn.backup(disk)
+            finally:
+                disk.close()
+        os.replace(tmp, path)
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+_memory: ContextVar[MemoryDatabase | None] = ContextVar("opencode_teams_memory", default=None)
+
+
+def active_memory() -> MemoryDatabase | None:
+    """The in-memory database this context runs against, if any."""
+    return _memory.get()
+
+
+@contextmanager
+def use_memory(database: MemoryDatabase) -> Iterator[MemoryDatabase]:
+    """Run the block against *database* instead of the database files.
+
+    Tasks and pool threads started with a copy of the block's context
+    (``ToolExecutors.run``, ``asyncio.to_thread``) use it too.
+    """
+    token = _memory.set(database)
+    try:
+        yield database
+    finally:
+        _memory.reset(token)
+
+
+def connect(base_dir: Path | None = None) -> sqlite3.Connection:
+    """This thread's connection to the database for *base_dir*."""
+    memory = _memory.get()
+    if memory is not None:
+        return memory.conn
+    path = db_path(base_dir)
+    conns: dict[Path, sqlite3.Connection] = _local.__dict__.setdefault("conns", {})
+    conn = conns.get(path)
+    if conn is None:
+        conn = conns[path] = _open(path)
+    return conn
+
+
+@contextmanager
+def _exclusive(base_dir: Path | None) -> Iterator[sqlite3.Connection]:
+    """The connection, held exclusively when it is a shared in-memory one."""
+    memory = _memory.get()
+    if memory is None:
+        yield connect(base_dir)
+        return
+    with memory.lock:
+        yield memory.conn
+
+
+@contextmanager
+def transaction(base_dir: Path | None = None) -> Iterator[sqlite3.Connection]:
+    """Run the block as one write transaction; nested blocks join the outer one."""
+    with _exclusive(base_dir) as conn:
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+@contextmanager
+def snapshot(base_dir: Path | None = None) -> Iterator[sqlite3.Connection]:
+    """Run several reads against one consistent view of the database."""
+    with _exclusive(base_dir) as conn:
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.execute("COMMIT")
+
+
+def close_all() -> None:
+    """Close this thread's connections (tests and import/export use this)."""
+    conns: dict[Path, sqlite3.Connection] = _local.__dict__.setdefault("conns", {})
+    for conn in conns.values():
+        conn.close()
+    conns.clear()
@@ -0,0 +1,473 @@
+"""Inboxes in SQLite, with the signatures of ``opencode_teams.messaging``.
+
+Every message is one row keyed by ``(team, agent, seq)``; the read mark and
+the archive flag are columns, so marking and compaction are single
+updates and the history is the archived rows. Waiters still watch a file:
+``inbox_path`` names a per-inbox doorbell next to the database that every
+delivery rewrites after its transaction commits. On a ``MemoryDatabase``
+nothing is written; the delivery goes to its ``on_delivery`` hook instead.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from opencode_teams import messaging as _json_messaging
+from opencode_teams.messaging import (
+    message_type,
+    now_iso,  # noqa: F401 - part of the messaging API
+    parse_timestamp,
+    plain_message,
+    shutdown_request,
+    structured_message,
+    task_assignment,
+)
+from opencode_teams.models import InboxMessage, TaskFile
+from opencode_teams.sqlite.db import (
+    active_memory,
+    db_path,
+    ring_doorbell,
+    snapshot,
+    transaction,
+)
+from opencode_teams.sqlite.teams import read_config
+
+
+def inbox_path(team_name: str, agent_name: str, base_dir: Path | None = None) -> Path:
+    """The doorbell file rewritten on every delivery to this inbox.
+
+    On a ``MemoryDatabase`` the path only names the inbox to waiters and
+    is never created.
+    """
+    return db_path(base_dir).parent / "doorbells" / team_name / agent_name
+
+
+def _ring(team_name: str, agent_name: str, base_dir: Path | None) -> None:
+    path = inbox_path(team_name, agent_name, base_dir)
+    memory = active_memory()
+    if memory is None:
+        ring_doorbell(path)
+    elif memory.on_delivery is not None:
+        memory.on_delivery(path)
+
+
+def ensure_inbox(team_name: str, agent_name: str, base_dir: Path | None = None) -> Path:
+    with transaction(base_dir) as conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO inboxes (team, agent) VALUES (?, ?)",
+            (team_name, agent_name),
+        )
+    path = inbox_path(team_name, agent_name, base_dir)
+    if active_memory() is None and not path.exists():
+        ring_doorbell(path)
+    return path
+
+
+def _query(
+    team_name: str,
+    agent_name: str,
+    *,
+    unread_only: bool,
+    mark_as_read: bool,
+    since_seq: int | None,
+    limit: int | None,
+    from_: str | None,
+    message_types: list[str] | None,
+    base_dir: Path | None,
+) -> tuple[list[tuple[int, dict, bool]], int | None]:
+    """Select live rows and mark them read; see ``messaging._query``."""
+    if limit is not None and limit < 1:
+        raise ValueError("limit must be at least 1")
+    with transaction(base_dir) as conn:
+        if conn.execute(
+            "SELECT 1 FROM inboxes WHERE team = ? AND agent = ?", (team_name, agent_name)
+        ).fetchone() is None:
+            return [], None
+        sql = (
+            "SELECT seq, read, data FROM messages"
+            " WHERE team = ? AND agent = ? AND archived = 0 AND seq > ?"
+        )
+        params: list = [team_name, agent_name, since_seq or 0]
+        if unread_only:
+            sql += " AND read = 0"
+        if from_ is not None:
+            sql += " AND sender = ?"
+            params.append(from_)
+        if message_types:
+            # Deliveries store message_type(entry) in the type column.
+            sql += f" AND type IN ({', '.join('?' * len(message_types))})"
+            params.extend(message_types)
+        sql += " ORDER BY seq"
+        if limit is not None:
+            # One extra row tells whether another page follows.
+            sql += " LIMIT ?"
+            params.append(limit + 1)
+
+        rows = conn.execute(sql, params).fetchall()
+        next_seq = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_seq = rows[-1]["seq"] if rows else None
+        selected = [(row["seq"], json.loads(row["data"]), bool(row["read"])) for row in rows]
+
+        advanced = False
+        if mark_as_read and selected:
+            unread = [(team_name, agent_name, seq) for seq, _e, read in selected if not read]
+            conn.executemany(
+                "UPDATE messages SET read = 1 WHERE team = ? AND agent = ? AND seq = ?", unread
+            )
+            advanced = bool(unread)
+            selected = [(seq, entry, True) for seq, entry, _read in selected]
+
+    if advanced and _needs_compaction(team_name, agent_name, base_dir):
+        compact_inbox(team_name, agent_name, base_dir=base_dir)
+    return selected, next_seq
+
+
+def query_inbox(
+    team_name: str,
+    agent_name: str,
+    *,
+    unread_only: bool = False,
+    mark_as_read: bool = True,
+    since_seq: int | None = None,
+    limit: int | None = None,
+    from_: str | None = None,
+    message_types: list[str] | None = None,
+    base_dir: Path | None = None,
+) -> tuple[list[tuple[int, InboxMessage]], int | None]:
+    """Read an inbox with optional paging and filters; see ``messaging.query_inbox``."""
+    selected, next_seq = _query(
+        team_name,
+        agent_name,
+        unread_only=unread_only,
+        mark_as_read=mark_as_read,
+        since_seq=since_seq,
+        limit=limit,
+        from_=from_,
+        message_types=message_types,
+        base_dir=base_dir,
+    )
+    result: list[tuple[int, InboxMessage]] = []
+    for seq, entry, is_read in selected:
+        msg = InboxMessage.model_validate(entry)
+        msg.read = is_read
+        result.append((seq, msg))
+    return result, next_seq
+
+
+def query_inbox_raw(
+    team_name: str,
+    agent_name: str,
+    *,
+    unread_only: bool = False,
+    mark_as_read: bool = True,
+    since_seq: int | None = None,
+    limit: int | None = None,
+    from_: str | None = None,
+    message_types: list[str] | None = None,
+    base_dir: Path | None = None,
+) -> tuple[list[tuple[int, dict]], int | None]:
+    """Like ``query_inbox`` but returns the stored alias-form dicts."""
+    selected, next_seq = _query(
+        team_name,
+        agent_name,
+        unread_only=unread_only,
+        mark_as_read=mark_as_read,
+        since_seq=since_seq,
+        limit=limit,
+        from_=from_,
+        message_types=message_types,
+        base_dir=base_dir,
+    )
+    return [(seq, dict(entry, read=is_read)) for seq, entry, is_read in selected], next_seq
+
+
+def read_inbox(
+    team_name: str,
+    agent_name: str,
+    unread_only: bool = False,
+    mark_as_read: bool = True,
+    base_dir: Path | None = None,
+    *,
+    since_seq: int | None = None,
+    limit: int | None = None,
+    from_: str | None = None,
+    message_types: list[str] | None = None,
+) -> list[InboxMessage]:
+    page, _next = query_inbox(
+        team_name,
+        agent_name,
+        unread_only=unread_only,
+        mark_as_read=mark_as_read,
+        since_seq=since_seq,
+        limit=limit,
+        from_=from_,
+        message_types=message_types,
+        base_dir=base_dir,
+    )
+    return [m for _seq, m in page]
+
+
+# --- Retention / archival ---------------------------------------------------
+
+
+def _read_prefix(conn, team_name: str, agent_name: str) -> list[tuple[int, str]]:
+    """``(seq, timestamp)`` of the live messages before the first unread one."""
+    (first_unread,) = conn.execute(
+        "SELECT MIN(seq) FROM messages"
+        " WHERE team = ? AND agent = ? AND read = 0 AND archived = 0",
+        (team_name, agent_name),
+    ).fetchone()
+    rows = conn.execute(
+        "SELECT seq, timestamp FROM messages"
+        " WHERE team = ? AND agent = ? AND archived = 0 AND seq < ? ORDER BY seq",
+        (team_name, agent_name, first_unread if first_unread is not None else 2**62),
+    )
+    return [(row["seq"], row["timestamp"]) for row in rows]
+
+
+def _needs_compaction(team_name: str, agent_name: str, base_dir: Path | None) -> bool:
+    """Cheap check run after each read mark (amortizes compaction)."""
+    with snapshot(base_dir) as conn:
+        (live_read,) = conn.execute(
+            "SELECT COUNT(*) FROM messages"
+            " WHERE team = ? AND agent = ? AND read = 1 AND archived = 0",
+            (team_name, agent_name),
+        ).fetchone()
+        if live_read == 0:
+            return False
+        if live_read > 2 * _json_messaging.INBOX_RETAIN_READ:
+            return True
+        head = conn.execute(
+            "SELECT timestamp FROM messages WHERE team = ? AND agent = ? AND archived = 0"
+            " ORDER BY seq LIMIT 1",
+            (team_name, agent_name),
+        ).fetchone()
+    ts = parse_timestamp(head["timestamp"]) if head else None
+    return ts is not None and time.time() - ts > _json_messaging.INBOX_RETAIN_SECONDS
+
+
+def compact_inbox(
+    team_name: str,
+    agent_name: str,
+    *,
+    retain_read: int | None = None,
+    max_age_seconds: float | None = None,
+    base_dir: Path | None = None,
+) -> int:
+    """Archive old read messages; same policy as ``messaging.compact_inbox``.
+
+    Archiving flips a flag on the rows, so the live inbox stays a
+    contiguous tail and ``read_inbox_history`` pages the flagged rows.
+    Returns the number of messages archived.
+    """
+    retain = _json_messaging.INBOX_RETAIN_READ if retain_read is None else retain_read
+    max_age = (
+        _json_messaging.INBOX_RETAIN_SECONDS if max_age_seconds is None else max_age_seconds
+    )
+    with transaction(base_dir) as conn:
+        prefix = _read_prefix(conn, team_name, agent_name)
+        now = time.time()
+        excess = len(prefix) - retain
+        count = 0
+        for i, (_seq, timestamp) in enumerate(prefix):
+            ts = parse_timestamp(timestamp)
+            if i < excess or (ts is not None and now - ts > max_age):
+                count = i + 1
+            else:
+                break
+        if count == 0:
+            return 0
+        conn.execute(
+            "UPDATE messages SET archived = 1"
+            " WHERE team = ? AND agent = ? AND archived = 0 AND seq <= ?",
+            (team_name, agent_name, prefix[count - 1][0]),
+        )
+    return count
+
+
+def read_inbox_history(
+    team_name: str,
+    agent_name: str,
+    *,
+    since_seq: int = 0,
+    limit: int = 50,
+    day: str | None = None,
+    base_dir: Path | None = None,
+) -> tuple[list[dict], int | None]:
+    """Page through archived messages in sequence order.
+
+    Same contract as ``messaging.read_inbox_history``; *day* matches the
+    ``YYYY-MM-DD`` prefix of the message timestamp.
+    """
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    sql = (
+        "SELECT seq, data FROM messages"
+        " WHERE team = ? AND agent = ? AND archived = 1 AND seq > ?"
+    )
+    params: list = [team_name, agent_name, since_seq]
+    if day is not None:
+        sql += " AND substr(timestamp, 1, 10) = ?"
+        params.append(day)
+    sql += " ORDER BY seq LIMIT ?"
+    params.append(limit + 1)
+    with snapshot(base_dir) as conn:
+        rows = conn.execute(sql, params).fetchall()
+    page = [dict(json.loads(row["data"]), seq=row["seq"], read=True) for row in rows[:limit]]
+    return page, (page[-1]["seq"] if len(rows) > limit else None)
+
+
+# --- Delivery ---------------------------------------------------------------
+
+
+def _deliver(conn, team_name: str, agent_name: str, entry: dict, data: str) -> None:
+    conn.execute(
+        "INSERT INTO inboxes (team, agent, last_seq) VALUES (?, ?, 1)"
+        " ON CONFLICT (team, agent) DO UPDATE SET last_seq = last_seq + 1",
+        (team_name, agent_name),
+    )
+    (seq,) = conn.execute(
+        "SELECT last_seq FROM inboxes WHERE team = ? AND agent = ?", (team_name, agent_name)
+    ).fetchone()
+    conn.execute(
+        "INSERT INTO messages (team, agent, seq, sender, type, timestamp, data)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            team_name,
+            agent_name,
+            seq,
+            entry.get("from"),
+            message_type(entry),
+            entry.get("timestamp", ""),
+            data,
+        ),
+    )
+
+
+def append_message(
+    team_name: str,
+    agent_name: str,
+    message: InboxMessage,
+    base_dir: Path | None = None,
+) -> None:
+    entry = message.model_dump(by_alias=True, exclude_none=True)
+    with transaction(base_dir) as conn:
+        _deliver(conn, team_name, agent_name, entry, json.dumps(entry))
+    _ring(team_name, agent_name, base_dir)
+
+
+def broadcast(
+    team_name: str,
+    from_name: str,
+    recipients: list[str],
+    text: str,
+    summary: str,
+    color: str | None = None,
+    base_dir: Path | None = None,
+    *,
+    topic: str | None = None,
+) -> dict[str, str]:
+    """Deliver one plain message to many inboxes in a single transaction.
+
+    Returns the same per-recipient status map as ``messaging.broadcast``.
+    """
+    if not recipients:
+        return {}
+    msg = plain_message(from_name, text, summary, color, topic=topic)
+    entry = msg.model_dump(by_alias=True, exclude_none=True)
+    data = json.dumps(entry)
+    with transaction(base_dir) as conn:
+        for name in recipients:
+            _deliver(conn, team_name, name, entry, data)
+    status: dict[str, str] = {}
+    for name in recipients:
+        try:
+            _ring(team_name, name, base_dir)
+        except OSError as e:
+            # The message is stored; only the wakeup was lost.
+            status[name] = f"delivered (doorbell failed: {e})"
+        else:
+            status[name] = "delivered"
+    return status
+
+
+def topic_subscribers(
+    team_name: str, topic: str, base_dir: Path | None = None
+) -> list[str]:
+    """Members subscribed to *topic*, in team order."""
+    try:
+        config = read_config(team_name, base_dir=base_dir)
+    except FileNotFoundError:
+        raise ValueError(f"Team {team_name!r} does not exist") from None
+    return [m.name for m in config.members if topic in m.subscriptions]
+
+
+def publish(
+    team_name: str,
+    from_name: str,
+    topic: str,
+    text: str,
+    summary: str,
+    color: str | None = None,
+    base_dir: Path | None = None,
+) -> dict[str, str]:
+    """Deliver a message only to the members subscribed to *topic*."""
+    recipients = [n for n in topic_subscribers(team_name, topic, base_dir) if n != from_name]
+    return broadcast(
+        team_name, from_name, recipients, text, summary, color, base_dir, topic=topic
+    )
+
+
+def send_plain_message(
+    team_name: str,
+    from_name: str,
+    to_name: str,
+    text: str,
+    summary: str,
+    color: str | None = None,
+    base_dir: Path | None = None,
+) -> None:
+    append_message(team_name, to_name, plain_message(from_name, text, summary, color), base_dir)
+
+
+def send_structured_message(
+    team_name: str,
+    from_name: str,
+    to_name: str,
+    payload: BaseModel,
+    color: str | None = None,
+    base_dir: Path | None = None,
+) -> None:
+    append_message(team_name, to_name, structured_message(from_name, payload, color), base_dir)
+
+
+def send_task_assignment(
+    team_name: str,
+    task: TaskFile,
+    assigned_by: str,
+    base_dir: Path | None = None,
+) -> None:
+    payload = task_assignment(task, assigned_by)
+    send_structured_message(team_name, assigned_by, task.owner, payload, base_dir=base_dir)
+
+
+def send_shutdown_request(
+    team_name: str,
+    recipient: str,
+    reason: str = "",
+    base_dir: Path | None = None,
+) -> str:
+    payload = shutdown_request(recipient, reason)
+    send_structured_message(team_name, "team-lead", recipient, payload, base_dir=base_dir)
+    return payload.request_id
+
+
+def inbox_cache_stats() -> dict:
+    """The SQLite engine keeps no parsed-inbox cache; reads go to the database."""
+    return {"engine": "sqlite"}
@@ -0,0 +1,536 @@
+"""Tasks in SQLite, with the signatures of ``opencode_teams.tasks``.
+
+Each task is one row holding the task file's JSON plus the columns that
+listings filter on (status, owner, priority, lease); the entries of its
+``blocks``/``blockedBy`` lists are mirrored into ``task_edges`` so the
+reverse lookups, the ready check and the cycle check are index queries.
+Validation and the in-memory part of every mutation come from
+``task_planning``, shared with the JSON engine, so both enforce the same
+rules. Every mutation also appends
+a record, in the JSON engine's format, to ``task_events`` for
+``task_changes``.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+from opencode_teams.models import TaskFile, TaskSpec
+from opencode_teams.sqlite.db import snapshot, transaction
+from opencode_teams.sqlite.teams import team_exists
+from opencode_teams.task_index import task_priority
+from opencode_teams.task_planning import (
+    check_batch,
+    lease_deadline,
+    plan_batch,
+    plan_update,
+)
+
+# Event records kept per team; task_changes callers further behind resync
+# from the full task list.
+TASK_EVENTS_KEEP = 10_000
+
+_READY = """
+    t.status = 'pending' AND t.owner IS NULL AND NOT EXISTS (
+        SELECT 1 FROM task_edges e JOIN tasks b ON b.team = e.team AND b.id = e.other
+        WHERE e.team = t.team AND e.task = t.id AND e.kind = 'blockedBy'
+            AND b.status != 'completed'
+    )
+"""
+
+
+def _key(task_id: str) -> int:
+    return int(task_id) if task_id.isdigit() else -1
+
+
+def _dump(task: TaskFile) -> dict:
+    return task.model_dump(by_alias=True, exclude_none=True)
+
+
+def _load(conn: sqlite3.Connection, team_name: str, task_id: str) -> TaskFile:
+    row = conn.execute(
+        "SELECT data FROM tasks WHERE team = ? AND id = ?", (team_name, _key(task_id))
+    ).fetchone()
+    if row is None:
+        raise FileNotFoundError(f"Task {task_id!r} not found in team {team_name!r}")
+    return TaskFile(**json.loads(row["data"]))
+
+
+def _store(conn: sqlite3.Connection, team_name: str, task: TaskFile, raw: dict) -> None:
+    key = int(task.id)
+    conn.execute(
+        "INSERT OR REPLACE INTO tasks"
+        " (team, id, subject, status, owner, priority, lease_expires_at, data)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            team_name,
+            key,
+            task.subject,
+            task.status,
+            task.owner,
+            task_priority(task.metadata),
+            task.lease_expires_at,
+            json.dumps(raw),
+        ),
+    )
+    conn.execute("DELETE FROM task_edges WHERE team = ? AND task = ?", (team_name, key))
+    edges = [(team_name, key, "blocks", int(b)) for b in task.blocks]
+    edges += [(team_name, key, "blockedBy", int(b)) for b in task.blocked_by]
+    conn.executemany("INSERT OR IGNORE INTO task_edges VALUES (?, ?, ?, ?)", edges)
+
+
+def _commit(
+    conn: sqlite3.Connection,
+    team_name: str,
+    action: str,
+    written: Iterable[TaskFile],
+    removed: Iterable[str] = (),
+) -> None:
+    """Store one mutation and its event record. Must run inside ``transaction``."""
+    raws = []
+    for task in written:
+        raw = _dump(task)
+        _store(conn, team_name, task, raw)
+        raws.append(raw)
+    removed = list(removed)
+    for task_id in removed:
+        conn.execute("DELETE FROM tasks WHERE team = ? AND id = ?", (team_name, int(task_id)))
+        conn.execute(
+            "DELETE FROM task_edges WHERE team = ? AND task = ?", (team_name, int(task_id))
+        )
+    conn.execute("UPDATE teams SET event_seq = event_seq + 1 WHERE name = ?", (team_name,))
+    (seq,) = conn.execute(
+        "SELECT event_seq FROM teams WHERE name = ?", (team_name,)
+    ).fetchone()
+    record = {
+        "seq": seq,
+        "ts": int(time.time() * 1000),
+        "action": action,
+        "tasks": raws,
+        "removed": removed,
+    }
+    conn.execute(
+        "INSERT INTO task_events (team, seq, record) VALUES (?, ?, ?)",
+        (team_name, seq, json.dumps(record, separators=(",", ":"))),
+    )
+    conn.execute(
+        "DELETE FROM task_events WHERE team = ? AND seq <= ?",
+        (team_name, seq - TASK_EVENTS_KEEP),
+    )
+
+
+def _allocate_task_ids(conn: sqlite3.Connection, team_name: str, count: int = 1) -> list[str]:
+    (n,) = conn.execute(
+        "SELECT next_task_id FROM teams WHERE name = ?", (team_name,)
+    ).fetchone()
+    conn.execute(
+        "UPDATE teams SET next_task_id = ? WHERE name = ?", (n + count, team_name)
+    )
+    return [str(i) for i in range(n, n + count)]
+
+
+class _Index:
+    """The slice of ``TaskIndex`` that ``plan_update`` uses, over the tables."""
+
+    def __init__(self, conn: sqlite3.Connection, team_name: str) -> None:
+        self.conn = conn
+        self.team = team_name
+
+    def __contains__(self, task_id: str) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM tasks WHERE team = ? AND id = ?", (self.team, _key(task_id))
+        ).fetchone()
+        return row is not None
+
+    def status_of(self, task_id: str) -> str | None:
+        row = self.conn.execute(
+            "SELECT status FROM tasks WHERE team = ? AND id = ?", (self.team, _key(task_id))
+        ).fetchone()
+        return row["status"] if row is not None else None
+
+    def _edges_to(self, task_id: str, kinds: tuple[str, ...]) -> set[str]:
+        marks = ", ".join("?" for _ in kinds)
+        rows = self.conn.execute(
+            f"SELECT task FROM task_edges WHERE team = ? AND other = ? AND kind IN ({marks})",
+            (self.team, _key(task_id), *kinds),
+        )
+        return {str(r["task"]) for r in rows}
+
+    def dependents_of(self, task_id: str) -> set[str]:
+        return self._edges_to(task_id, ("blockedBy",))
+
+    def referrers(self, task_id: str) -> set[str]:
+        return self._edges_to(task_id, ("blockedBy", "blocks"))
+
+    def would_create_cycle(self, edges: list[tuple[str, str]]) -> tuple[str, str] | None:
+        """Check ``(dependent, blocker)`` edges as if added together.
+
+        An edge closes a cycle when *blocker* is reachable from *dependent*
+        along dependents; the search only visits tasks downstream of it.
+        """
+        extra: dict[str, set[str]] = {}
+        for dependent, blocker in edges:
+            seen = {dependent}
+            stack = [dependent]
+            while stack:
+                t = stack.pop()
+                if t == blocker:
+                    return dependent, blocker
+                for nxt in self.dependents_of(t) | extra.get(t, set()):
+                    if nxt not in seen:
+                        seen.add(nxt)
+                        stack.append(nxt)
+            extra.setdefault(blocker, set()).add(dependent)
+        return None
+
+
+def next_task_id(team_name: str, base_dir: Path | None = None) -> str:
+    with snapshot(base_dir) as conn:
+        row = conn.execute(
+            "SELECT next_task_id FROM teams WHERE name = ?", (team_name,)
+        ).fetchone()
+    return str(row["next_task_id"] if row is not None else 1)
+
+
+def import_tasks(
+    team_name: str, board: list[TaskFile], next_id: str, base_dir: Path | None = None
+) -> None:
+    """Store *board* as the tasks of an existing, empty team; see ``tasks.import_tasks``."""
+    with transaction(base_dir) as conn:
+        conn.execute(
+            "UPDATE teams SET next_task_id = ? WHERE name = ?", (int(next_id), team_name)
+        )
+        if board:
+            _commit(conn, team_name, "create", board)
+
+
+def create_task(
+    team_name: str,
+    subject: str,
+    description: str,
+    active_form: str = "",
+    metadata: dict | None = None,
+    base_dir: Path | None = None,
+) -> TaskFile:
+    if not subject or not subject.strip():
+        raise ValueError("Task subject must not be empty")
+    with transaction(base_dir) as conn:
+        if not team_exists(team_name, base_dir):
+            raise ValueError(f"Team {team_name!r} does not exist")
+        [task_id] = _allocate_task_ids(conn, team_name)
+        task = TaskFile(
+            id=task_id,
+            subject=subject,
+            description=description,
+            active_form=active_form,
+            status="pending",
+            metadata=metadata,
+        )
+        _commit(conn, team_name, "create", [task])
+    return task
+
+
+def create_tasks(
+    team_name: str, specs: list[TaskSpec], base_dir: Path | None = None
+) -> list[TaskFile]:
+    """Create several tasks and their dependencies in one transaction.
+
+    Same contract as the JSON engine's ``create_tasks``.
+    """
+    if not team_exists(team_name, base_dir):
+        raise ValueError(f"Team {team_name!r} does not exist")
+    refs = check_batch(specs)
+    if not specs:
+        return []
+    with transaction(base_dir) as conn:
+        created, others = plan_batch(
+            specs,
+            refs,
+            _Index(conn, team_name),
+            lambda n: _allocate_task_ids(conn, team_name, n),
+            lambda t: _load(conn, team_name, t),
+        )
+        _commit(conn, team_name, "create", [*created, *others])
+    return created
+
+
+def get_task(
+    team_name: str, task_id: str, base_dir: Path | None = None
+) -> TaskFile:
+    with snapshot(base_dir) as conn:
+        return _load(conn, team_name, task_id)
+
+
+def update_task(
+    team_name: str,
+    task_id: str,
+    *,
+    status: str | None = None,
+    owner: str | None = None,
+    subject: str | None = None,
+    description: str | None = None,
+    active_form: str | None = None,
+    add_blocks: list[str] | None = None,
+    add_blocked_by: list[str] | None = None,
+    metadata: dict | None = None,
+    base_dir: Path | None = None,
+) -> TaskFile:
+    with transaction(base_dir) as conn:
+        task = _load(conn, team_name, task_id)
+        others = plan_update(
+            task,
+            _Index(conn, team_name),
+            lambda t: _load(conn, team_name, t),
+            status=status,
+            owner=owner,
+            subject=subject,
+            description=description,
+            active_form=active_form,
+            add_blocks=add_blocks,
+            add_blocked_by=add_blocked_by,
+            metadata=metadata,
+        )
+        if status == "deleted":
+            _commit(conn, team_name, "delete", others.values(), [task_id])
+        else:
+            _commit(conn, team_name, "update", [task, *others.values()])
+    return task
+
+
+def claim_next_task(
+    team_name: str,
+    agent_name: str,
+    metadata: dict | None = None,
+    base_dir: Path | None = None,
+) -> TaskFile | None:
+    """Atomically hand the best ready task to *agent_name*.
+
+    Same contract as the JSON engine's ``claim_next_task``.
+    """
+    if not team_exists(team_name, base_dir):
+        raise ValueError(f"Team {team_name!r} does not exist")
+    with transaction(base_dir) as conn:
+        rows = conn.execute(
+            f"SELECT data FROM tasks t WHERE t.team = ? AND {_READY}"
+            " ORDER BY t.priority DESC, t.id",
+            (team_name,),
+        )
+        for row in rows:
+            task = TaskFile(**json.loads(row["data"]))
+            if metadata and any(
+                (task.metadata or {}).get(k) != v for k, v in metadata.items()
+            ):
+                continue
+            task.status = "in_progress"
+            task.owner = agent_name
+            task.lease_expires_at = lease_deadline()
+            _commit(conn, team_name, "claim", [task])
+            return task
+    return None
+
+
+def list_tasks(
+    team_name: str, base_dir: Path | None = None
+) -> list[TaskFile]:
+    if not team_exists(team_name, base_dir):
+        raise ValueError(f"Team {team_name!r} does not exist")
+    with snapshot(base_dir) as conn:
+        rows = conn.execute(
+            "SELECT data FROM tasks WHERE team = ? ORDER BY id", (team_name,)
+        ).fetchall()
+    return [TaskFile(**json.loads(row["data"])) for row in rows]
+
+
+def query_tasks(
+    team_name: str,
+    *,
+    status: str | None = None,
+    owner: str | None = None,
+    ready_only: bool = False,
+    limit: int | None = None,
+    cursor: str | None = None,
+    fields: list[str] | None = None,
+    base_dir: Path | None = None,
+) -> tuple[list[dict], str | None]:
+    """List tasks in id order with filters, paging and a field projection.
+
+    Same contract as the JSON engine's ``query_tasks``; filters and paging
+    run as one indexed query.
+    """
+    if not team_exists(team_name, base_dir):
+        raise ValueError(f"Team {team_name!r} does not exist")
+    if cursor and not cursor.isdigit():
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    sql = "SELECT id, data FROM tasks t WHERE t.team = ? AND t.id > ?"
+    params: list = [team_name, int(cursor) if cursor else 0]
+    if status is not None:
+        sql += " AND t.status = ?"
+        params.append(status)
+    if owner is not None:
+        sql += " AND t.owner = ?"
+        params.append(owner)
+    if ready_only:
+        sql += f" AND {_READY}"
+    sql += " ORDER BY t.id"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit + 1)
+    with snapshot(base_dir) as conn:
+        rows = conn.execute(sql, params).fetchall()
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = str(rows[-1]["id"])
+    result = []
+    for row in rows:
+        raw = json.loads(row["data"])
+        if fields is not None:
+            raw = {k: v for k, v in raw.items() if k in fields or k == "id"}
+        result.append(raw)
+    return result, next_cursor
+
+
+def tasks_by_owner(
+    team_name: str,
+    owner: str | None = None,
+    status: str | None = None,
+    base_dir: Path | None = None,
+) -> dict[str, list[dict]]:
+    """Owned tasks grouped by owner; same contract as the JSON engine's."""
+    if not team_exists(team_name, base_dir):
+        raise ValueError(f"Team {team_name!r} does not exist")
+    sql = (
+        "SELECT id, subject, status, owner, lease_expires_at FROM tasks"
+        " WHERE team = ? AND owner IS NOT NULL"
+    )
+    params: list = [team_name]
+    if owner is not None:
+        sql += " AND owner = ?"
+        params.append(owner)
+    if status is not None:
+        sql += " AND status = ?"
+        params.append(status)
+    sql += " ORDER BY owner, id"
+    result: dict[str, list[dict]] = {owner: []} if owner is not None else {}
+    with snapshot(base_dir) as conn:
+        rows = conn.execute(sql, params).fetchall()
+    for row in rows:
+        entry = {"id": str(row["id"]), "subject": row["subject"], "status": row["status"]}
+        if row["lease_expires_at"] is not None:
+            entry["leaseExpiresAt"] = row["lease_expires_at"]
+        result.setdefault(row["owner"], []).append(entry)
+    return result
+
+
+def reset_owner_tasks(
+    team_name: str, agent_name: str, base_dir: Path | None = None
+) -> None:
+    """Release every task *agent_name* owns; unfinished ones go back to pending."""
+    with transaction(base_dir) as conn:
+        rows = conn.execute(
+            "SELECT data FROM tasks WHERE team = ? AND owner = ? ORDER BY id",
+            (team_name, agent_name),
+        ).fetchall()
+        reset: list[TaskFile] = []
+        for row in rows:
+            task = TaskFile(**json.loads(row["data"]))
+            if task.status != "completed":
+                task.status = "pending"
+            task.owner = None
+            task.lease_expires_at = None
+            reset.append(task)
+        if reset:
+            _commit(conn, team_name, "reset", reset)
+
+
+def renew_leases(
+    team_name: str, agent_name: str, base_dir: Path | None = None
+) -> list[TaskFile]:
+    """Extend the lease on every in-progress task owned by *agent_name*."""
+    with transaction(base_dir) as conn:
+        rows = conn.execute(
+            "SELECT data FROM tasks WHERE team = ? AND owner = ? AND status = 'in_progress'"
+            " ORDER BY id",
+            (team_name, agent_name),
+        ).fetchall()
+        if not rows:
+            return []
+        deadline = lease_deadline()
+        renewed: list[TaskFile] = []
+        for row in rows:
+            task = TaskFile(**json.loads(row["data"]))
+            task.lease_expires_at = deadline
+            renewed.append(task)
+        _commit(conn, team_name, "renew", renewed)
+    return renewed
+
+
+def expire_leases(
+    team_name: str, now_ms: int | None = None, base_dir: Path | None = None
+) -> list[TaskFile]:
+    """Requeue in-progress tasks whose lease has run out.
+
+    Same contract as the JSON engine's ``expire_leases``.
+    """
+    now = int(time.time() * 1000) if now_ms is None else now_ms
+    with transaction(base_dir) as conn:
+        rows = conn.execute(
+            "SELECT data FROM tasks WHERE team = ? AND status = 'in_progress'"
+            " AND lease_expires_at <= ? ORDER BY id",
+            (team_name, now),
+        ).fetchall()
+        if not rows:
+            return []
+        requeued: list[TaskFile] = []
+        written: list[TaskFile] = []
+        for row in rows:
+            task = TaskFile(**json.loads(row["data"]))
+            requeued.append(task.model_copy(deep=True))
+            task.status = "pending"
+            task.owner = None
+            task.lease_expires_at = None
+            written.append(task)
+        _commit(conn, team_name, "expire", written)
+    return requeued
+
+
+def task_changes(
+    team_name: str,
+    since_seq: int = 0,
+    limit: int | None = None,
+    base_dir: Path | None = None,
+) -> tuple[list[dict], int, list[dict] | None]:
+    """Task event records after *since_seq*; same contract as the JSON engine's.
+
+    Callers further behind than the retained records (``TASK_EVENTS_KEEP``)
+    get the whole task set to resync from instead.
+    """
+    if since_seq < 0:
+        raise ValueError("since_seq must not be negative")
+    with snapshot(base_dir) as conn:
+        head = conn.execute(
+            "SELECT event_seq FROM teams WHERE name = ?", (team_name,)
+        ).fetchone()
+        if head is None:
+            raise ValueError(f"Team {team_name!r} does not exist")
+        head = head["event_seq"]
+        (oldest,) = conn.execute(
+            "SELECT MIN(seq) FROM task_events WHERE team = ?", (team_name,)
+        ).fetchone()
+        floor = head if oldest is None else oldest - 1
+        if since_seq > head or since_seq < floor:
+            rows = conn.execute(
+                "SELECT data FROM tasks WHERE team = ? ORDER BY id", (team_name,)
+            )
+            return [], head, [json.loads(row["data"]) for row in rows]
+        sql = "SELECT record FROM task_events WHERE team = ? AND seq > ? ORDER BY seq"
+        params: list = [team_name, since_seq]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        changes = [json.loads(row["record"]) for row in conn.execute(sql, params)]
+    return changes, (changes[-1]["seq"] if changes else since_seq), None
@@ -0,0 +1,185 @@
+"""Team configs in SQLite, with the signatures of ``opencode_teams.teams``."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from opencode_teams.models import (
+    TeamConfig,
+    TeamCreateResult,
+    TeamDeleteResult,
+    TeammateMember,
+)
+from opencode_teams.sqlite.db import db_path, snapshot, transaction
+from opencode_teams.teams import (
+    apply_add_member,
+    apply_member_update,
+    apply_subscription,
+    new_team_config,
+    validate_team_name,
+    validate_topic,
+)
+
+# Per-team side files that are not part of the stored state (agent health
+# snapshots) still live under the file tree.
+BASE_DIR = Path.home() / ".opencode-teams"
+TEAMS_DIR = BASE_DIR / "teams"
+
+
+def team_names(base_dir: Path | None = None) -> list[str]:
+    with snapshot(base_dir) as conn:
+        rows = conn.execute("SELECT name FROM teams ORDER BY name").fetchall()
+    return [row["name"] for row in rows]
+
+
+def team_exists(name: str, base_dir: Path | None = None) -> bool:
+    with snapshot(base_dir) as conn:
+        row = conn.execute("SELECT 1 FROM teams WHERE name = ?", (name,)).fetchone()
+    return row is not None
+
+
+def create_team(
+    name: str,
+    session_id: str,
+    description: str = "",
+    lead_model: str = "moonshotai/kimi-k2.5",
+    base_dir: Path | None = None,
+    project_dir: Path | None = None,
+) -> TeamCreateResult:
+    validate_team_name(name)
+    config = new_team_config(name, session_id, description, lead_model, project_dir)
+    data = json.dumps(config.model_dump(by_alias=True))
+    with transaction(base_dir) as conn:
+        # Like rewriting config.json, creating over an existing team keeps
+        # its tasks and inboxes.
+        conn.execute(
+            "INSERT INTO teams (name, config) VALUES (?, ?)"
+            " ON CONFLICT (name) DO UPDATE SET config = excluded.config",
+            (name, data),
+        )
+
+    return TeamCreateResult(
+        team_name=name,
+        team_file_path=f"{db_path(base_dir)}#teams/{name}",
+        lead_agent_id=f"team-lead@{name}",
+    )
+
+
+def read_config(name: str, base_dir: Path | None = None) -> TeamConfig:
+    with snapshot(base_dir) as conn:
+        row = conn.execute("SELECT config FROM teams WHERE name = ?", (name,)).fetchone()
+    if row is None:
+        raise FileNotFoundError(f"Team {name!r} not found in {db_path(base_dir)}")
+    return TeamConfig.model_validate(json.loads(row["config"]))
+
+
+def write_config(name: str, config: TeamConfig, base_dir: Path | None = None) -> None:
+    data = json.dumps(config.model_dump(by_alias=True))
+    with transaction(base_dir) as conn:
+        conn.execute(
+            "INSERT INTO teams (name, config) VALUES (?, ?)"
+            " ON CONFLICT (name) DO UPDATE SET config = excluded.config",
+            (name, data),
+        )
+
+
+def delete_team(name: str, base_dir: Path | None = None) -> TeamDeleteResult:
+    with transaction(base_dir) as conn:
+        config = read_config(name, base_dir=base_dir)
+        non_lead = [m for m in config.members if isinstance(m, TeammateMember)]
+        if non_lead:
+            raise RuntimeError(
+                f"Cannot delete team {name!r}: {len(non_lead)} non-lead member(s) still present. "
+                "Remove all teammates before deleting."
+            )
+        for table in ("tasks", "task_edges", "task_events", "inboxes", "messages"):
+            conn.execute(f"DELETE FROM {table} WHERE team = ?", (name,))
+        conn.execute("DELETE FROM teams WHERE name = ?", (name,))
+
+    return TeamDeleteResult(
+        success=True,
+        message=f'Cleaned up directories and worktrees for team "{name}"',
+        team_name=name,
+    )
+
+
+def add_member(name: str, member: TeammateMember, base_dir: Path | None = None) -> None:
+    with transaction(base_dir):
+        config = read_config(name, base_dir=base_dir)
+        apply_add_member(config, member)
+        write_config(name, config, base_dir=base_dir)
+
+
+def update_member(
+    team_name: str, agent_name: str, base_dir: Path | None = None, **fields: object
+) -> None:
+    """Set *fields* (e.g. ``tmux_pane_id``) on a teammate's config entry."""
+    with transaction(base_dir):
+        config = read_config(team_name, base_dir=base_dir)
+        apply_member_update(config, agent_name, fields)
+        write_config(team_name, config, base_dir=base_dir)
+
+
+def set_default_project_dir(
+    team_name: str, project_dir: Path, base_dir: Path | None = None
+) -> None:
+    """Record *project_dir* on a team created before it was stored."""
+    with transaction(base_dir):
+        config = read_config(team_name, base_dir=base_dir)
+        if config.project_dir is None:
+            config.project_dir = str(project_dir)
+            write_config(team_name, config, base_dir=base_dir)
+
+
+def get_project_dir(team_name: str, base_dir: Path | None = None) -> Path:
+    """Get the project directory for a team, falling back to cwd if not stored."""
+    config = read_config(team_name, base_dir=base_dir)
+    if config.project_dir:
+        return Path(config.project_dir)
+    return Path.cwd()
+
+
+def remove_member(
+    team_name: str, agent_name: str, base_dir: Path | None = None
+) -> None:
+    if agent_name == "team-lead":
+        raise ValueError("Cannot remove team-lead from team")
+    with transaction(base_dir):
+        config = read_config(team_name, base_dir=base_dir)
+        config.members = [m for m in config.members if m.name != agent_name]
+        write_config(team_name, config, base_dir=base_dir)
+
+    # Best-effort cleanup of agent config file in the target project
+    try:
+        from opencode_teams.config_gen import cleanup_agent_config
+
+        project = Path(config.project_dir) if config.project_dir else Path.cwd()
+        cleanup_agent_config(project, agent_name)
+    except Exception:
+        pass
+
+
+def _set_subscription(
+    team_name: str, agent_name: str, topic: str, subscribed: bool, base_dir: Path | None
+) -> list[str]:
+    validate_topic(topic)
+    with transaction(base_dir):
+        config = read_config(team_name, base_dir=base_dir)
+        subscriptions = apply_subscription(config, agent_name, topic, subscribed)
+        write_config(team_name, config, base_dir=base_dir)
+    return subscriptions
+
+
+def subscribe_topic(
+    team_name: str, agent_name: str, topic: str, base_dir: Path | None = None
+) -> list[str]:
+    """Add *topic* to the member's subscriptions; returns the new list."""
+    return _set_subscription(team_name, agent_name, topic, True, base_dir)
+
+
+def unsubscribe_topic(
+    team_name: str, agent_name: str, topic: str, base_dir: Path | None = None
+) -> list[str]:
+    """Remove *topic* from the member's subscriptions; returns the new list."""
+    return _set_subscription(team_name, agent_name, topic, False, base_dir)
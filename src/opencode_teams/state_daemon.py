@@ -0,0 +1,441 @@
+"""Single-writer state daemon and the client engine that forwards to it.
+
+Without it every agent's MCP server opens the team state itself, so N
+agents are N processes contending for the same locks. In coordinator
+mode one long-lived daemon owns the state and the per-agent servers set
+``OPENCODE_TEAMS_STORAGE=remote``: their ``teams`` / ``tasks`` /
+``messaging`` calls go over a Unix domain socket
+(``$OPENCODE_TEAMS_SOCKET``, default ``~/.opencode-teams/state.sock``) and
+run one at a time on the daemon's single worker thread.
+
+The daemon hosts the SQLite engine, whose WAL is the durable journal.
+``--storage memory`` keeps the state in RAM and copies it to
+``$OPENCODE_TEAMS_SNAPSHOT`` every ``--snapshot-interval`` seconds (30 by
+default) and at shutdown, so a crash loses the writes acknowledged since
+the last snapshot; an interval of 0 snapshots after every call that
+changed the state, before replying. Deliveries
+rewrite the SQLite engine's doorbell files, and ``inbox_path`` returns
+those files, so ``poll_inbox`` wakes on a push instead of polling. The
+clients are other processes, so the daemon's in-memory database rings
+them too, from its ``on_delivery`` hook.
+
+The daemon and the ``remote`` engine need Unix domain sockets and POSIX
+signals, so they refuse to run on Windows.
+
+The wire format is one JSON object per line. A request is
+``{"module", "fn", "args", "kwargs"}`` and the reply is
+``{"ok": true, "result"}`` or ``{"ok": false, "error", "message"}``.
+Pydantic models, paths and tuples are tagged so they decode back to the
+same types::
+
+    opencode-teams-daemon                    # serve until SIGINT/SIGTERM
+    OPENCODE_TEAMS_STORAGE=remote opencode-teams
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import FunctionType, ModuleType
+from typing import Any, Callable
+
+from pydantic import BaseModel
+
+from opencode_teams import models
+from opencode_teams.sqlite import messaging as sqlite_messaging
+from opencode_teams.sqlite import tasks as sqlite_tasks
+from opencode_teams.sqlite import teams as sqlite_teams
+from opencode_teams.sqlite.db import (
+    STORAGE_ENV,
+    MemoryDatabase,
+    ring_doorbell,
+    snapshot_path,
+    use_memory,
+)
+
+SOCKET_ENV = "OPENCODE_TEAMS_SOCKET"
+DEFAULT_SOCKET = Path.home() / ".opencode-teams" / "state.sock"
+
+# Longest request or reply line the daemon accepts.
+MAX_LINE_BYTES = 64 * 1024 * 1024
+
+# How often a --storage memory daemon snapshots to $OPENCODE_TEAMS_SNAPSHOT;
+# acknowledged writes since the last snapshot are lost if it crashes.
+SNAPSHOT_INTERVAL = 30.0
+
+_MODULES: dict[str, ModuleType] = {
+    "teams": sqlite_teams,
+    "tasks": sqlite_tasks,
+    "messaging": sqlite_messaging,
+}
+
+# Pure helpers a client runs itself instead of asking the daemon.
+_LOCAL = frozenset({
+    "now_iso",
+    "message_type",
+    "parse_timestamp",
+    "plain_message",
+    "structured_message",
+    "task_assignment",
+    "shutdown_request",
+    "validate_team_name",
+    "validate_topic",
+    "new_team_config",
+    "apply_add_member",
+    "apply_member_update",
+    "apply_subscription",
+})
+
+# Exceptions re-raised with their own type on the client; others become
+# RuntimeError. Subclasses map to the nearest listed base.
+_ERRORS: dict[str, type[Exception]] = {
+    e.__name__: e
+    for e in (
+        FileNotFoundError,
+        PermissionError,
+        KeyError,
+        TypeError,
+        ValueError,
+        RuntimeError,
+        OSError,
+    )
+}
+
+
+def socket_path() -> Path:
+    env = os.environ.get(SOCKET_ENV)
+    return Path(env) if env else DEFAULT_SOCKET
+
+
+# --- Wire encoding ----------------------------------------------------------
+
+
+def _encode(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        data = obj.model_dump(by_alias=True, mode="json")
+        return {"__model__": type(obj).__name__, "data": data}
+    if isinstance(obj, Path):
+        return {"__path__": str(obj)}
+    if isinstance(obj, tuple):
+        return {"__tuple__": [_encode(x) for x in obj]}
+    if isinstance(obj, list):
+        return [_encode(x) for x in obj]
+    if isinstance(obj, dict):
+        return {k: _encode(v) for k, v in obj.items()}
+    return obj
+
+
+def _decode(obj: Any) -> Any:
+    if isinstance(obj, list):
+        return [_decode(x) for x in obj]
+    if not isinstance(obj, dict):
+        return obj
+    if "__model__" in obj:
+        cls = getattr(models, obj["__model__"], None)
+        if not (isinstance(cls, type) and issubclass(cls, BaseModel)):
+            raise ValueError(f"Unknown model {obj['__model__']!r}")
+        return cls.model_validate(obj["data"])
+    if "__path__" in obj:
+        return Path(obj["__path__"])
+    if "__tuple__" in obj:
+        return tuple(_decode(x) for x in obj["__tuple__"])
+    return {k: _decode(v) for k, v in obj.items()}
+
+
+def _dumps(obj: dict) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode() + b"\n"
+
+
+def _exported(mod: ModuleType, fn: str) -> bool:
+    """Whether *fn* is a public function *mod* defines, not one it imports."""
+    target = getattr(mod, fn, None)
+    return (
+        not fn.startswith("_")
+        and isinstance(target, FunctionType)
+        and target.__module__ == mod.__name__
+    )
+
+
+def _resolve(module: str, fn: str) -> Callable:
+    mod = _MODULES.get(module)
+    if mod is None or not _exported(mod, fn):
+        raise ValueError(f"Unknown state call {module}.{fn}")
+    return getattr(mod, fn)
+
+
+# --- Daemon -----------------------------------------------------------------
+
+
+def _check_platform() -> None:
+    if sys.platform == "win32":
+        raise RuntimeError(
+            "The state daemon needs Unix domain sockets, which Windows does not "
+            f"provide; use {STORAGE_ENV}=sqlite or json there instead"
+        )
+
+
+class StateDaemon:
+    """Serve the storage API on a Unix socket from one worker thread."""
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        memory: MemoryDatabase | None = None,
+        snapshot_each_write: Path | None = None,
+    ) -> None:
+        self.path = path or socket_path()
+        # The state for --storage memory; None serves the database file.
+        self.memory = memory
+        # Copy the in-memory state here after every call that changed it.
+        self._snapshot_each_write = snapshot_each_write if memory is not None else None
+        # One worker: calls never contend with each other for the database.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="state")
+        self._server: asyncio.AbstractServer | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    async def start(self) -> None:
+        _check_platform()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(str(self.path))
+            except OSError:
+                self.path.unlink()  # left behind by a daemon that died
+            else:
+                raise RuntimeError(f"A state daemon is already serving {self.path}")
+            finally:
+                probe.close()
+        self._server = await asyncio.start_unix_server(
+            self._handle, path=str(self.path), limit=MAX_LINE_BYTES
+        )
+        os.chmod(self.path, 0o600)
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in self._writers:
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        self._executor.shutdown(wait=True)
+        self.path.unlink(missing_ok=True)
+
+    def _call(self, line: bytes) -> bytes:
+        if self.memory is None:
+            return self._dispatch(line)
+        with use_memory(self.memory):
+            return self._dispatch(line)
+
+    def _dispatch(self, line: bytes) -> bytes:
+        try:
+            request = json.loads(line)
+            fn = _resolve(request["module"], request["fn"])
+            snap = self._snapshot_each_write
+            changes = self.memory.conn.total_changes if snap else 0
+            try:
+                result = fn(*_decode(request.get("args", [])), **_decode(request.get("kwargs", {})))
+            finally:
+                if snap and self.memory.conn.total_changes != changes:
+                    self.memory.save_snapshot(snap)
+            return _dumps({"ok": True, "result": _encode(result)})
+        except Exception as e:
+            kind = next((c.__name__ for c in type(e).__mro__ if c.__name__ in _ERRORS), None)
+            message = e.args[0] if isinstance(e, KeyError) and e.args else str(e)
+            return _dumps({"ok": False, "error": kind or "RuntimeError", "message": message})
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        self._writers.add(writer)
+        try:
+            while line := await reader.readline():
+                writer.write(await loop.run_in_executor(self._executor, self._call, line))
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+
+# --- Client engine ----------------------------------------------------------
+
+
+class _Client(threading.local):
+    """One blocking connection per thread, reopened if the daemon restarted.
+
+    A forked child opens its own connection rather than share the parent's.
+    A request is never resent: once it is on the wire the daemon may have
+    applied it, so a lost reply surfaces as ``ConnectionError``.
+    """
+
+    sock: socket.socket | None = None
+    rfile: Any = None
+    path: Path | None = None
+    pid: int = 0
+
+    def _connect(self, path: Path) -> None:
+        _check_platform()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(str(path))
+        except OSError as e:
+            sock.close()
+            raise ConnectionError(f"State daemon not reachable at {path}: {e}") from e
+        self.sock, self.rfile, self.path = sock, sock.makefile("rb"), path
+        self.pid = os.getpid()
+
+    def _close(self) -> None:
+        if self.sock is not None:
+            self.rfile.close()
+            self.sock.close()
+        self.sock = self.rfile = None
+
+    def _stale(self) -> bool:
+        """Whether the daemon hung up on this idle connection."""
+        try:
+            return self.sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) == b""
+        except BlockingIOError:
+            return False
+        except OSError:
+            return True
+
+    def request(self, payload: bytes) -> dict:
+        path = socket_path()
+        if self.sock is not None and self.pid != os.getpid():
+            self.sock = self.rfile = None  # the parent's; leave it open for the parent
+        if self.sock is not None and (self.path != path or self._stale()):
+            self._close()
+        if self.sock is None:
+            self._connect(path)
+        try:
+            self.sock.sendall(payload)
+            line = self.rfile.readline()
+        except OSError as e:
+            self._close()
+            raise ConnectionError(f"State daemon at {path} failed: {e}") from e
+        if not line:
+            self._close()
+            raise ConnectionError(f"State daemon at {path} closed the connection")
+        return json.loads(line)
+
+
+_client = _Client()
+
+
+def call(module: str, fn: str, *args: Any, **kwargs: Any) -> Any:
+    """Run ``<module>.<fn>(*args, **kwargs)`` in the daemon."""
+    reply = _client.request(
+        _dumps({"module": module, "fn": fn, "args": _encode(list(args)), "kwargs": _encode(kwargs)})
+    )
+    if reply["ok"]:
+        return _decode(reply["result"])
+    raise _ERRORS.get(reply["error"], RuntimeError)(reply["message"])
+
+
+class _RemoteModule:
+    """Module-like view of one storage module whose functions run in the daemon.
+
+    Constants (``TEAMS_DIR`` and the like) and the pure helpers in
+    ``_LOCAL`` come from the local SQLite module.
+    """
+
+    def __init__(self, module: str) -> None:
+        self._module = module
+        self._local = _MODULES[module]
+
+    def __getattr__(self, name: str) -> Any:
+        target = getattr(self._local, name)
+        if name in _LOCAL or name.startswith("_") or not isinstance(target, FunctionType):
+            return target
+        if not _exported(self._local, name):
+            # Helpers the engine imports (transaction, db_path, ...) would
+            # run against this process's own database.
+            raise AttributeError(f"{name!r} is not part of the remote {self._module} API")
+
+        def remote(*args: Any, **kwargs: Any) -> Any:
+            return call(self._module, name, *args, **kwargs)
+
+        remote.__name__ = name
+        remote.__doc__ = target.__doc__
+        setattr(self, name, remote)
+        return remote
+
+
+_remote_modules = {name: _RemoteModule(name) for name in _MODULES}
+
+
+def remote_module(module: str) -> _RemoteModule:
+    return _remote_modules[module]
+
+
+# --- Entry point ------------------------------------------------------------
+
+
+async def _serve(daemon: StateDaemon, snapshot_interval: float = SNAPSHOT_INTERVAL) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    memory = daemon.memory
+    snap = snapshot_path() if memory is not None else None
+    await daemon.start()
+    print(f"opencode-teams state daemon serving {daemon.path}", flush=True)
+    try:
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), snapshot_interval or None)
+            except TimeoutError:
+                if snap is not None:
+                    # On the worker thread, between calls.
+                    await loop.run_in_executor(daemon._executor, memory.save_snapshot, snap)
+    finally:
+        await daemon.close()
+        if snap is not None:
+            memory.save_snapshot(snap)
+        if memory is not None:
+            memory.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="opencode-teams-daemon",
+        description="Own opencode-teams state and serve it to MCP servers over a Unix socket.",
+    )
+    parser.add_argument("--socket", type=Path, default=None,
+                        help=f"socket path (default ${SOCKET_ENV} or {DEFAULT_SOCKET})")
+    parser.add_argument("--storage", choices=["sqlite", "memory"], default="sqlite",
+                        help="engine holding the state (default sqlite). memory keeps it in "
+                             "RAM: a crash loses the writes since the last snapshot to "
+                             "$OPENCODE_TEAMS_SNAPSHOT (see --snapshot-interval)")
+    parser.add_argument("--snapshot-interval", type=float, default=SNAPSHOT_INTERVAL,
+                        metavar="SECONDS",
+                        help=f"with --storage memory, seconds between snapshots (default "
+                             f"{SNAPSHOT_INTERVAL:g}); 0 snapshots after every write")
+    args = parser.parse_args(argv)
+    try:
+        _check_platform()
+    except RuntimeError as e:
+        parser.error(str(e))
+    if args.snapshot_interval < 0:
+        parser.error("--snapshot-interval must not be negative")
+    memory = None
+    if args.storage == "memory":
+        memory = MemoryDatabase(snapshot_path())
+        # Remote clients watch the doorbell files from their own processes.
+        memory.on_delivery = ring_doorbell
+    each_write = snapshot_path() if args.snapshot_interval == 0 else None
+    daemon = StateDaemon(args.socket, memory, snapshot_each_write=each_write)
+    asyncio.run(_serve(daemon, args.snapshot_interval))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""Storage engine selection, plus moving state between the engines.
+
+The server and spawner reach team, task and inbox state through the
+``teams``, ``tasks`` and ``messaging`` namespaces defined here. Each
+attribute lookup resolves against the engine named by
+``$OPENCODE_TEAMS_STORAGE``, or against the ``MemoryDatabase`` the calling
+context runs in (``sqlite.db.use_memory``) when there is one:
+
+* ``json`` (default): the JSON files under ``~/.opencode-teams``
+  (``opencode_teams.teams`` / ``tasks`` / ``messaging``).
+* ``sqlite``: one SQLite database (``opencode_teams.sqlite``), at
+  ``$OPENCODE_TEAMS_DB`` or ``~/.opencode-teams/state.db``.
+* ``memory``: the SQLite engine on an in-process ``MemoryDatabase``,
+  optionally snapshotted to ``$OPENCODE_TEAMS_SNAPSHOT``. Each server
+  opens its own at startup (``open_memory``), so the state is private to
+  that server; this suits tests and single-process runs.
+* ``remote``: calls are forwarded to the state daemon
+  (``opencode_teams.state_daemon``) on ``$OPENCODE_TEAMS_SOCKET``.
+
+``import_json`` and ``export_json`` copy every team between the two, so a
+deployment can switch engines without losing state::
+
+    opencode-teams-storage import            # JSON files -> state.db
+    opencode-teams-storage export --json-dir /tmp/teams-backup
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import os
+from pathlib import Path
+from types import ModuleType
+
+from opencode_teams import messaging as json_messaging
+from opencode_teams import tasks as json_tasks
+from opencode_teams import teams as json_teams
+from opencode_teams.models import InboxMessage
+from opencode_teams.sqlite import tasks as sqlite_tasks
+from opencode_teams.sqlite import teams as sqlite_teams
+from opencode_teams.sqlite.db import (
+    DB_ENV,
+    STORAGE_ENV,
+    MemoryDatabase,
+    active_memory,
+    snapshot,
+    snapshot_path,
+    transaction,
+)
+from opencode_teams.state_daemon import SOCKET_ENV, remote_module
+
+_ENGINES = {
+    "json": "opencode_teams.{}",
+    "sqlite": "opencode_teams.sqlite.{}",
+    # Runs inside use_memory, which points the database layer at RAM.
+    "memory": "opencode_teams.sqlite.{}",
+    "remote": "",
+}
+
+
+def engine_name() -> str:
+    if active_memory() is not None:
+        return "memory"
+    name = os.environ.get(STORAGE_ENV, "json").strip().lower() or "json"
+    if name not in _ENGINES:
+        raise ValueError(
+            f"Unknown storage engine {name!r} in ${STORAGE_ENV}; use one of {sorted(_ENGINES)}"
+        )
+    return name
+
+
+def engine_module(module: str) -> ModuleType:
+    """The active engine's implementation of *module* (teams, tasks or messaging)."""
+    name = engine_name()
+    if name == "remote":
+        return remote_module(module)
+    if name == "memory" and active_memory() is None:
+        # Without one the SQLite modules would quietly use the database file.
+        raise RuntimeError(
+            f"{STORAGE_ENV}=memory needs the in-memory database its server opens; "
+            "none is open here"
+        )
+    return importlib.import_module(_ENGINES[name].format(module))
+
+
+def open_memory() -> MemoryDatabase | None:
+    """A fresh in-memory database when ``$OPENCODE_TEAMS_STORAGE`` is memory.
+
+    It starts from ``$OPENCODE_TEAMS_SNAPSHOT`` when that file exists. The
+    caller owns it: run calls inside ``use_memory`` and close it after.
+    """
+    if engine_name() != "memory":
+        return None
+    return MemoryDatabase(snapshot_path())
+
+
+def server_env() -> dict[str, str]:
+    """Storage settings a spawned teammate's MCP server needs to share this state.
+
+    Teammates run their own server process; without these they would fall
+    back to the JSON files. An in-memory engine cannot be shared, so it
+    passes nothing on.
+    """
+    if engine_name() == "memory":
+        return {}
+    names = (STORAGE_ENV, DB_ENV, SOCKET_ENV)
+    return {n: os.environ[n] for n in names if os.environ.get(n)}
+
+
+class _Namespace:
+    """Module-like view that forwards every lookup to the active engine.
+
+    Resolving at call time (rather than binding a module at import) keeps
+    tests that monkeypatch the JSON modules working, and lets the engine
+    be chosen after import.
+    """
+
+    def __init__(self, module: str) -> None:
+        self._module = module
+
+    def __getattr__(self, name: str):
+        return getattr(engine_module(self._module), name)
+
+    def __repr__(self) -> str:
+        return f"<storage namespace {self._module!r}>"
+
+
+teams = _Namespace("teams")
+tasks = _Namespace("tasks")
+messaging = _Namespace("messaging")
+
+
+# --- Moving state between engines -------------------------------------------
+
+
+def _json_inbox_agents(team_name: str, base_dir: Path | None) -> list[str]:
+    inbox_dir = json_messaging.inbox_path(team_name, "x", base_dir).parent
+    if not inbox_dir.is_dir():
+        return []
+    agents = {p.stem for p in inbox_dir.glob("*.jsonl")}
+    agents |= {p.stem for p in inbox_dir.glob("*.json")}  # legacy array inboxes
+    return sorted(agents)
+
+
+def _json_history(team_name: str, agent_name: str, base_dir: Path | None) -> list[dict]:
+    history: list[dict] = []
+    since = 0
+    while True:
+        page, since = json_messaging.read_inbox_history(
+            team_name, agent_name, since_seq=since, limit=500, base_dir=base_dir
+        )
+        history.extend(page)
+        if since is None:
+            return history
+
+
+def import_json(
+    json_dir: Path | None = None, db_dir: Path | None = None
+) -> dict[str, int]:
+    """Copy every team under *json_dir* into the SQLite database for *db_dir*.
+
+    Configs, tasks (with their id counter), live inboxes with their read
+    marks and archived history are copied as they are; the task event log
+    starts over with one ``create`` record holding the whole task set.
+    Refuses teams that already exist in the database. Returns counts.
+    """
+    counts = {"teams": 0, "tasks": 0, "messages": 0}
+    for name in json_teams.team_names(json_dir):
+        if sqlite_teams.team_exists(name, db_dir):
+            raise ValueError(f"Team {name!r} already exists in the database")
+        config = json_teams.read_config(name, base_dir=json_dir)
+        board = json_tasks.list_tasks(name, base_dir=json_dir)
+        next_id = json_tasks.next_task_id(name, base_dir=json_dir)
+        inboxes: dict[str, list[tuple[int, dict, bool, bool]]] = {}
+        for agent in _json_inbox_agents(name, json_dir):
+            rows = [
+                (record.pop("seq"), record, True, True)
+                for record in _json_history(name, agent, json_dir)
+            ]
+            live, _next = json_messaging.query_inbox_raw(
+                name, agent, mark_as_read=False, base_dir=json_dir
+            )
+            rows += [(seq, entry, entry["read"], False) for seq, entry in live]
+            inboxes[agent] = rows
+
+        with transaction(db_dir) as conn:
+            sqlite_teams.write_config(name, config, base_dir=db_dir)
+            sqlite_tasks.import_tasks(name, board, next_id, base_dir=db_dir)
+            for agent, rows in inboxes.items():
+                conn.execute(
+                    "INSERT INTO inboxes (team, agent, last_seq) VALUES (?, ?, ?)",
+                    (name, agent, max((seq for seq, *_ in rows), default=0)),
+                )
+                conn.executemany(
+                    "INSERT INTO messages"
+                    " (team, agent, seq, sender, type, timestamp, read, archived, data)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            name,
+                            agent,
+                            seq,
+                            entry.get("from"),
+                            json_messaging.message_type(entry),
+                            entry.get("timestamp", ""),
+                            int(read),
+                            int(archived),
+                            json.dumps(dict(entry, read=False)),
+                        )
+                        for seq, entry, read, archived in rows
+                    ],
+                )
+                counts["messages"] += len(rows)
+        counts["teams"] += 1
+        counts["tasks"] += len(board)
+    return counts
+
+
+def export_json(
+    json_dir: Path | None = None, db_dir: Path | None = None
+) -> dict[str, int]:
+    """Write every team in the SQLite database for *db_dir* out as JSON files.
+
+    The reverse of ``import_json``: tasks keep their ids and counter, and
+    inboxes are replayed through the JSON engine so read marks and archives
+    come out in its own format. Refuses teams that already exist under
+    *json_dir*. Returns counts.
+    """
+    counts = {"teams": 0, "tasks": 0, "messages": 0}
+    # One read transaction, so the export is a consistent copy.
+    with snapshot(db_dir) as conn:
+        for name in sqlite_teams.team_names(db_dir):
+            if json_teams.team_exists(name, json_dir):
+                raise ValueError(f"Team {name!r} already exists under the JSON directory")
+            config = sqlite_teams.read_config(name, base_dir=db_dir)
+            # create_team lays out the directories; the config then
+            # replaces the placeholder one it writes.
+            json_teams.create_team(name, config.lead_session_id, base_dir=json_dir)
+            json_teams.write_config(name, config, base_dir=json_dir)
+
+            board = sqlite_tasks.list_tasks(name, base_dir=db_dir)
+            json_tasks.import_tasks(
+                name, board, sqlite_tasks.next_task_id(name, base_dir=db_dir), base_dir=json_dir
+            )
+
+            inboxes = conn.execute(
+                "SELECT agent FROM inboxes WHERE team = ? ORDER BY agent", (name,)
+            ).fetchall()
+            for (agent,) in inboxes:
+                counts["messages"] += _export_inbox(conn, name, agent, json_dir)
+            counts["teams"] += 1
+            counts["tasks"] += len(board)
+    return counts
+
+
+def _export_inbox(conn, team_name: str, agent_name: str, json_dir: Path | None) -> int:
+    json_messaging.ensure_inbox(team_name, agent_name, json_dir)
+    rows = conn.execute(
+        "SELECT seq, read, archived, data FROM messages"
+        " WHERE team = ? AND agent = ? ORDER BY seq",
+        (team_name, agent_name),
+    ).fetchall()
+    for row in rows:
+        json_messaging.append_message(
+            team_name, agent_name, InboxMessage.model_validate_json(row["data"]), json_dir
+        )
+    # Mark each run of read messages in one query; the JSON engine numbers
+    # messages from 1 in append order, as the rows are.
+    runs: list[list[int]] = []
+    for n, row in enumerate(rows, 1):
+        if row["read"]:
+            if runs and runs[-1][1] == n - 1:
+                runs[-1][1] = n
+            else:
+                runs.append([n, n])
+    for first, last in runs:
+        json_messaging.query_inbox(
+            team_name, agent_name, since_seq=first - 1, limit=last - first + 1,
+            base_dir=json_dir,
+        )
+    archived = sum(1 for row in rows if row["archived"])
+    if archived:
+        read_prefix = next((n - 1 for n, row in enumerate(rows, 1) if not row["read"]), len(rows))
+        json_messaging.compact_inbox(
+            team_name,
+            agent_name,
+            retain_read=read_prefix - archived,
+            max_age_seconds=float("inf"),
+            base_dir=json_dir,
+        )
+    return len(rows)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="opencode-teams-storage",
+        description="Copy opencode-teams state between the JSON files and SQLite.",
+    )
+    parser.add_argument("command", choices=["import", "export"],
+                        help="import: JSON files -> SQLite; export: SQLite -> JSON files")
+    parser.add_argument("--json-dir", type=Path, default=None,
+                        help="directory holding teams/ and tasks/ (default ~/.opencode-teams)")
+    parser.add_argument("--db-dir", type=Path, default=None,
+                        help="directory holding state.db (default $OPENCODE_TEAMS_DB or ~/.opencode-teams)")
+    args = parser.parse_args(argv)
+    run = import_json if args.command == "import" else export_json
+    try:
+        counts = run(args.json_dir, args.db_dir)
+    except ValueError as e:
+        parser.exit(1, f"error: {e}\n")
+    print(
+        f"{args.command}ed {counts['teams']} team(s), {counts['tasks']} task(s), "
+        f"{counts['messages']} message(s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
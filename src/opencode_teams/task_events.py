@@ -0,0 +1,197 @@
+"""Append-only per-team log of task changes.
+
+``tasks/<team>/events.jsonl`` holds one record per task mutation::
+
+    {"seq": 7, "ts": <epoch ms>, "action": "update", "tasks": [...], "removed": ["3"]}
+
+``tasks`` are the full contents of every task file the mutation writes and
+``removed`` the ids of the files it deletes, so applying a record twice is
+harmless. A record is appended after the index's dirty marker has been
+stamped with its seq and before any task file is touched; a loader that
+finds the marker redoes that record, so a crash part-way through a
+mutation cannot leave ``blocks``/``blockedBy`` half updated.
+
+Once the log outgrows ``TASK_EVENTS_SNAPSHOT_BYTES`` the task set it
+describes is folded into ``events.snapshot.json`` (tagged with the last
+seq folded in) and the log starts over. ``replay`` rebuilds the task set
+from snapshot plus log; ``read_changes`` serves the change feed behind the
+``task_changes`` tool. Everything here runs under the team task lock.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from opencode_teams._fileio import atomic_write
+
+# The log is folded into the snapshot once it grows past this size.
+TASK_EVENTS_SNAPSHOT_BYTES = 1 << 20
+
+
+def events_path(team_dir: Path) -> Path:
+    return team_dir / "events.jsonl"
+
+
+def _snapshot_path(team_dir: Path) -> Path:
+    return team_dir / "events.snapshot.json"
+
+
+def has_history(team_dir: Path) -> bool:
+    return _snapshot_path(team_dir).exists() or events_path(team_dir).exists()
+
+
+def _read_snapshot(team_dir: Path) -> tuple[int, dict[str, dict]]:
+    try:
+        raw = json.loads(_snapshot_path(team_dir).read_text())
+    except FileNotFoundError:
+        return 0, {}
+    return int(raw["seq"]), raw["tasks"]
+
+
+def write_snapshot(team_dir: Path, seq: int, tasks: dict[str, dict]) -> None:
+    """Replace the snapshot with *tasks* as of *seq*."""
+    data = json.dumps({"seq": seq, "tasks": tasks}, separators=(",", ":"))
+    atomic_write(_snapshot_path(team_dir), data.encode())
+
+
+def _records(team_dir: Path) -> Iterator[dict]:
+    """Complete log records in seq order; a torn last line is skipped."""
+    try:
+        with open(events_path(team_dir), "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return
+    pos = 0
+    while (nl := data.find(b"\n", pos)) >= 0:
+        yield json.loads(data[pos:nl])
+        pos = nl + 1
+
+
+def last_seq(team_dir: Path) -> int:
+    """Seq of the newest complete record (or of the snapshot if the log is empty).
+
+    Reads backwards from the end of the log, so the cost is the size of
+    the last record rather than of the log.
+    """
+    try:
+        f = open(events_path(team_dir), "rb")
+    except FileNotFoundError:
+        return _read_snapshot(team_dir)[0]
+    with f:
+        end = f.seek(0, os.SEEK_END)
+        chunk = 4096
+        while True:
+            start = max(0, end - chunk)
+            f.seek(start)
+            data = f.read(end - start)
+            last_nl = data.rfind(b"\n")
+            prev_nl = data.rfind(b"\n", 0, last_nl) if last_nl >= 0 else -1
+            if prev_nl >= 0 or (start == 0 and last_nl >= 0):
+                return int(json.loads(data[prev_nl + 1:last_nl])["seq"])
+            if start == 0:
+                return _read_snapshot(team_dir)[0]
+            chunk *= 2
+
+
+def append_event(
+    team_dir: Path,
+    seq: int,
+    action: str,
+    tasks: Iterable[dict],
+    removed: Iterable[str] = (),
+) -> int:
+    """Append one record; returns the log size afterwards."""
+    record = {
+        "seq": seq,
+        "ts": int(time.time() * 1000),
+        "action": action,
+        "tasks": list(tasks),
+        "removed": list(removed),
+    }
+    line = json.dumps(record, separators=(",", ":")) + "\n"
+    with open(events_path(team_dir), "ab") as f:
+        f.write(line.encode())
+        return f.tell()
+
+
+def _apply(state: dict[str, dict], record: dict) -> None:
+    for task in record["tasks"]:
+        state[task["id"]] = task
+    for task_id in record["removed"]:
+        state.pop(task_id, None)
+
+
+def replay(team_dir: Path) -> tuple[int, dict[str, dict]]:
+    """The task set described by snapshot plus log, and the seq it is at."""
+    seq, state = _read_snapshot(team_dir)
+    for record in _records(team_dir):
+        if record["seq"] > seq:
+            _apply(state, record)
+            seq = record["seq"]
+    return seq, state
+
+
+def compact(team_dir: Path) -> None:
+    """Fold the log into the snapshot and start a new log."""
+    seq, state = replay(team_dir)
+    write_snapshot(team_dir, seq, state)
+    events_path(team_dir).unlink(missing_ok=True)
+
+
+def redo_event(team_dir: Path, seq: int) -> bool:
+    """Rewrite the task files of record *seq* if it reached the log.
+
+    Called for the seq named by a leftover dirty marker. A torn last line
+    (the crash hit the append itself) is cut off so later appends start on
+    a fresh line; its mutation never happened. Returns whether a record
+    was redone.
+    """
+    path = events_path(team_dir)
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return False
+    end = data.rfind(b"\n") + 1
+    if end < len(data):
+        with open(path, "r+b") as f:
+            f.truncate(end)
+    for record in _records(team_dir):
+        if record["seq"] == seq:
+            for task in record["tasks"]:
+                atomic_write(team_dir / f"{task['id']}.json", json.dumps(task).encode())
+            for task_id in record["removed"]:
+                (team_dir / f"{task_id}.json").unlink(missing_ok=True)
+            return True
+    return False
+
+
+def read_changes(
+    team_dir: Path, since_seq: int, limit: int | None = None
+) -> tuple[list[dict], int, list[dict] | None]:
+    """Records after *since_seq*, oldest first.
+
+    Returns ``(changes, seq, tasks)``. *seq* is the value to pass as
+    *since_seq* next time. When the records after *since_seq* are no longer
+    in the log (folded into the snapshot, or *since_seq* is from before the
+    team was recreated) *changes* is empty and *tasks* holds the whole
+    current task set instead; otherwise *tasks* is None.
+    """
+    snap_seq, snap_tasks = _read_snapshot(team_dir)
+    head = last_seq(team_dir)
+    if since_seq > head or since_seq < snap_seq or (since_seq == 0 and snap_tasks):
+        seq, state = replay(team_dir)
+        return [], seq, [state[t] for t in sorted(state, key=int)]
+    changes: list[dict] = []
+    seq = since_seq
+    for record in _records(team_dir):
+        if record["seq"] <= since_seq:
+            continue
+        if limit is not None and len(changes) >= limit:
+            break
+        changes.append(record)
+        seq = record["seq"]
+    return changes, seq, None
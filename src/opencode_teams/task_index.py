@@ -0,0 +1,554 @@
+"""Persistent per-team index of task state and dependency edges.
+
+``tasks/<team>/index.json`` mirrors the fields of every task file that
+cross-task operations and task listings need (subject, status, owner,
+priority, lease, blocks, blockedBy; stored under the task file's key
+names) plus the reverse maps of both edge lists and the tasks of each
+owner, so completing or deleting a task only opens the files that actually
+reference it and releasing an agent's claims only opens that agent's. The
+set of ready tasks (pending, unowned, every blocker completed), live claim
+leases and a topological order of the blockedBy graph are derived in
+memory and kept current as entries change. The order
+makes the cycle check for a new dependency edge incremental
+(Pearce-Kelly): an edge that already agrees with the order costs nothing,
+and otherwise only the tasks between the two endpoints are visited.
+
+The index is only read and written under the team task lock. It is kept
+as a snapshot (``index.json``) plus an append-only log of changes
+(``index.log``) that is folded back into the snapshot once it outgrows it,
+so a mutation costs an append rather than a rewrite. Each server process
+keeps the loaded index in memory and only replays log lines appended by
+other processes since it last looked.
+
+A mutation drops an ``index.dirty`` marker before touching task files and
+removes it after the index is updated; a loader that finds the marker (a
+crash mid-write) first redoes the task event log record the marker names
+(see ``task_events``), then it or a loader that finds a missing/outdated
+snapshot rebuilds from the task files. Every mutation and rebuild also bumps a counter in
+``index.version``, which readers outside the lock use to tell whether
+anything they cached from the task files may have changed.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections import deque
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from opencode_teams._fileio import atomic_write
+from opencode_teams.models import TaskFile
+from opencode_teams.task_events import redo_event
+
+INDEX_VERSION = 4
+
+# metadata["priority"] may be a number or one of these names; higher first.
+PRIORITY_NAMES = {"low": -1, "normal": 0, "medium": 0, "high": 1, "urgent": 2, "critical": 2}
+
+# The log is folded into the snapshot once it holds more records than this
+# or than there are tasks, whichever is larger.
+INDEX_LOG_MIN_RECORDS = 256
+
+
+def index_path(team_dir: Path) -> Path:
+    return team_dir / "index.json"
+
+
+def _log_path(team_dir: Path) -> Path:
+    return team_dir / "index.log"
+
+
+def _dirty_path(team_dir: Path) -> Path:
+    return team_dir / "index.dirty"
+
+
+def _version_path(team_dir: Path) -> Path:
+    return team_dir / "index.version"
+
+
+def _read_version(team_dir: Path) -> int:
+    try:
+        return int(_version_path(team_dir).read_text())
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def _write_version(team_dir: Path, version: int) -> None:
+    _version_path(team_dir).write_text(str(version))
+
+
+def read_version(team_dir: Path) -> int | None:
+    """The team's change counter, or None while a mutation is in flight.
+
+    Safe to call without the team task lock. A reader that sees the same
+    non-None value before and after reading task files saw no writer.
+    """
+    if _dirty_path(team_dir).exists():
+        return None
+    try:
+        return int(_version_path(team_dir).read_text())
+    except FileNotFoundError:
+        return 0
+    except ValueError:
+        # torn by a concurrent write
+        return None
+
+
+def task_priority(metadata: dict | None) -> float:
+    value = (metadata or {}).get("priority", 0)
+    if isinstance(value, str):
+        return PRIORITY_NAMES.get(value.lower(), 0)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return 0
+
+
+def task_files(team_dir: Path) -> Iterator[Path]:
+    """Task files in *team_dir* (numeric stems only)."""
+    for f in team_dir.glob("*.json"):
+        if f.stem.isdigit():
+            yield f
+
+
+class TaskIndex:
+    """In-memory view of ``index.json``.
+
+    ``dependents[x]`` holds the tasks whose ``blockedBy`` contains *x*;
+    ``blockers[x]`` holds the tasks whose ``blocks`` contains *x*;
+    ``ready`` holds the tasks ``claim_next_task`` may hand out; ``owned``
+    maps an owner to its tasks; ``leases`` maps in-progress tasks to their
+    lease expiry (epoch ms).
+    """
+
+    def __init__(self) -> None:
+        self.tasks: dict[str, dict] = {}
+        self.dependents: dict[str, set[str]] = {}
+        self.blockers: dict[str, set[str]] = {}
+        self.ready: set[str] = set()
+        self.owned: dict[str, set[str]] = {}
+        self.leases: dict[str, int] = {}
+        # highest task id present, 0 when empty
+        self.max_id = 0
+        # blocker-before-dependent positions; built on first use
+        self._order: dict[str, int] | None = None
+        self._next_pos = 0
+        # changes not yet appended to index.log
+        self._ops: list[dict] = []
+        # index.version as of the last load or commit
+        self.version = 0
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self.tasks
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    @staticmethod
+    def _link(rev: dict[str, set[str]], targets: Iterable[str], source: str) -> None:
+        for t in targets:
+            rev.setdefault(t, set()).add(source)
+
+    @staticmethod
+    def _unlink(rev: dict[str, set[str]], targets: Iterable[str], source: str) -> None:
+        for t in targets:
+            refs = rev.get(t)
+            if refs is not None:
+                refs.discard(source)
+                if not refs:
+                    del rev[t]
+
+    def _refresh_ready(self, task_id: str) -> None:
+        entry = self.tasks.get(task_id)
+        if (
+            entry is not None
+            and entry["status"] == "pending"
+            and entry["owner"] is None
+            and all(
+                self.tasks.get(b, {}).get("status", "completed") == "completed"
+                for b in entry["blockedBy"]
+            )
+        ):
+            self.ready.add(task_id)
+        else:
+            self.ready.discard(task_id)
+
+    def _ensure_order(self) -> dict[str, int]:
+        """Topological positions for the blockedBy graph (Kahn's algorithm)."""
+        if self._order is not None:
+            return self._order
+        indegree = {
+            t: sum(1 for b in e["blockedBy"] if b in self.tasks) for t, e in self.tasks.items()
+        }
+        queue = deque(sorted((t for t, n in indegree.items() if n == 0), key=int))
+        order: dict[str, int] = {}
+        while queue:
+            t = queue.popleft()
+            order[t] = len(order)
+            for dep in self.dependents.get(t, ()):
+                if dep in indegree:
+                    indegree[dep] -= 1
+                    if indegree[dep] == 0:
+                        queue.append(dep)
+        # Tasks left over sit on a cycle already on disk; give them any slot
+        # so later checks still work for the rest of the graph.
+        for t in self.tasks:
+            if t not in order:
+                order[t] = len(order)
+        self._order = order
+        self._next_pos = len(order)
+        return order
+
+    def _reorder(
+        self,
+        blocker: str,
+        dependent: str,
+        extra: dict[str, set[str]] | None = None,
+    ) -> bool:
+        """Make the order put *blocker* before *dependent*.
+
+        Returns False when *blocker* is reachable from *dependent*, i.e. the
+        edge would close a cycle. *extra* holds not-yet-stored edges as
+        ``{blocker: {dependents}}``. Every successful reorder leaves a valid
+        order for the graph plus the edge, so it never needs undoing.
+        """
+        if blocker == dependent:
+            return False
+        order = self._ensure_order()
+        lo, hi = order.get(dependent), order.get(blocker)
+        if lo is None or hi is None or hi < lo:
+            return True
+        extra = extra or {}
+
+        def successors(t: str) -> Iterable[str]:
+            yield from self.dependents.get(t, ())
+            yield from extra.get(t, ())
+
+        def predecessors(t: str) -> Iterable[str]:
+            entry = self.tasks.get(t)
+            if entry is not None:
+                yield from entry["blockedBy"]
+            for b, deps in extra.items():
+                if t in deps:
+                    yield b
+
+        forward: list[str] = []
+        seen = {dependent}
+        stack = [dependent]
+        while stack:
+            t = stack.pop()
+            forward.append(t)
+            for nxt in successors(t):
+                if nxt == blocker:
+                    return False
+                pos = order.get(nxt)
+                if pos is not None and pos <= hi and nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        backward: list[str] = []
+        seen = {blocker}
+        stack = [blocker]
+        while stack:
+            t = stack.pop()
+            backward.append(t)
+            for prev in predecessors(t):
+                pos = order.get(prev)
+                if pos is not None and pos >= lo and prev not in seen:
+                    seen.add(prev)
+                    stack.append(prev)
+        backward.sort(key=order.__getitem__)
+        forward.sort(key=order.__getitem__)
+        moved = backward + forward
+        for t, pos in zip(moved, sorted(order[t] for t in moved)):
+            order[t] = pos
+        return True
+
+    def would_create_cycle(self, edges: list[tuple[str, str]]) -> tuple[str, str] | None:
+        """Check ``(dependent, blocker)`` edges as if added together.
+
+        Returns the first edge that would close a cycle, or None.
+        """
+        extra: dict[str, set[str]] = {}
+        for dependent, blocker in edges:
+            if not self._reorder(blocker, dependent, extra):
+                return dependent, blocker
+            extra.setdefault(blocker, set()).add(dependent)
+        return None
+
+    def _set(self, task_id: str, entry: dict) -> None:
+        old_blockers = set(self.tasks[task_id]["blockedBy"]) if task_id in self.tasks else set()
+        self._drop(task_id, keep_order=True)
+        self.tasks[task_id] = entry
+        self.max_id = max(self.max_id, int(task_id))
+        self._link(self.dependents, entry["blockedBy"], task_id)
+        self._link(self.blockers, entry["blocks"], task_id)
+        if entry["owner"] is not None:
+            self._link(self.owned, [entry["owner"]], task_id)
+        if entry["leaseExpiresAt"] is not None and entry["status"] == "in_progress":
+            self.leases[task_id] = entry["leaseExpiresAt"]
+        if self._order is not None:
+            if task_id not in self._order:
+                self._order[task_id] = self._next_pos
+                self._next_pos += 1
+            # New edges in either direction must agree with the order; a
+            # cycle that reached disk anyway just drops the order.
+            new_edges = [(task_id, b) for b in entry["blockedBy"] if b not in old_blockers]
+            new_edges += [(d, task_id) for d in self.dependents.get(task_id, ()) if d != task_id]
+            for dependent, blocker in new_edges:
+                if not self._reorder(blocker, dependent):
+                    self._order = None
+                    break
+        self._refresh_ready(task_id)
+        for dep in self.dependents.get(task_id, ()):
+            self._refresh_ready(dep)
+
+    def _drop(self, task_id: str, keep_order: bool = False) -> None:
+        old = self.tasks.pop(task_id, None)
+        if old is not None:
+            if not keep_order and self._order is not None:
+                self._order.pop(task_id, None)
+            self._unlink(self.dependents, old["blockedBy"], task_id)
+            self._unlink(self.blockers, old["blocks"], task_id)
+            if old["owner"] is not None:
+                self._unlink(self.owned, [old["owner"]], task_id)
+            self.leases.pop(task_id, None)
+            self.ready.discard(task_id)
+            for dep in self.dependents.get(task_id, ()):
+                self._refresh_ready(dep)
+            # A replaced entry keeps its id; only a removal can lower the max.
+            if not keep_order and int(task_id) == self.max_id:
+                self.max_id = max(map(int, self.tasks), default=0)
+
+    def put(self, task: TaskFile) -> None:
+        entry = {
+            "subject": task.subject,
+            "status": task.status,
+            "owner": task.owner,
+            "priority": task_priority(task.metadata),
+            "leaseExpiresAt": task.lease_expires_at,
+            "blocks": list(task.blocks),
+            "blockedBy": list(task.blocked_by),
+        }
+        self._set(task.id, entry)
+        self._ops.append({"put": task.id, "entry": entry})
+
+    def remove(self, task_id: str) -> None:
+        if task_id in self.tasks:
+            self._drop(task_id)
+            self._ops.append({"remove": task_id})
+
+    def apply(self, op: dict) -> None:
+        """Replay one ``index.log`` record."""
+        if "put" in op:
+            self._set(op["put"], op["entry"])
+        else:
+            self._drop(op["remove"])
+
+    def ready_order(self) -> list[str]:
+        """Ready task ids, highest priority first, then oldest first."""
+        return sorted(self.ready, key=lambda t: (-self.tasks[t]["priority"], int(t)))
+
+    def status_of(self, task_id: str) -> str | None:
+        entry = self.tasks.get(task_id)
+        return entry["status"] if entry is not None else None
+
+    def dependents_of(self, task_id: str) -> set[str]:
+        """Tasks holding *task_id* in ``blockedBy``."""
+        return self.dependents.get(task_id, set())
+
+    def referrers(self, task_id: str) -> set[str]:
+        """Tasks holding *task_id* in either edge list."""
+        return self.dependents.get(task_id, set()) | self.blockers.get(task_id, set())
+
+    def to_json(self) -> dict:
+        return {
+            "version": INDEX_VERSION,
+            "tasks": self.tasks,
+            "dependents": {k: sorted(v, key=int) for k, v in self.dependents.items()},
+            "blockers": {k: sorted(v, key=int) for k, v in self.blockers.items()},
+            "owners": {k: sorted(v, key=int) for k, v in self.owned.items()},
+        }
+
+    @classmethod
+    def from_json(cls, raw: dict) -> TaskIndex:
+        # The stored reverse maps are for readers of the file; the derived
+        # structures are rebuilt from the entries.
+        index = cls()
+        for task_id, entry in raw["tasks"].items():
+            index._set(task_id, entry)
+        return index
+
+    @classmethod
+    def rebuild(cls, team_dir: Path) -> TaskIndex:
+        index = cls()
+        for f in task_files(team_dir):
+            index.put(TaskFile(**json.loads(f.read_text())))
+        index._ops.clear()
+        return index
+
+
+def _write_index(team_dir: Path, index: TaskIndex) -> None:
+    data = json.dumps(index.to_json(), separators=(",", ":"))
+    atomic_write(index_path(team_dir), data.encode())
+
+
+class _Loaded:
+    """A process-local index plus the on-disk state it reflects."""
+
+    __slots__ = ("index", "snapshot_key", "log_offset", "log_records")
+
+    def __init__(
+        self,
+        index: TaskIndex,
+        snapshot_key: tuple[int, int, int],
+        log_offset: int,
+        log_records: int,
+    ) -> None:
+        self.index = index
+        self.snapshot_key = snapshot_key
+        self.log_offset = log_offset
+        self.log_records = log_records
+
+
+_loaded: dict[Path, _Loaded] = {}
+_loaded_lock = threading.Lock()
+
+
+def forget_index(team_dir: Path) -> None:
+    """Drop the cached index of a team that was deleted."""
+    with _loaded_lock:
+        _loaded.pop(team_dir, None)
+
+
+def _snapshot_key(team_dir: Path) -> tuple[int, int, int]:
+    st = index_path(team_dir).stat()
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _replay_log(index: TaskIndex, team_dir: Path, offset: int) -> tuple[int, int]:
+    """Apply complete log lines after *offset*; returns (new offset, records)."""
+    try:
+        with open(_log_path(team_dir), "rb") as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return offset, 0
+    records = 0
+    pos = 0
+    while (nl := data.find(b"\n", pos)) >= 0:
+        index.apply(json.loads(data[pos:nl]))
+        records += 1
+        pos = nl + 1
+    return offset + pos, records
+
+
+def _compact(team_dir: Path, index: TaskIndex) -> _Loaded:
+    _write_index(team_dir, index)
+    _log_path(team_dir).unlink(missing_ok=True)
+    return _Loaded(index, _snapshot_key(team_dir), 0, 0)
+
+
+def _recover(team_dir: Path) -> _Loaded:
+    try:
+        marker = _dirty_path(team_dir).read_text().strip()
+    except FileNotFoundError:
+        marker = ""
+    if marker.isdigit():
+        redo_event(team_dir, int(marker))
+    return _rebuild(team_dir)
+
+
+def _load(team_dir: Path) -> _Loaded:
+    if _dirty_path(team_dir).exists():
+        return _recover(team_dir)
+    try:
+        key = _snapshot_key(team_dir)
+    except FileNotFoundError:
+        return _rebuild(team_dir)
+    with _loaded_lock:
+        loaded = _loaded.get(team_dir)
+    if loaded is not None and loaded.snapshot_key == key:
+        try:
+            log_size = _log_path(team_dir).stat().st_size
+        except FileNotFoundError:
+            log_size = 0
+        if log_size == loaded.log_offset:
+            return loaded
+        if log_size > loaded.log_offset:
+            loaded.log_offset, records = _replay_log(loaded.index, team_dir, loaded.log_offset)
+            loaded.log_records += records
+            return loaded
+    try:
+        raw = json.loads(index_path(team_dir).read_text())
+        if raw.get("version") != INDEX_VERSION:
+            return _rebuild(team_dir)
+        index = TaskIndex.from_json(raw)
+    except (json.JSONDecodeError, KeyError):
+        return _rebuild(team_dir)
+    offset, records = _replay_log(index, team_dir, 0)
+    return _Loaded(index, key, offset, records)
+
+
+def _rebuild(team_dir: Path) -> _Loaded:
+    loaded = _compact(team_dir, TaskIndex.rebuild(team_dir))
+    _write_version(team_dir, _read_version(team_dir) + 1)
+    _dirty_path(team_dir).unlink(missing_ok=True)
+    return loaded
+
+
+def load_index(team_dir: Path) -> TaskIndex:
+    """Load the team's index, rebuilding it if missing, stale or torn.
+
+    Must be called with the team task lock held. The returned object is
+    shared with later calls in this process; only mutate it inside
+    ``index_transaction``.
+    """
+    loaded = _load(team_dir)
+    loaded.index.version = _read_version(team_dir)
+    with _loaded_lock:
+        _loaded[team_dir] = loaded
+    return loaded.index
+
+
+@contextmanager
+def index_transaction(
+    team_dir: Path, index: TaskIndex, seq: int | None = None
+) -> Iterator[TaskIndex]:
+    """Bracket task-file writes so a crash leaves the index marked dirty.
+
+    The caller writes task files and updates *index* inside the block; the
+    changes are appended to the log on a clean exit. *seq* is the task
+    event the block writes, recorded in the marker so recovery can redo it. On error the marker
+    stays and the in-memory copy is dropped, so the next loader rebuilds
+    from whatever reached disk. Either way the on-disk change counter is
+    bumped and ``index.version`` follows it.
+    """
+    dirty = _dirty_path(team_dir)
+    dirty.write_text("" if seq is None else str(seq))
+    try:
+        yield index
+    except BaseException:
+        with _loaded_lock:
+            _loaded.pop(team_dir, None)
+        index.version += 1
+        _write_version(team_dir, index.version)
+        raise
+    with _loaded_lock:
+        loaded = _loaded.get(team_dir)
+    if loaded is None or loaded.index is not index:
+        loaded = _compact(team_dir, index)
+    elif index._ops:
+        data = "".join(json.dumps(op, separators=(",", ":")) + "\n" for op in index._ops)
+        with open(_log_path(team_dir), "ab") as f:
+            f.write(data.encode())
+            loaded.log_offset = f.tell()
+        loaded.log_records += len(index._ops)
+        if loaded.log_records > max(len(index), INDEX_LOG_MIN_RECORDS):
+            loaded = _compact(team_dir, index)
+    index._ops.clear()
+    with _loaded_lock:
+        _loaded[team_dir] = loaded
+    index.version += 1
+    _write_version(team_dir, index.version)
+    dirty.unlink()
@@ -0,0 +1,273 @@
+"""Validation and in-memory planning of task mutations.
+
+Both storage engines run every task mutation through these functions and
+only differ in how they load the tasks involved and store the result, so
+the JSON files and the SQLite tables enforce the same rules.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from collections.abc import Callable
+
+from opencode_teams.models import TaskFile, TaskSpec
+
+STATUS_ORDER = {"pending": 0, "in_progress": 1, "completed": 2}
+
+# How long a claim survives without a heartbeat or update from its owner.
+TASK_LEASE_SECONDS = 15 * 60
+
+
+def now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def lease_deadline() -> int:
+    return now_ms() + int(TASK_LEASE_SECONDS * 1000)
+
+
+def check_batch(specs: list[TaskSpec]) -> dict[str, int]:
+    """Validate subjects and refs of a batch; returns ref -> position."""
+    refs: dict[str, int] = {}
+    for pos, spec in enumerate(specs):
+        if not spec.subject or not spec.subject.strip():
+            raise ValueError(f"Task subject must not be empty (entry {pos})")
+        if spec.ref is not None:
+            if spec.ref in refs:
+                raise ValueError(f"Duplicate task ref {spec.ref!r}")
+            refs[spec.ref] = pos
+    return refs
+
+
+def plan_batch(
+    specs: list[TaskSpec],
+    refs: dict[str, int],
+    index,
+    allocate: Callable[[int], list[str]],
+    load: Callable[[str], TaskFile],
+) -> tuple[list[TaskFile], list[TaskFile]]:
+    """Resolve, cycle-check and build a batch of new tasks in memory.
+
+    *index* answers ``task_id in index`` for existing tasks; *allocate*
+    reserves ids and is only called once the batch is known to be valid;
+    *load* returns an existing task for its ``blocks`` to be extended.
+    Returns the new tasks in spec order and the existing tasks they change.
+    """
+    # Resolve every dependency to a batch position or an existing id.
+    local_deps: list[list[int]] = []
+    existing_deps: list[list[str]] = []
+    for pos, spec in enumerate(specs):
+        local: list[int] = []
+        existing: list[str] = []
+        for dep in spec.blocked_by:
+            if dep in refs:
+                if refs[dep] == pos:
+                    raise ValueError(f"Task {dep!r} cannot be blocked by itself")
+                if refs[dep] not in local:
+                    local.append(refs[dep])
+            elif dep in index:
+                if dep not in existing:
+                    existing.append(dep)
+            else:
+                raise ValueError(f"Referenced task {dep!r} does not exist")
+        local_deps.append(local)
+        existing_deps.append(existing)
+
+    # Kahn's algorithm over the batch; leftovers sit on a cycle.
+    indegree = [len(deps) for deps in local_deps]
+    dependents: dict[int, list[int]] = {}
+    for pos, deps in enumerate(local_deps):
+        for d in deps:
+            dependents.setdefault(d, []).append(pos)
+    queue = deque(pos for pos, n in enumerate(indegree) if n == 0)
+    ordered = 0
+    while queue:
+        pos = queue.popleft()
+        ordered += 1
+        for nxt in dependents.get(pos, ()):
+            indegree[nxt] -= 1
+            if indegree[nxt] == 0:
+                queue.append(nxt)
+    if ordered < len(specs):
+        stuck = [specs[p].ref or str(p) for p, n in enumerate(indegree) if n > 0]
+        raise ValueError(f"Batch dependencies form a cycle among: {', '.join(stuck)}")
+
+    ids = allocate(len(specs))
+    created: list[TaskFile] = []
+    for pos, spec in enumerate(specs):
+        created.append(TaskFile(
+            id=ids[pos],
+            subject=spec.subject,
+            description=spec.description,
+            active_form=spec.active_form,
+            status="pending",
+            blocked_by=[ids[d] for d in local_deps[pos]] + existing_deps[pos],
+            blocks=[ids[p] for p in dependents.get(pos, ())],
+            metadata=spec.metadata,
+        ))
+    others: dict[str, TaskFile] = {}
+    for pos, deps in enumerate(existing_deps):
+        for dep in deps:
+            other = others.get(dep) or load(dep)
+            if ids[pos] not in other.blocks:
+                other.blocks.append(ids[pos])
+            others[dep] = other
+    return created, list(others.values())
+
+
+def plan_update(
+    task: TaskFile,
+    index,
+    load: Callable[[str], TaskFile],
+    *,
+    status: str | None,
+    owner: str | None,
+    subject: str | None,
+    description: str | None,
+    active_form: str | None,
+    add_blocks: list[str] | None,
+    add_blocked_by: list[str] | None,
+    metadata: dict | None,
+) -> dict[str, TaskFile]:
+    """Validate an ``update_task`` call and apply it to *task* in memory.
+
+    *index* answers membership (``task_id in index``), ``status_of``,
+    ``dependents_of``, ``referrers`` and ``would_create_cycle`` for the
+    team; *load* returns another task to be changed. Nothing is changed
+    until every check has passed. Returns the other tasks the update
+    touches, by id.
+    """
+    task_id = task.id
+
+    # --- Validate ---
+    if add_blocks:
+        for b in add_blocks:
+            if b == task_id:
+                raise ValueError(f"Task {task_id} cannot block itself")
+            if b not in index:
+                raise ValueError(f"Referenced task {b!r} does not exist")
+
+    if add_blocked_by:
+        for b in add_blocked_by:
+            if b == task_id:
+                raise ValueError(f"Task {task_id} cannot be blocked by itself")
+            if b not in index:
+                raise ValueError(f"Referenced task {b!r} does not exist")
+
+    # (dependent, blocker) edges, checked together against the index.
+    new_edges = [(b, task_id) for b in add_blocks or ()]
+    new_edges += [(task_id, b) for b in add_blocked_by or ()]
+    cyclic = index.would_create_cycle(new_edges)
+    if cyclic is not None:
+        dependent, blocker = cyclic
+        if blocker == task_id:
+            raise ValueError(
+                f"Adding block {task_id} -> {dependent} would create a circular dependency"
+            )
+        raise ValueError(
+            f"Adding dependency {task_id} blocked_by {blocker} would create a circular dependency"
+        )
+
+    if status is not None and status != "deleted":
+        cur_order = STATUS_ORDER[task.status]
+        new_order = STATUS_ORDER.get(status)
+        if new_order is None:
+            raise ValueError(f"Invalid status: {status!r}")
+        if new_order < cur_order:
+            raise ValueError(
+                f"Cannot transition from {task.status!r} to {status!r}"
+            )
+        effective_blocked_by = set(task.blocked_by)
+        if add_blocked_by:
+            effective_blocked_by.update(add_blocked_by)
+        if status in ("in_progress", "completed") and effective_blocked_by:
+            for blocker_id in effective_blocked_by:
+                blocker_status = index.status_of(blocker_id)
+                if blocker_status is not None and blocker_status != "completed":
+                    raise ValueError(
+                        f"Cannot set status to {status!r}: "
+                        f"blocked by task {blocker_id} (status: {blocker_status!r})"
+                    )
+
+    # --- Mutate (in memory only) ---
+    others: dict[str, TaskFile] = {}
+
+    def other_task(other_id: str) -> TaskFile:
+        if other_id not in others:
+            others[other_id] = load(other_id)
+        return others[other_id]
+
+    if subject is not None:
+        task.subject = subject
+    if description is not None:
+        task.description = description
+    if active_form is not None:
+        task.active_form = active_form
+    if owner is not None:
+        task.owner = owner
+
+    if add_blocks:
+        existing = set(task.blocks)
+        for b in add_blocks:
+            if b not in existing:
+                task.blocks.append(b)
+                existing.add(b)
+            other = other_task(b)
+            if task_id not in other.blocked_by:
+                other.blocked_by.append(task_id)
+
+    if add_blocked_by:
+        existing = set(task.blocked_by)
+        for b in add_blocked_by:
+            if b not in existing:
+                task.blocked_by.append(b)
+                existing.add(b)
+            other = other_task(b)
+            if task_id not in other.blocks:
+                other.blocks.append(task_id)
+
+    if metadata is not None:
+        current = task.metadata or {}
+        for k, v in metadata.items():
+            if v is None:
+                current.pop(k, None)
+            else:
+                current[k] = v
+        task.metadata = current if current else None
+
+    if status is not None and status != "deleted":
+        task.status = status
+        if status == "completed":
+            # Only the tasks the index says are blocked by this one.
+            for dep_id in sorted(index.dependents_of(task_id), key=int):
+                if dep_id == task_id:
+                    continue
+                other = others.get(dep_id) or load(dep_id)
+                if task_id in other.blocked_by:
+                    other.blocked_by.remove(task_id)
+                    others[dep_id] = other
+
+    # Any update that leaves the task claimed renews its lease.
+    if task.status == "in_progress" and task.owner:
+        task.lease_expires_at = lease_deadline()
+    else:
+        task.lease_expires_at = None
+
+    if status == "deleted":
+        task.status = "deleted"
+        for ref_id in sorted(index.referrers(task_id), key=int):
+            if ref_id == task_id:
+                continue
+            other = others.get(ref_id) or load(ref_id)
+            changed = False
+            if task_id in other.blocked_by:
+                other.blocked_by.remove(task_id)
+                changed = True
+            if task_id in other.blocks:
+                other.blocks.remove(task_id)
+                changed = True
+            if changed:
+                others[ref_id] = other
+
+    return others
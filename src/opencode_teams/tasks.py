@@ -1,12 +1,30 @@
 from __future__ import annotations
 
 import json
-from collections import deque
+import threading
+import time
+from collections.abc import Iterable
 from pathlib import Path
 
+from opencode_teams import task_events
+from opencode_teams._fileio import atomic_write
 from opencode_teams._filelock import file_lock
-from opencode_teams.models import TaskFile
-from opencode_teams.teams import team_exists
+from opencode_teams.models import TaskFile, TaskSpec
+from opencode_teams.task_index import (
+    TaskIndex,
+    forget_index,
+    index_transaction,
+    load_index,
+    read_version,
+    task_files,
+)
+from opencode_teams.task_planning import (
+    check_batch,
+    lease_deadline,
+    plan_batch,
+    plan_update,
+)
+from opencode_teams.teams import EPOCH_FILE, team_exists
 
 TASKS_DIR = Path.home() / ".opencode-teams" / "tasks"
 
@@ -15,48 +33,204 @@ def _tasks_dir(base_dir: Path | None = None) -> Path:
     return (base_dir / "tasks") if base_dir else TASKS_DIR
 
 
-_STATUS_ORDER = {"pending": 0, "in_progress": 1, "completed": 2}
+# A copy of the index fields query_tasks filters on; entries are never
+# changed in place, so copying the containers is enough.
+_Listing = tuple[dict[str, dict], frozenset[str], dict[str, frozenset[str]]]
 
 
-def _flush_pending_writes(pending_writes: dict[Path, TaskFile]) -> None:
-    for path, task_obj in pending_writes.items():
-        path.write_text(json.dumps(task_obj.model_dump(by_alias=True, exclude_none=True)))
+class _TaskCache:
+    """Parsed task files of one team as of one ``index.version``.
+
+    ``index.version`` restarts at 0 when a team is deleted and recreated,
+    so entries also carry the team's creation epoch.
+    """
+
+    __slots__ = ("epoch", "version", "raw", "complete", "listing")
+
+    def __init__(self, epoch: str | None, version: int) -> None:
+        self.epoch = epoch
+        self.version = version
+        self.raw: dict[str, dict] = {}
+        # raw holds every task of the team, so listings can skip the disk
+        self.complete = False
+        # index entries, ready set and owner map for query_tasks
+        self.listing: _Listing | None = None
+
+
+_task_cache: dict[Path, _TaskCache] = {}
+_task_cache_lock = threading.Lock()
+
+
+def _epoch(team_dir: Path) -> str | None:
+    try:
+        return (team_dir / EPOCH_FILE).read_text()
+    except FileNotFoundError:
+        return None
 
 
-def _would_create_cycle(
-    team_dir: Path, from_id: str, to_id: str, pending_edges: dict[str, set[str]]
-) -> bool:
-    """True if making from_id blocked_by to_id creates a cycle.
+def _cache_get(team_dir: Path, version: int | None) -> _TaskCache | None:
+    if version is None:
+        return None
+    cache = _task_cache.get(team_dir)
+    if cache is None or cache.version != version or cache.epoch != _epoch(team_dir):
+        return None
+    return cache
 
-    BFS from to_id through blocked_by chains (on-disk + pending);
-    cycle if it reaches from_id.
+
+def _cache_put(
+    team_dir: Path,
+    version: int,
+    raws: dict[str, dict],
+    complete: bool = False,
+    listing: _Listing | None = None,
+) -> None:
+    """Remember task files read at *version*.
+
+    Callers outside the team lock must have seen *version* both before and
+    after reading. Entries for an older version or another incarnation of
+    the team are discarded; a cache that has already moved past *version*
+    is left alone.
     """
-    visited: set[str] = set()
-    queue = deque([to_id])
-    while queue:
-        current = queue.popleft()
-        if current == from_id:
-            return True
-        if current in visited:
-            continue
-        visited.add(current)
-        fpath = team_dir / f"{current}.json"
-        if fpath.exists():
-            task = TaskFile(**json.loads(fpath.read_text()))
-            queue.extend(d for d in task.blocked_by if d not in visited)
-        queue.extend(d for d in pending_edges.get(current, set()) if d not in visited)
-    return False
+    epoch = _epoch(team_dir)
+    with _task_cache_lock:
+        cache = _task_cache.get(team_dir)
+        if cache is None or cache.epoch != epoch or cache.version < version:
+            cache = _task_cache[team_dir] = _TaskCache(epoch, version)
+        elif cache.version > version:
+            return
+        cache.raw.update(raws)
+        cache.complete = cache.complete or complete
+        if listing is not None:
+            cache.listing = listing
+
+
+def forget_team(team_name: str, base_dir: Path | None = None) -> None:
+    """Drop this process's cached task state for a deleted team."""
+    team_dir = _tasks_dir(base_dir) / team_name
+    with _task_cache_lock:
+        _task_cache.pop(team_dir, None)
+    forget_index(team_dir)
+
+
+def _cache_written(
+    team_dir: Path,
+    before: int,
+    after: int,
+    written: Iterable[TaskFile],
+    removed: Iterable[str] = (),
+) -> None:
+    """Carry the cache across this process's own write from *before* to *after*.
+
+    *written* and *removed* must cover every task file the write touched.
+    If the cache is not at *before* it is left to go stale.
+    """
+    with _task_cache_lock:
+        cache = _task_cache.get(team_dir)
+        if cache is None or cache.version != before:
+            return
+        cache.version = after
+        cache.listing = None
+        for task in written:
+            cache.raw[task.id] = task.model_dump(by_alias=True, exclude_none=True)
+        for task_id in removed:
+            cache.raw.pop(task_id, None)
+
+
+def _read_raw(team_dir: Path, task_id: str, version: int) -> dict:
+    """Parsed task file. Must be called with the team task lock held."""
+    cache = _cache_get(team_dir, version)
+    if cache is not None and task_id in cache.raw:
+        return cache.raw[task_id]
+    raw = json.loads((team_dir / f"{task_id}.json").read_text())
+    _cache_put(team_dir, version, {task_id: raw})
+    return raw
+
+
+def _commit(
+    team_dir: Path,
+    index: TaskIndex,
+    action: str,
+    written: Iterable[TaskFile],
+    removed: Iterable[str] = (),
+) -> None:
+    """Journal one mutation, then apply it. Must be called with the team task lock held.
+
+    The event record reaches ``events.jsonl`` before any task file is
+    written, so recovery can finish a mutation a crash cut short. The
+    files, the index and the read cache are updated together.
+    """
+    written = list(written)
+    removed = list(removed)
+    raws = [t.model_dump(by_alias=True, exclude_none=True) for t in written]
+    if not task_events.has_history(team_dir):
+        # Tasks written before the log existed become its starting point.
+        task_events.write_snapshot(
+            team_dir, 0, {f.stem: json.loads(f.read_text()) for f in task_files(team_dir)}
+        )
+    seq = task_events.last_seq(team_dir) + 1
+    before = index.version
+    with index_transaction(team_dir, index, seq):
+        log_size = task_events.append_event(team_dir, seq, action, raws, removed)
+        for task, raw in zip(written, raws):
+            # Readers outside the lock must never see a half-written file.
+            atomic_write(team_dir / f"{task.id}.json", json.dumps(raw).encode())
+            index.put(task)
+        for task_id in removed:
+            (team_dir / f"{task_id}.json").unlink()
+            index.remove(task_id)
+    _cache_written(team_dir, before, index.version, written, removed)
+    if log_size > task_events.TASK_EVENTS_SNAPSHOT_BYTES:
+        task_events.compact(team_dir)
+
+
+def _counter_path(team_dir: Path) -> Path:
+    return team_dir / ".next_id"
+
+
+def _read_counter(team_dir: Path, index: TaskIndex) -> int:
+    """Next id from the persisted counter, healed from the index if unusable.
+
+    A missing or unreadable counter, or one at or below an existing task id
+    (left behind by tasks written without it, even if that id was deleted
+    since), falls back to one past the highest id in *index*. Ids are
+    never reused, even after deletes.
+    """
+    try:
+        n = int(_counter_path(team_dir).read_text())
+    except (FileNotFoundError, ValueError):
+        n = 0
+    return max(n, index.max_id + 1)
+
+
+def _allocate_task_ids(team_dir: Path, index: TaskIndex, count: int = 1) -> list[str]:
+    """Reserve *count* consecutive ids. Must be called with the team task lock held."""
+    n = _read_counter(team_dir, index)
+    _counter_path(team_dir).write_text(str(n + count))
+    return [str(i) for i in range(n, n + count)]
 
 
 def next_task_id(team_name: str, base_dir: Path | None = None) -> str:
     team_dir = _tasks_dir(base_dir) / team_name
-    ids: list[int] = []
-    for f in team_dir.glob("*.json"):
-        try:
-            ids.append(int(f.stem))
-        except ValueError:
-            continue
-    return str(max(ids) + 1) if ids else "1"
+    if not team_dir.exists():
+        return "1"
+    with file_lock(team_dir / ".lock"):
+        return str(_read_counter(team_dir, load_index(team_dir)))
+
+
+def import_tasks(
+    team_name: str, board: list[TaskFile], next_id: str, base_dir: Path | None = None
+) -> None:
+    """Write *board* as the tasks of an existing, empty team; ids are kept.
+
+    For ``storage`` imports and exports: the event log starts with one
+    ``create`` record holding the whole board, and the id counter is set
+    to *next_id*.
+    """
+    team_dir = _tasks_dir(base_dir) / team_name
+    with file_lock(team_dir / ".lock"):
+        if board:
+            _commit(team_dir, load_index(team_dir), "create", board)
+        _counter_path(team_dir).write_text(next_id)
 
 
 def create_task(
@@ -76,7 +250,8 @@ def create_task(
     lock_path = team_dir / ".lock"
 
     with file_lock(lock_path):
-        task_id = next_task_id(team_name, base_dir)
+        index = load_index(team_dir)
+        [task_id] = _allocate_task_ids(team_dir, index)
         task = TaskFile(
             id=task_id,
             subject=subject,
@@ -85,18 +260,57 @@ def create_task(
             status="pending",
             metadata=metadata,
         )
-        fpath = team_dir / f"{task_id}.json"
-        fpath.write_text(json.dumps(task.model_dump(by_alias=True, exclude_none=True)))
+        _commit(team_dir, index, "create", [task])
 
     return task
 
 
+def create_tasks(
+    team_name: str, specs: list[TaskSpec], base_dir: Path | None = None
+) -> list[TaskFile]:
+    """Create several tasks and their dependencies in one locked write.
+
+    Each spec's ``blocked_by`` may name another spec's ``ref`` (resolved to
+    the id it is assigned) or an existing task id; a ref shadows an id with
+    the same spelling. Existing tasks cannot depend on new ones, so any
+    cycle lies within the batch and one topological pass over it rejects
+    the whole batch before anything is written. Returns the new tasks in
+    spec order.
+    """
+    if not team_exists(team_name, base_dir):
+        raise ValueError(f"Team {team_name!r} does not exist")
+    refs = check_batch(specs)
+    if not specs:
+        return []
+    team_dir = _tasks_dir(base_dir) / team_name
+    team_dir.mkdir(parents=True, exist_ok=True)
+
+    with file_lock(team_dir / ".lock"):
+        index = load_index(team_dir)
+        created, others = plan_batch(
+            specs,
+            refs,
+            index,
+            lambda n: _allocate_task_ids(team_dir, index, n),
+            lambda t: TaskFile(**_read_raw(team_dir, t, index.version)),
+        )
+        _commit(team_dir, index, "create", [*created, *others])
+
+    return created
+
+
 def get_task(
     team_name: str, task_id: str, base_dir: Path | None = None
 ) -> TaskFile:
     team_dir = _tasks_dir(base_dir) / team_name
+    version = read_version(team_dir)
+    cache = _cache_get(team_dir, version)
+    if cache is not None and task_id in cache.raw:
+        return TaskFile(**cache.raw[task_id])
     fpath = team_dir / f"{task_id}.json"
     raw = json.loads(fpath.read_text())
+    if version is not None and read_version(team_dir) == version:
+        _cache_put(team_dir, version, {task_id: raw})
     return TaskFile(**raw)
 
 
@@ -116,209 +330,330 @@ def update_task(
 ) -> TaskFile:
     team_dir = _tasks_dir(base_dir) / team_name
     lock_path = team_dir / ".lock"
-    fpath = team_dir / f"{task_id}.json"
 
     with file_lock(lock_path):
-        # --- Phase 1: Read ---
-        task = TaskFile(**json.loads(fpath.read_text()))
-
-        # --- Phase 2: Validate (no disk writes) ---
-        pending_edges: dict[str, set[str]] = {}
-
-        if add_blocks:
-            for b in add_blocks:
-                if b == task_id:
-                    raise ValueError(f"Task {task_id} cannot block itself")
-                if not (team_dir / f"{b}.json").exists():
-                    raise ValueError(f"Referenced task {b!r} does not exist")
-            for b in add_blocks:
-                pending_edges.setdefault(b, set()).add(task_id)
-
-        if add_blocked_by:
-            for b in add_blocked_by:
-                if b == task_id:
-                    raise ValueError(f"Task {task_id} cannot be blocked by itself")
-                if not (team_dir / f"{b}.json").exists():
-                    raise ValueError(f"Referenced task {b!r} does not exist")
-            for b in add_blocked_by:
-                pending_edges.setdefault(task_id, set()).add(b)
-
-        if add_blocks:
-            for b in add_blocks:
-                if _would_create_cycle(team_dir, b, task_id, pending_edges):
-                    raise ValueError(
-                        f"Adding block {task_id} -> {b} would create a circular dependency"
-                    )
-
-        if add_blocked_by:
-            for b in add_blocked_by:
-                if _would_create_cycle(team_dir, task_id, b, pending_edges):
-                    raise ValueError(
-                        f"Adding dependency {task_id} blocked_by {b} would create a circular dependency"
-                    )
-
-        if status is not None and status != "deleted":
-            cur_order = _STATUS_ORDER[task.status]
-            new_order = _STATUS_ORDER.get(status)
-            if new_order is None:
-                raise ValueError(f"Invalid status: {status!r}")
-            if new_order < cur_order:
-                raise ValueError(
-                    f"Cannot transition from {task.status!r} to {status!r}"
-                )
-            effective_blocked_by = set(task.blocked_by)
-            if add_blocked_by:
-                effective_blocked_by.update(add_blocked_by)
-            if status in ("in_progress", "completed") and effective_blocked_by:
-                for blocker_id in effective_blocked_by:
-                    blocker_path = team_dir / f"{blocker_id}.json"
-                    if blocker_path.exists():
-                        blocker = TaskFile(**json.loads(blocker_path.read_text()))
-                        if blocker.status != "completed":
-                            raise ValueError(
-                                f"Cannot set status to {status!r}: "
-                                f"blocked by task {blocker_id} (status: {blocker.status!r})"
-                            )
-
-        # --- Phase 3: Mutate (in-memory only) ---
-        pending_writes: dict[Path, TaskFile] = {}
-
-        if subject is not None:
-            task.subject = subject
-        if description is not None:
-            task.description = description
-        if active_form is not None:
-            task.active_form = active_form
-        if owner is not None:
-            task.owner = owner
-
-        if add_blocks:
-            existing = set(task.blocks)
-            for b in add_blocks:
-                if b not in existing:
-                    task.blocks.append(b)
-                    existing.add(b)
-                b_path = team_dir / f"{b}.json"
-                if b_path in pending_writes:
-                    other = pending_writes[b_path]
-                else:
-                    other = TaskFile(**json.loads(b_path.read_text()))
-                if task_id not in other.blocked_by:
-                    other.blocked_by.append(task_id)
-                pending_writes[b_path] = other
-
-        if add_blocked_by:
-            existing = set(task.blocked_by)
-            for b in add_blocked_by:
-                if b not in existing:
-                    task.blocked_by.append(b)
-                    existing.add(b)
-                b_path = team_dir / f"{b}.json"
-                if b_path in pending_writes:
-                    other = pending_writes[b_path]
-                else:
-                    other = TaskFile(**json.loads(b_path.read_text()))
-                if task_id not in other.blocks:
-                    other.blocks.append(task_id)
-                pending_writes[b_path] = other
-
-        if metadata is not None:
-            current = task.metadata or {}
-            for k, v in metadata.items():
-                if v is None:
-                    current.pop(k, None)
-                else:
-                    current[k] = v
-            task.metadata = current if current else None
-
-        if status is not None and status != "deleted":
-            task.status = status
-            if status == "completed":
-                for f in team_dir.glob("*.json"):
-                    try:
-                        int(f.stem)
-                    except ValueError:
-                        continue
-                    if f.stem == task_id:
-                        continue
-                    if f in pending_writes:
-                        other = pending_writes[f]
-                    else:
-                        other = TaskFile(**json.loads(f.read_text()))
-                    if task_id in other.blocked_by:
-                        other.blocked_by.remove(task_id)
-                        pending_writes[f] = other
-
-        if status == "deleted":
-            task.status = "deleted"
-            for f in team_dir.glob("*.json"):
-                try:
-                    int(f.stem)
-                except ValueError:
-                    continue
-                if f.stem == task_id:
-                    continue
-                if f in pending_writes:
-                    other = pending_writes[f]
-                else:
-                    other = TaskFile(**json.loads(f.read_text()))
-                changed = False
-                if task_id in other.blocked_by:
-                    other.blocked_by.remove(task_id)
-                    changed = True
-                if task_id in other.blocks:
-                    other.blocks.remove(task_id)
-                    changed = True
-                if changed:
-                    pending_writes[f] = other
-
-        # --- Phase 4: Write ---
+        index = load_index(team_dir)
+        task = TaskFile(**_read_raw(team_dir, task_id, index.version))
+        others = plan_update(
+            task,
+            index,
+            lambda t: TaskFile(**_read_raw(team_dir, t, index.version)),
+            status=status,
+            owner=owner,
+            subject=subject,
+            description=description,
+            active_form=active_form,
+            add_blocks=add_blocks,
+            add_blocked_by=add_blocked_by,
+            metadata=metadata,
+        )
         if status == "deleted":
-            _flush_pending_writes(pending_writes)
-            fpath.unlink()
+            _commit(team_dir, index, "delete", others.values(), [task_id])
         else:
-            fpath.write_text(
-                json.dumps(task.model_dump(by_alias=True, exclude_none=True))
-            )
-            _flush_pending_writes(pending_writes)
+            _commit(team_dir, index, "update", [task, *others.values()])
 
     return task
 
 
+def claim_next_task(
+    team_name: str,
+    agent_name: str,
+    metadata: dict | None = None,
+    base_dir: Path | None = None,
+) -> TaskFile | None:
+    """Atomically hand the best ready task to *agent_name*.
+
+    Ready tasks are pending, unowned and have every blocker completed; the
+    highest ``metadata["priority"]`` wins, then the lowest id. With
+    *metadata*, only tasks whose metadata contains all of those key/value
+    pairs are considered. The task is marked ``in_progress`` and owned by
+    the agent before the lock is released, so concurrent callers never get
+    the same task. Returns None when nothing is ready.
+    """
+    if not team_exists(team_name, base_dir):
+        raise ValueError(f"Team {team_name!r} does not exist")
+    team_dir = _tasks_dir(base_dir) / team_name
+
+    with file_lock(team_dir / ".lock"):
+        index = load_index(team_dir)
+        for task_id in index.ready_order():
+            task = TaskFile(**_read_raw(team_dir, task_id, index.version))
+            if metadata and any(
+                (task.metadata or {}).get(k) != v for k, v in metadata.items()
+            ):
+                continue
+            task.status = "in_progress"
+            task.owner = agent_name
+            task.lease_expires_at = lease_deadline()
+            _commit(team_dir, index, "claim", [task])
+            return task
+    return None
+
+
 def list_tasks(
     team_name: str, base_dir: Path | None = None
 ) -> list[TaskFile]:
     if not team_exists(team_name, base_dir):
         raise ValueError(f"Team {team_name!r} does not exist")
     team_dir = _tasks_dir(base_dir) / team_name
-    tasks: list[TaskFile] = []
-    for f in team_dir.glob("*.json"):
+    version = read_version(team_dir)
+    cache = _cache_get(team_dir, version)
+    if cache is not None and cache.complete:
+        raws = dict(cache.raw)
+    else:
+        raws = {}
+        for f in team_dir.glob("*.json"):
+            try:
+                int(f.stem)
+            except ValueError:
+                continue
+            raws[f.stem] = json.loads(f.read_text())
+        if version is not None and read_version(team_dir) == version:
+            _cache_put(team_dir, version, raws, complete=True)
+    return [TaskFile(**raws[task_id]) for task_id in sorted(raws, key=int)]
+
+
+# Task fields answered from the index without opening task files.
+INDEX_FIELDS = frozenset(
+    {"id", "subject", "status", "owner", "blocks", "blockedBy", "leaseExpiresAt"}
+)
+
+
+def query_tasks(
+    team_name: str,
+    *,
+    status: str | None = None,
+    owner: str | None = None,
+    ready_only: bool = False,
+    limit: int | None = None,
+    cursor: str | None = None,
+    fields: list[str] | None = None,
+    base_dir: Path | None = None,
+) -> tuple[list[dict], str | None]:
+    """List tasks in id order with filters, paging and a field projection.
+
+    Filtering and paging run on the task index. With *fields* limited to
+    ``INDEX_FIELDS`` no task file is opened; otherwise only the files of
+    the returned page are read. ``ready_only`` keeps tasks that
+    ``claim_next_task`` could hand out. *cursor* is the last id of the
+    previous page; the returned cursor is None once the listing is done.
+    Tasks come back as alias-form dicts, with ``id`` always included.
+    While ``index.version`` is unchanged the team lock is not taken: the
+    index fields come from this process's task cache.
+    """
+    if not team_exists(team_name, base_dir):
+        raise ValueError(f"Team {team_name!r} does not exist")
+    if cursor and not cursor.isdigit():
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    team_dir = _tasks_dir(base_dir) / team_name
+    after = int(cursor) if cursor else 0
+
+    # Lock-free while index.version is unchanged, like get_task.
+    version = read_version(team_dir)
+    cache = _cache_get(team_dir, version)
+    if cache is not None and cache.listing is not None:
+        page, next_cursor = _select(cache.listing, status, owner, ready_only, after, limit)
+        if fields is not None and INDEX_FIELDS.issuperset(fields):
+            return _project(page, fields), next_cursor
+        raws: dict[str, dict] = {}
         try:
-            int(f.stem)
-        except ValueError:
+            for task_id, _entry in page:
+                raws[task_id] = cache.raw.get(task_id) or json.loads(
+                    (team_dir / f"{task_id}.json").read_text()
+                )
+        except FileNotFoundError:
+            pass
+        else:
+            if read_version(team_dir) == version:
+                _cache_put(team_dir, version, raws)
+                return _select_fields(raws.values(), fields), next_cursor
+
+    with file_lock(team_dir / ".lock"):
+        index = load_index(team_dir)
+        listing = (
+            dict(index.tasks),
+            frozenset(index.ready),
+            {name: frozenset(ids) for name, ids in index.owned.items()},
+        )
+        _cache_put(team_dir, index.version, {}, listing=listing)
+        page, next_cursor = _select(listing, status, owner, ready_only, after, limit)
+        if fields is not None and INDEX_FIELDS.issuperset(fields):
+            return _project(page, fields), next_cursor
+        raws = [_read_raw(team_dir, task_id, index.version) for task_id, _entry in page]
+    return _select_fields(raws, fields), next_cursor
+
+
+def _select(
+    listing: _Listing,
+    status: str | None,
+    owner: str | None,
+    ready_only: bool,
+    after: int,
+    limit: int | None,
+) -> tuple[list[tuple[str, dict]], str | None]:
+    """The page of ``query_tasks`` as (id, index entry) pairs, and the next cursor."""
+    tasks, ready, owned = listing
+    candidates = ready if ready_only else tasks.keys()
+    if owner is not None:
+        candidates = candidates & owned.get(owner, frozenset())
+    ids = sorted((t for t in candidates if int(t) > after), key=int)
+    page: list[tuple[str, dict]] = []
+    for task_id in ids:
+        entry = tasks[task_id]
+        if status is not None and entry["status"] != status:
             continue
-        tasks.append(TaskFile(**json.loads(f.read_text())))
-    tasks.sort(key=lambda t: int(t.id))
-    return tasks
+        if limit is not None and len(page) >= limit:
+            return page, page[-1][0]
+        page.append((task_id, entry))
+    return page, None
+
+
+def _project(page: list[tuple[str, dict]], fields: list[str]) -> list[dict]:
+    wanted = set(fields) | {"id"}
+    return [
+        {"id": task_id} | {k: v for k, v in entry.items() if k in wanted and v is not None}
+        for task_id, entry in page
+    ]
+
+
+def _select_fields(raws: Iterable[dict], fields: list[str] | None) -> list[dict]:
+    if fields is None:
+        return [dict(raw) for raw in raws]
+    return [{k: v for k, v in raw.items() if k in fields or k == "id"} for raw in raws]
+
+
+def tasks_by_owner(
+    team_name: str,
+    owner: str | None = None,
+    status: str | None = None,
+    base_dir: Path | None = None,
+) -> dict[str, list[dict]]:
+    """Owned tasks grouped by owner, answered from the index alone.
+
+    Each task is ``{"id", "subject", "status"}`` plus ``leaseExpiresAt``
+    while claimed, in id order. *owner* restricts the result to one owner
+    (present with an empty list if it owns nothing); *status* keeps only
+    tasks in that status.
+    """
+    if not team_exists(team_name, base_dir):
+        raise ValueError(f"Team {team_name!r} does not exist")
+    team_dir = _tasks_dir(base_dir) / team_name
+
+    with file_lock(team_dir / ".lock"):
+        index = load_index(team_dir)
+        owners = [owner] if owner is not None else sorted(index.owned)
+        result: dict[str, list[dict]] = {}
+        for name in owners:
+            rows = []
+            for task_id in sorted(index.owned.get(name, ()), key=int):
+                entry = index.tasks[task_id]
+                if status is not None and entry["status"] != status:
+                    continue
+                row = {"id": task_id, "subject": entry["subject"], "status": entry["status"]}
+                if entry["leaseExpiresAt"] is not None:
+                    row["leaseExpiresAt"] = entry["leaseExpiresAt"]
+                rows.append(row)
+            if rows or owner is not None:
+                result[name] = rows
+    return result
 
 
 def reset_owner_tasks(
     team_name: str, agent_name: str, base_dir: Path | None = None
 ) -> None:
+    """Release every task *agent_name* owns; unfinished ones go back to pending.
+
+    Only the agent's own tasks, found through the index's owner map, are read.
+    """
     team_dir = _tasks_dir(base_dir) / team_name
     lock_path = team_dir / ".lock"
 
     with file_lock(lock_path):
-        for f in team_dir.glob("*.json"):
-            try:
-                int(f.stem)
-            except ValueError:
-                continue
-            task = TaskFile(**json.loads(f.read_text()))
-            if task.owner == agent_name:
-                if task.status != "completed":
-                    task.status = "pending"
-                task.owner = None
-                f.write_text(
-                    json.dumps(task.model_dump(by_alias=True, exclude_none=True))
-                )
+        index = load_index(team_dir)
+        reset: list[TaskFile] = []
+        for task_id in sorted(index.owned.get(agent_name, ()), key=int):
+            task = TaskFile(**_read_raw(team_dir, task_id, index.version))
+            if task.status != "completed":
+                task.status = "pending"
+            task.owner = None
+            task.lease_expires_at = None
+            reset.append(task)
+        if reset:
+            _commit(team_dir, index, "reset", reset)
+
+
+def renew_leases(
+    team_name: str, agent_name: str, base_dir: Path | None = None
+) -> list[TaskFile]:
+    """Extend the lease on every in-progress task owned by *agent_name*."""
+    team_dir = _tasks_dir(base_dir) / team_name
+    with file_lock(team_dir / ".lock"):
+        index = load_index(team_dir)
+        owned = index.owned.get(agent_name, ())
+        ids = sorted((t for t in owned if index.tasks[t]["status"] == "in_progress"), key=int)
+        if not ids:
+            return []
+        deadline = lease_deadline()
+        renewed: list[TaskFile] = []
+        for task_id in ids:
+            task = TaskFile(**_read_raw(team_dir, task_id, index.version))
+            task.lease_expires_at = deadline
+            renewed.append(task)
+        _commit(team_dir, index, "renew", renewed)
+    return renewed
+
+
+def expire_leases(
+    team_name: str, now_ms: int | None = None, base_dir: Path | None = None
+) -> list[TaskFile]:
+    """Requeue in-progress tasks whose lease has run out.
+
+    Expired tasks go back to pending with no owner, so ``claim_next_task``
+    can hand them out again. Only the leased tasks recorded in the index
+    are examined. Returns the requeued tasks as they were before requeueing.
+    """
+    team_dir = _tasks_dir(base_dir) / team_name
+    if not team_dir.exists():
+        return []
+    now = int(time.time() * 1000) if now_ms is None else now_ms
+    with file_lock(team_dir / ".lock"):
+        index = load_index(team_dir)
+        expired = sorted((t for t, exp in index.leases.items() if exp <= now), key=int)
+        if not expired:
+            return []
+        requeued: list[TaskFile] = []
+        written: list[TaskFile] = []
+        for task_id in expired:
+            task = TaskFile(**_read_raw(team_dir, task_id, index.version))
+            requeued.append(task.model_copy(deep=True))
+            task.status = "pending"
+            task.owner = None
+            task.lease_expires_at = None
+            written.append(task)
+        _commit(team_dir, index, "expire", written)
+    return requeued
+
+
+def task_changes(
+    team_name: str,
+    since_seq: int = 0,
+    limit: int | None = None,
+    base_dir: Path | None = None,
+) -> tuple[list[dict], int, list[dict] | None]:
+    """Task event records after *since_seq*; see ``task_events.read_changes``.
+
+    Each record carries the full new contents of the tasks one mutation
+    wrote and the ids it deleted. When the feed cannot be resumed from
+    *since_seq* the third element is the whole task set to resync from.
+    """
+    if not team_exists(team_name, base_dir):
+        raise ValueError(f"Team {team_name!r} does not exist")
+    if since_seq < 0:
+        raise ValueError("since_seq must not be negative")
+    team_dir = _tasks_dir(base_dir) / team_name
+    if not team_dir.exists():
+        return [], 0, None
+    with file_lock(team_dir / ".lock"):
+        # Finishes any mutation a crash cut short before its record is served.
+        load_index(team_dir)
+        return task_events.read_changes(team_dir, since_seq, limit)
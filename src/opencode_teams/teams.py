@@ -6,8 +6,12 @@ import re
 import shutil
 import tempfile
 import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
+from opencode_teams._filelock import file_lock
 from opencode_teams.models import (
     LeadMember,
     TeamConfig,
@@ -20,7 +24,12 @@ BASE_DIR = Path.home() / ".opencode-teams"
 TEAMS_DIR = BASE_DIR / "teams"
 TASKS_DIR = BASE_DIR / "tasks"
 
+# Written into a team's task dir at creation; tells a recreated team apart
+# from the one it replaced.
+EPOCH_FILE = ".epoch"
+
 _VALID_NAME_RE = re.compile(r"^[A-Za-z0-9_-]+$")
+_VALID_TOPIC_RE = re.compile(r"^[A-Za-z0-9_.:-]+$")
 
 
 def _teams_dir(base_dir: Path | None = None) -> Path:
@@ -31,19 +40,7 @@ def _tasks_dir(base_dir: Path | None = None) -> Path:
     return (base_dir / "tasks") if base_dir else TASKS_DIR
 
 
-def team_exists(name: str, base_dir: Path | None = None) -> bool:
-    config_path = _teams_dir(base_dir) / name / "config.json"
-    return config_path.exists()
-
-
-def create_team(
-    name: str,
-    session_id: str,
-    description: str = "",
-    lead_model: str = "moonshotai/kimi-k2.5",
-    base_dir: Path | None = None,
-    project_dir: Path | None = None,
-) -> TeamCreateResult:
+def validate_team_name(name: str) -> None:
     if not _VALID_NAME_RE.match(name):
         raise ValueError(
             f"Invalid team name: {name!r}. Use only letters, numbers, hyphens, underscores."
@@ -53,18 +50,23 @@ def create_team(
             f"Team name too long ({len(name)} chars, max 64): {name[:20]!r}..."
         )
 
-    teams_dir = _teams_dir(base_dir)
-    tasks_dir = _tasks_dir(base_dir)
 
-    team_dir = teams_dir / name
-    team_dir.mkdir(parents=True, exist_ok=True)
+def validate_topic(topic: str) -> None:
+    if not _VALID_TOPIC_RE.match(topic) or len(topic) > 128:
+        raise ValueError(
+            f"Invalid topic: {topic!r}. Use letters, numbers, '.', ':', '-', '_' (max 128)."
+        )
 
-    task_dir = tasks_dir / name
-    task_dir.mkdir(parents=True, exist_ok=True)
-    (task_dir / ".lock").touch()
 
+def new_team_config(
+    name: str,
+    session_id: str,
+    description: str = "",
+    lead_model: str = "moonshotai/kimi-k2.5",
+    project_dir: Path | None = None,
+) -> TeamConfig:
+    """The config of a freshly created team: just the lead."""
     now_ms = int(time.time() * 1000)
-
     lead = LeadMember(
         agent_id=f"team-lead@{name}",
         name="team-lead",
@@ -74,8 +76,7 @@ def create_team(
         tmux_pane_id="",
         cwd=str(Path.cwd()),
     )
-
-    config = TeamConfig(
+    return TeamConfig(
         name=name,
         description=description,
         created_at=now_ms,
@@ -85,6 +86,78 @@ def create_team(
         members=[lead],
     )
 
+
+# The apply_* helpers edit a loaded config in place; each storage engine
+# wraps them in its own locked read-modify-write.
+
+
+def apply_add_member(config: TeamConfig, member: TeammateMember) -> None:
+    if member.name in {m.name for m in config.members}:
+        raise ValueError(f"Member {member.name!r} already exists in team {config.name!r}")
+    config.members.append(member)
+
+
+def apply_member_update(config: TeamConfig, agent_name: str, fields: dict) -> None:
+    member = next(
+        (m for m in config.members if isinstance(m, TeammateMember) and m.name == agent_name),
+        None,
+    )
+    if member is None:
+        raise ValueError(f"Teammate {agent_name!r} is not a member of team {config.name!r}")
+    for field, value in fields.items():
+        setattr(member, field, value)
+
+
+def apply_subscription(
+    config: TeamConfig, agent_name: str, topic: str, subscribed: bool
+) -> list[str]:
+    """Add or drop *topic* for *agent_name*; returns the member's subscriptions."""
+    member = next((m for m in config.members if m.name == agent_name), None)
+    if member is None:
+        raise ValueError(f"Agent {agent_name!r} is not a member of team {config.name!r}")
+    current = list(member.subscriptions)
+    if subscribed and topic not in current:
+        member.subscriptions = current + [topic]
+    elif not subscribed and topic in current:
+        member.subscriptions = [t for t in current if t != topic]
+    return list(member.subscriptions)
+
+
+def team_names(base_dir: Path | None = None) -> list[str]:
+    teams_dir = _teams_dir(base_dir)
+    if not teams_dir.is_dir():
+        return []
+    return sorted(d.name for d in teams_dir.iterdir() if (d / "config.json").exists())
+
+
+def team_exists(name: str, base_dir: Path | None = None) -> bool:
+    config_path = _teams_dir(base_dir) / name / "config.json"
+    return config_path.exists()
+
+
+def create_team(
+    name: str,
+    session_id: str,
+    description: str = "",
+    lead_model: str = "moonshotai/kimi-k2.5",
+    base_dir: Path | None = None,
+    project_dir: Path | None = None,
+) -> TeamCreateResult:
+    validate_team_name(name)
+
+    teams_dir = _teams_dir(base_dir)
+    tasks_dir = _tasks_dir(base_dir)
+
+    team_dir = teams_dir / name
+    team_dir.mkdir(parents=True, exist_ok=True)
+
+    task_dir = tasks_dir / name
+    task_dir.mkdir(parents=True, exist_ok=True)
+    (task_dir / ".lock").touch()
+    (task_dir / EPOCH_FILE).write_text(uuid.uuid4().hex)
+
+    config = new_team_config(name, session_id, description, lead_model, project_dir)
+
     config_path = team_dir / "config.json"
     config_path.write_text(json.dumps(config.model_dump(by_alias=True), indent=2))
 
@@ -120,6 +193,21 @@ def write_config(name: str, config: TeamConfig, base_dir: Path | None = None) ->
         raise
 
 
+@contextmanager
+def _config_transaction(name: str, base_dir: Path | None = None) -> Iterator[TeamConfig]:
+    """Read-modify-write of config.json, serialized across processes.
+
+    Yields the config; it is written back if the block finishes without
+    raising. Every update of an existing config goes through here so that
+    concurrent spawns, removals and subscriptions never lose each other's
+    changes.
+    """
+    with file_lock(_teams_dir(base_dir) / name / "config.lock"):
+        config = read_config(name, base_dir=base_dir)
+        yield config
+        write_config(name, config, base_dir=base_dir)
+
+
 def delete_team(name: str, base_dir: Path | None = None) -> TeamDeleteResult:
     config = read_config(name, base_dir=base_dir)
 
@@ -133,6 +221,10 @@ def delete_team(name: str, base_dir: Path | None = None) -> TeamDeleteResult:
     shutil.rmtree(_teams_dir(base_dir) / name)
     shutil.rmtree(_tasks_dir(base_dir) / name)
 
+    from opencode_teams.tasks import forget_team
+
+    forget_team(name, base_dir=base_dir)
+
     return TeamDeleteResult(
         success=True,
         message=f'Cleaned up directories and worktrees for team "{name}"',
@@ -141,12 +233,25 @@ def delete_team(name: str, base_dir: Path | None = None) -> TeamDeleteResult:
 
 
 def add_member(name: str, member: TeammateMember, base_dir: Path | None = None) -> None:
-    config = read_config(name, base_dir=base_dir)
-    existing_names = {m.name for m in config.members}
-    if member.name in existing_names:
-        raise ValueError(f"Member {member.name!r} already exists in team {name!r}")
-    config.members.append(member)
-    write_config(name, config, base_dir=base_dir)
+    with _config_transaction(name, base_dir) as config:
+        apply_add_member(config, member)
+
+
+def update_member(
+    team_name: str, agent_name: str, base_dir: Path | None = None, **fields: object
+) -> None:
+    """Set *fields* (e.g. ``tmux_pane_id``) on a teammate's config entry."""
+    with _config_transaction(team_name, base_dir) as config:
+        apply_member_update(config, agent_name, fields)
+
+
+def set_default_project_dir(
+    team_name: str, project_dir: Path, base_dir: Path | None = None
+) -> None:
+    """Record *project_dir* on a team created before it was stored."""
+    with _config_transaction(team_name, base_dir) as config:
+        if config.project_dir is None:
+            config.project_dir = str(project_dir)
 
 
 def get_project_dir(team_name: str, base_dir: Path | None = None) -> Path:
@@ -162,9 +267,8 @@ def remove_member(
 ) -> None:
     if agent_name == "team-lead":
         raise ValueError("Cannot remove team-lead from team")
-    config = read_config(team_name, base_dir=base_dir)
-    config.members = [m for m in config.members if m.name != agent_name]
-    write_config(team_name, config, base_dir=base_dir)
+    with _config_transaction(team_name, base_dir) as config:
+        config.members = [m for m in config.members if m.name != agent_name]
 
     # Best-effort cleanup of agent config file in the target project
     try:
@@ -174,3 +278,25 @@ def remove_member(
         cleanup_agent_config(project, agent_name)
     except Exception:
         pass
+
+
+def _set_subscription(
+    team_name: str, agent_name: str, topic: str, subscribed: bool, base_dir: Path | None
+) -> list[str]:
+    validate_topic(topic)
+    with _config_transaction(team_name, base_dir) as config:
+        return apply_subscription(config, agent_name, topic, subscribed)
+
+
+def subscribe_topic(
+    team_name: str, agent_name: str, topic: str, base_dir: Path | None = None
+) -> list[str]:
+    """Add *topic* to the member's subscriptions; returns the new list."""
+    return _set_subscription(team_name, agent_name, topic, True, base_dir)
+
+
+def unsubscribe_topic(
+    team_name: str, agent_name: str, topic: str, base_dir: Path | None = None
+) -> list[str]:
+    """Remove *topic* from the member's subscriptions; returns the new list."""
+    return _set_subscription(team_name, agent_name, topic, False, base_dir)
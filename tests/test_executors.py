@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+
+from opencode_teams.executors import DISK, SUBPROCESS, ToolExecutors
+
+request_id: contextvars.ContextVar[str] = contextvars.ContextVar("request_id")
+
+
+@pytest.fixture
+def executors():
+    ex = ToolExecutors({DISK: 2, SUBPROCESS: 1})
+    yield ex
+    ex.shutdown()
+
+
+async def test_runs_off_the_loop_with_the_callers_context(executors):
+    request_id.set("r1")
+    name, rid = await executors.run(
+        DISK, lambda: (threading.current_thread().name, request_id.get())
+    )
+    assert name.startswith("tool-disk") and rid == "r1"
+
+
+async def test_errors_propagate(executors):
+    with pytest.raises(ValueError, match="boom"):
+        await executors.run(DISK, lambda: (_ for _ in ()).throw(ValueError("boom")))
+
+
+async def test_a_saturated_category_does_not_delay_another(executors):
+    slow = [asyncio.create_task(executors.run(SUBPROCESS, time.sleep, 0.3)) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    assert executors.stats()[SUBPROCESS] == {"workers": 1, "pending": 3}
+    start = time.monotonic()
+    assert await executors.run(DISK, sum, [1, 2]) == 3
+    assert time.monotonic() - start < 0.2
+    await asyncio.gather(*slow)
+    assert executors.stats()[SUBPROCESS]["pending"] == 0
+
+
+def test_shutdown_stops_the_pools():
+    ex = ToolExecutors()
+    ex.shutdown()
+    with pytest.raises(RuntimeError):
+        asyncio.run(ex.run(DISK, sum, [1]))
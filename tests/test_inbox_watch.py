@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+from opencode_teams.inbox_watch import InboxWatcher
+from opencode_teams.messaging import inbox_path, send_plain_message
+
+
+@pytest.fixture(params=["inotify", "stat"])
+def watcher(request):
+    if request.param == "inotify" and not sys.platform.startswith("linux"):
+        pytest.skip("inotify is Linux-only")
+    w = InboxWatcher(use_inotify=request.param == "inotify", poll_interval=0.01)
+    yield w
+    w.close()
+
+
+def _inbox(tmp_base_dir: Path, agent: str) -> Path:
+    path = inbox_path("t", agent, base_dir=tmp_base_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+async def test_wait_times_out_without_changes(watcher, tmp_base_dir):
+    path = _inbox(tmp_base_dir, "alice")
+    ticket = watcher.subscribe(path)
+    try:
+        assert await watcher.wait(ticket, 0.05) is False
+    finally:
+        watcher.unsubscribe(path, ticket)
+
+
+async def test_append_wakes_waiter(watcher, tmp_base_dir):
+    path = _inbox(tmp_base_dir, "alice")
+    ticket = watcher.subscribe(path)
+    try:
+        loop = asyncio.get_running_loop()
+        loop.call_later(
+            0.02,
+            lambda: send_plain_message("t", "lead", "alice", "hi", summary="s", base_dir=tmp_base_dir),
+        )
+        assert await watcher.wait(ticket, 2.0) is True
+    finally:
+        watcher.unsubscribe(path, ticket)
+
+
+async def test_all_waiters_on_same_inbox_are_woken(watcher, tmp_base_dir):
+    path = _inbox(tmp_base_dir, "alice")
+    tickets = [watcher.subscribe(path) for _ in range(5)]
+    try:
+        send_plain_message("t", "lead", "alice", "hi", summary="s", base_dir=tmp_base_dir)
+        results = await asyncio.gather(*(watcher.wait(t, 2.0) for t in tickets))
+        assert all(results)
+    finally:
+        for t in tickets:
+            watcher.unsubscribe(path, t)
+
+
+async def test_other_inbox_does_not_wake_waiter(watcher, tmp_base_dir):
+    path = _inbox(tmp_base_dir, "alice")
+    ticket = watcher.subscribe(path)
+    try:
+        send_plain_message("t", "lead", "bob", "hi", summary="s", base_dir=tmp_base_dir)
+        assert await watcher.wait(ticket, 0.1) is False
+    finally:
+        watcher.unsubscribe(path, ticket)
+
+
+async def test_missing_directory_falls_back_to_polling(tmp_base_dir):
+    watcher = InboxWatcher(poll_interval=0.01)
+    path = inbox_path("new-team", "alice", base_dir=tmp_base_dir)
+    ticket = watcher.subscribe(path)
+    try:
+        send_plain_message("new-team", "lead", "alice", "hi", summary="s", base_dir=tmp_base_dir)
+        assert await watcher.wait(ticket, 2.0) is True
+    finally:
+        watcher.unsubscribe(path, ticket)
+        watcher.close()
+
+
+async def test_unsubscribe_releases_watch(watcher, tmp_base_dir):
+    path = _inbox(tmp_base_dir, "alice")
+    ticket = watcher.subscribe(path)
+    watcher.unsubscribe(path, ticket)
+    assert ticket.cancelled()
+    assert watcher._waiters == {}
+    assert watcher._dir_wds == {}
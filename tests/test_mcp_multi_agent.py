@@ -181,12 +181,13 @@ class TestMultiAgentMessageExchange:
         teams.add_member("t_bc", _make_teammate("alice", "t_bc"))
         teams.add_member("t_bc", _make_teammate("bob", "t_bc"))
 
-        await client.call_tool("send_message", {
+        result = _data(await client.call_tool("send_message", {
             "team_name": "t_bc",
             "type": "broadcast",
             "content": "all hands",
             "summary": "announcement",
-        })
+        }))
+        assert result["routing"]["delivery"] == {"alice": "delivered", "bob": "delivered"}
 
         alice_inbox = _data(await client.call_tool(
             "read_inbox", {"team_name": "t_bc", "agent_name": "alice"},
@@ -321,7 +322,7 @@ class TestFilesystemStateSharing:
     """
 
     async def test_inbox_file_exists_after_send(self, mcp_dirs: Path):
-        """Inbox JSON file on disk contains the expected message."""
+        """Inbox JSONL file on disk contains the expected message."""
         async with Client(mcp) as c:
             await c.call_tool("team_create", {"team_name": "t_fs1"})
             teams.add_member("t_fs1", _make_teammate("alice", "t_fs1"))
@@ -334,9 +335,9 @@ class TestFilesystemStateSharing:
             })
 
         # Read raw file from disk
-        inbox_file = mcp_dirs / "teams" / "t_fs1" / "inboxes" / "alice.json"
+        inbox_file = mcp_dirs / "teams" / "t_fs1" / "inboxes" / "alice.jsonl"
         assert inbox_file.exists(), f"Expected inbox file at {inbox_file}"
-        data = json.loads(inbox_file.read_text())
+        data = [json.loads(line) for line in inbox_file.read_text().splitlines()]
         assert len(data) == 1
         assert data[0]["from"] == "team-lead"
         assert data[0]["text"] == "disk check"
@@ -13,18 +13,33 @@ from opencode_teams.models import (
     ShutdownRequest,
     TaskAssignment,
     TaskFile,
+    TeammateMember,
 )
+from opencode_teams import messaging
 from opencode_teams.messaging import (
     append_message,
+    broadcast,
+    compact_inbox,
+    inbox_cache_stats,
+    query_inbox,
+    query_inbox_raw,
     ensure_inbox,
     inbox_path,
     now_iso,
+    publish,
     read_inbox,
+    read_inbox_history,
     send_plain_message,
     send_shutdown_request,
     send_structured_message,
     send_task_assignment,
+    topic_subscribers,
 )
+from opencode_teams.teams import add_member, create_team, subscribe_topic, unsubscribe_topic
+
+
+def _raw_lines(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines() if line]
 
 
 @pytest.fixture
@@ -38,15 +53,15 @@ def test_ensure_inbox_creates_directory_and_file(tmp_base_dir):
     path = ensure_inbox("test-team", "alice", base_dir=tmp_base_dir)
     assert path.exists()
     assert path.parent.name == "inboxes"
-    assert path.name == "alice.json"
-    assert json.loads(path.read_text()) == []
+    assert path.name == "alice.jsonl"
+    assert path.read_text() == ""
 
 
 def test_ensure_inbox_idempotent(tmp_base_dir):
     ensure_inbox("test-team", "alice", base_dir=tmp_base_dir)
     path = ensure_inbox("test-team", "alice", base_dir=tmp_base_dir)
     assert path.exists()
-    assert json.loads(path.read_text()) == []
+    assert path.read_text() == ""
 
 
 def test_append_message_accumulates(tmp_base_dir):
@@ -54,7 +69,7 @@ def test_append_message_accumulates(tmp_base_dir):
     msg2 = InboxMessage(from_="lead", text="world", timestamp=now_iso(), read=False, summary="yo")
     append_message("test-team", "bob", msg1, base_dir=tmp_base_dir)
     append_message("test-team", "bob", msg2, base_dir=tmp_base_dir)
-    raw = json.loads(inbox_path("test-team", "bob", base_dir=tmp_base_dir).read_text())
+    raw = _raw_lines(inbox_path("test-team", "bob", base_dir=tmp_base_dir))
     assert len(raw) == 2
 
 
@@ -63,7 +78,7 @@ def test_append_message_does_not_overwrite(tmp_base_dir):
     msg2 = InboxMessage(from_="lead", text="second", timestamp=now_iso(), read=False, summary="2")
     append_message("test-team", "bob", msg1, base_dir=tmp_base_dir)
     append_message("test-team", "bob", msg2, base_dir=tmp_base_dir)
-    raw = json.loads(inbox_path("test-team", "bob", base_dir=tmp_base_dir).read_text())
+    raw = _raw_lines(inbox_path("test-team", "bob", base_dir=tmp_base_dir))
     texts = [m["text"] for m in raw]
     assert "first" in texts
     assert "second" in texts
@@ -171,7 +186,7 @@ def test_should_not_lose_message_appended_during_mark_as_read(tmp_base_dir):
     append_message("test-team", "race", msg_a, base_dir=tmp_base_dir)
 
     path = inbox_path("test-team", "race", base_dir=tmp_base_dir)
-    lock_path = path.parent / ".lock"
+    lock_path = path.with_suffix(".lock")
     lock_path.parent.mkdir(parents=True, exist_ok=True)
 
     completed = threading.Event()
@@ -193,6 +208,437 @@ def test_should_not_lose_message_appended_during_mark_as_read(tmp_base_dir):
     )
 
 
+def test_locked_inbox_does_not_block_other_recipients(tmp_base_dir):
+    alice = ensure_inbox("test-team", "alice", base_dir=tmp_base_dir)
+    completed = threading.Event()
+
+    def do_send():
+        send_plain_message("test-team", "lead", "bob", "hi", summary="s", base_dir=tmp_base_dir)
+        completed.set()
+
+    with FileLock(str(alice.with_suffix(".lock"))):
+        sender = threading.Thread(target=do_send)
+        sender.start()
+        finished_while_locked = completed.wait(timeout=5.0)
+    sender.join(timeout=5)
+
+    assert finished_while_locked
+    assert not (alice.parent / ".lock").exists()
+
+
+def test_broadcast_delivers_identical_message_to_each_recipient(tmp_base_dir):
+    names = [f"agent-{i}" for i in range(12)]
+    status = broadcast("test-team", "lead", names, "all hands", summary="ann", base_dir=tmp_base_dir)
+    assert status == {n: "delivered" for n in names}
+    lines = {
+        n: inbox_path("test-team", n, base_dir=tmp_base_dir).read_bytes() for n in names
+    }
+    assert len(set(lines.values())) == 1
+    msgs = read_inbox("test-team", "agent-3", mark_as_read=False, base_dir=tmp_base_dir)
+    assert [(m.from_, m.text, m.summary) for m in msgs] == [("lead", "all hands", "ann")]
+
+
+def test_broadcast_to_nobody_is_a_no_op(tmp_base_dir):
+    assert broadcast("test-team", "lead", [], "x", summary="s", base_dir=tmp_base_dir) == {}
+
+
+def test_broadcast_reports_failed_recipient(tmp_base_dir):
+    ensure_inbox("test-team", "ok", base_dir=tmp_base_dir)
+    blocked = inbox_path("test-team", "blocked", base_dir=tmp_base_dir)
+    blocked.mkdir()  # a directory where the inbox file should be
+    status = broadcast("test-team", "lead", ["ok", "blocked"], "x", summary="s", base_dir=tmp_base_dir)
+    assert status["ok"] == "delivered"
+    assert status["blocked"].startswith("failed")
+
+
+def test_broadcast_delivers_on_the_calling_thread(tmp_base_dir, monkeypatch):
+    threads = []
+    deliver = messaging._deliver
+
+    def recording_deliver(*args):
+        threads.append(threading.current_thread())
+        deliver(*args)
+
+    monkeypatch.setattr(messaging, "_deliver", recording_deliver)
+    broadcast("test-team", "lead", ["a", "b", "c"], "x", summary="s", base_dir=tmp_base_dir)
+    assert threads == [threading.current_thread()] * 3
+
+
+def _teammate(name: str) -> TeammateMember:
+    return TeammateMember(
+        agent_id=f"{name}@pubsub", name=name, agent_type="teammate", model="m",
+        prompt="p", color="blue", joined_at=0, tmux_pane_id="", cwd="/tmp",
+    )
+
+
+def _subscribed_team(tmp_base_dir):
+    create_team("pubsub", "sess", base_dir=tmp_base_dir)
+    for name in ("alice", "bob", "carol"):
+        add_member("pubsub", _teammate(name), base_dir=tmp_base_dir)
+    subscribe_topic("pubsub", "alice", "ci", base_dir=tmp_base_dir)
+    subscribe_topic("pubsub", "carol", "ci", base_dir=tmp_base_dir)
+
+
+def test_publish_only_reaches_subscribers(tmp_base_dir):
+    _subscribed_team(tmp_base_dir)
+    result = publish("pubsub", "team-lead", "ci", "green", summary="ci", base_dir=tmp_base_dir)
+    assert result == {"alice": "delivered", "carol": "delivered"}
+    msgs = read_inbox("pubsub", "carol", base_dir=tmp_base_dir)
+    assert [(m.text, m.topic) for m in msgs] == [("green", "ci")]
+    assert not inbox_path("pubsub", "bob", base_dir=tmp_base_dir).exists()
+
+
+def test_publish_skips_sender_and_unknown_topic(tmp_base_dir):
+    _subscribed_team(tmp_base_dir)
+    assert publish("pubsub", "alice", "ci", "x", summary="s", base_dir=tmp_base_dir) == {
+        "carol": "delivered"
+    }
+    assert publish("pubsub", "alice", "nobody", "x", summary="s", base_dir=tmp_base_dir) == {}
+
+
+def test_publish_to_unknown_team_is_a_value_error(tmp_base_dir):
+    with pytest.raises(ValueError, match="does not exist"):
+        publish("ghost", "alice", "ci", "x", summary="s", base_dir=tmp_base_dir)
+
+
+def test_topic_index_follows_config_changes(tmp_base_dir):
+    _subscribed_team(tmp_base_dir)
+    assert topic_subscribers("pubsub", "ci", base_dir=tmp_base_dir) == ["alice", "carol"]
+    unsubscribe_topic("pubsub", "alice", "ci", base_dir=tmp_base_dir)
+    subscribe_topic("pubsub", "bob", "ci", base_dir=tmp_base_dir)
+    assert topic_subscribers("pubsub", "ci", base_dir=tmp_base_dir) == ["bob", "carol"]
+
+
+def _fill(tmp_base_dir, agent, n, timestamp=None):
+    for i in range(n):
+        append_message(
+            "test-team",
+            agent,
+            InboxMessage(from_="lead", text=f"m{i + 1}", timestamp=timestamp or now_iso(), summary="s"),
+            base_dir=tmp_base_dir,
+        )
+
+
+def test_compact_archives_read_messages_beyond_retention(tmp_base_dir):
+    _fill(tmp_base_dir, "bob", 10)
+    read_inbox("test-team", "bob", base_dir=tmp_base_dir)
+    _fill(tmp_base_dir, "bob", 0)
+    send_plain_message("test-team", "lead", "bob", "unread", summary="s", base_dir=tmp_base_dir)
+
+    archived = compact_inbox("test-team", "bob", retain_read=3, base_dir=tmp_base_dir)
+    assert archived == 7
+
+    live = read_inbox("test-team", "bob", mark_as_read=False, base_dir=tmp_base_dir)
+    assert [(m.text, m.read) for m in live] == [
+        ("m8", True), ("m9", True), ("m10", True), ("unread", False),
+    ]
+    unread = read_inbox("test-team", "bob", unread_only=True, base_dir=tmp_base_dir)
+    assert [m.text for m in unread] == ["unread"]
+
+
+def test_compact_never_archives_unread(tmp_base_dir):
+    _fill(tmp_base_dir, "bob", 5)
+    assert compact_inbox("test-team", "bob", retain_read=0, base_dir=tmp_base_dir) == 0
+    assert len(read_inbox("test-team", "bob", mark_as_read=False, base_dir=tmp_base_dir)) == 5
+
+
+def test_compact_archives_by_age(tmp_base_dir, monkeypatch):
+    monkeypatch.setattr(messaging, "INBOX_RETAIN_SECONDS", float("inf"))
+    _fill(tmp_base_dir, "bob", 2, timestamp="2020-01-02T03:04:05.000Z")
+    _fill(tmp_base_dir, "bob", 1)
+    read_inbox("test-team", "bob", base_dir=tmp_base_dir)
+    archived = compact_inbox(
+        "test-team", "bob", retain_read=100, max_age_seconds=3600, base_dir=tmp_base_dir
+    )
+    assert archived == 2
+    archive = tmp_base_dir / "teams" / "test-team" / "inboxes" / "archive" / "bob"
+    assert (archive / "2020-01-02.jsonl.gz").exists()
+
+
+def test_inbox_history_pages_through_archives(tmp_base_dir):
+    _fill(tmp_base_dir, "bob", 12)
+    read_inbox("test-team", "bob", base_dir=tmp_base_dir)
+    compact_inbox("test-team", "bob", retain_read=2, base_dir=tmp_base_dir)
+
+    page, token = read_inbox_history("test-team", "bob", limit=4, base_dir=tmp_base_dir)
+    assert [r["seq"] for r in page] == [1, 2, 3, 4]
+    assert token == 4
+    seen = [r["text"] for r in page]
+    while token is not None:
+        page, token = read_inbox_history(
+            "test-team", "bob", since_seq=token, limit=4, base_dir=tmp_base_dir
+        )
+        seen.extend(r["text"] for r in page)
+    assert seen == [f"m{i}" for i in range(1, 11)]
+
+
+def test_sequence_numbers_survive_compaction(tmp_base_dir):
+    _fill(tmp_base_dir, "bob", 6)
+    read_inbox("test-team", "bob", base_dir=tmp_base_dir)
+    compact_inbox("test-team", "bob", retain_read=1, base_dir=tmp_base_dir)
+    _fill(tmp_base_dir, "bob", 1)
+    read_inbox("test-team", "bob", unread_only=True, base_dir=tmp_base_dir)
+    path = inbox_path("test-team", "bob", base_dir=tmp_base_dir)
+    cursor = json.loads(path.with_suffix(".cursor").read_text())
+    assert cursor["seq"] == 7
+    assert cursor["base"] == 5
+
+
+def test_compaction_triggers_after_mark_as_read(tmp_base_dir, monkeypatch):
+    monkeypatch.setattr(messaging, "INBOX_RETAIN_READ", 2)
+    _fill(tmp_base_dir, "bob", 6)
+    read_inbox("test-team", "bob", base_dir=tmp_base_dir)
+    path = inbox_path("test-team", "bob", base_dir=tmp_base_dir)
+    assert len(path.read_text().splitlines()) == 2
+    page, _ = read_inbox_history("test-team", "bob", base_dir=tmp_base_dir)
+    assert [r["text"] for r in page] == ["m1", "m2", "m3", "m4"]
+
+
+def _mixed_inbox(tmp_base_dir):
+    send_plain_message("test-team", "alice", "lead", "hello", summary="s", base_dir=tmp_base_dir)
+    send_shutdown_request("test-team", "lead", base_dir=tmp_base_dir)
+    send_plain_message("test-team", "bob", "lead", "status", summary="s", base_dir=tmp_base_dir)
+    send_task_assignment(
+        "test-team",
+        TaskFile(id="1", subject="x", description="y", owner="lead"),
+        assigned_by="bob",
+        base_dir=tmp_base_dir,
+    )
+
+
+def test_query_inbox_filters_by_sender(tmp_base_dir):
+    _mixed_inbox(tmp_base_dir)
+    page, token = query_inbox("test-team", "lead", from_="bob", mark_as_read=False, base_dir=tmp_base_dir)
+    assert [seq for seq, _m in page] == [3, 4]
+    assert token is None
+
+
+def test_query_inbox_filters_by_structured_type(tmp_base_dir):
+    _mixed_inbox(tmp_base_dir)
+    page, _ = query_inbox(
+        "test-team", "lead", message_types=["task_assignment", "shutdown_request"],
+        mark_as_read=False, base_dir=tmp_base_dir,
+    )
+    assert [json.loads(m.text)["type"] for _seq, m in page] == ["shutdown_request", "task_assignment"]
+    plain, _ = query_inbox(
+        "test-team", "lead", message_types=["message"], mark_as_read=False, base_dir=tmp_base_dir
+    )
+    assert [m.text for _seq, m in plain] == ["hello", "status"]
+
+
+def test_query_inbox_pages_with_continuation_token(tmp_base_dir):
+    _fill(tmp_base_dir, "bob", 5)
+    page, token = query_inbox("test-team", "bob", limit=2, mark_as_read=False, base_dir=tmp_base_dir)
+    assert [seq for seq, _m in page] == [1, 2]
+    assert token == 2
+    page, token = query_inbox(
+        "test-team", "bob", since_seq=token, limit=2, mark_as_read=False, base_dir=tmp_base_dir
+    )
+    assert [seq for seq, _m in page] == [3, 4]
+    page, token = query_inbox(
+        "test-team", "bob", since_seq=token, limit=2, mark_as_read=False, base_dir=tmp_base_dir
+    )
+    assert [seq for seq, _m in page] == [5]
+    assert token is None
+
+
+
+def test_query_inbox_rejects_limit_below_one(tmp_base_dir):
+    _fill(tmp_base_dir, "bob", 2)
+    for call in (query_inbox, query_inbox_raw):
+        with pytest.raises(ValueError, match="limit must be at least 1"):
+            call("test-team", "bob", limit=0, base_dir=tmp_base_dir)
+    with pytest.raises(ValueError, match="limit must be at least 1"):
+        read_inbox("test-team", "bob", limit=-1, base_dir=tmp_base_dir)
+    with pytest.raises(ValueError, match="limit must be at least 1"):
+        read_inbox_history("test-team", "bob", limit=0, base_dir=tmp_base_dir)
+    assert len(read_inbox("test-team", "bob", unread_only=True, base_dir=tmp_base_dir)) == 2
+
+def test_filtered_mark_as_read_leaves_skipped_messages_unread(tmp_base_dir):
+    _mixed_inbox(tmp_base_dir)
+    taken = read_inbox(
+        "test-team", "lead", unread_only=True, from_="bob", base_dir=tmp_base_dir
+    )
+    assert len(taken) == 2
+    rest = read_inbox("test-team", "lead", unread_only=True, base_dir=tmp_base_dir)
+    assert [m.from_ for m in rest] == ["alice", "team-lead"]
+    path = inbox_path("test-team", "lead", base_dir=tmp_base_dir)
+    cursor = json.loads(path.with_suffix(".cursor").read_text())
+    assert cursor["seq"] == 4
+    assert "ahead" not in cursor
+
+
+def test_limited_mark_as_read_only_consumes_returned_messages(tmp_base_dir):
+    _fill(tmp_base_dir, "bob", 3)
+    first = read_inbox("test-team", "bob", unread_only=True, limit=2, base_dir=tmp_base_dir)
+    assert [m.text for m in first] == ["m1", "m2"]
+    rest = read_inbox("test-team", "bob", unread_only=True, base_dir=tmp_base_dir)
+    assert [m.text for m in rest] == ["m3"]
+
+
+def _cache_delta(before: dict) -> dict:
+    after = inbox_cache_stats()
+    return {k: after[k] - before[k] for k in ("hits", "misses", "extends")}
+
+
+def test_repeat_read_of_unchanged_inbox_hits_cache(tmp_base_dir):
+    _fill(tmp_base_dir, "bob", 3)
+    before = inbox_cache_stats()
+    read_inbox("test-team", "bob", mark_as_read=False, base_dir=tmp_base_dir)
+    read_inbox("test-team", "bob", mark_as_read=False, base_dir=tmp_base_dir)
+    assert _cache_delta(before) == {"hits": 1, "misses": 1, "extends": 0}
+
+
+def test_append_by_same_process_updates_cache_in_place(tmp_base_dir):
+    _fill(tmp_base_dir, "bob", 2)
+    read_inbox("test-team", "bob", mark_as_read=False, base_dir=tmp_base_dir)
+    send_plain_message("test-team", "lead", "bob", "fresh", summary="s", base_dir=tmp_base_dir)
+    before = inbox_cache_stats()
+    msgs = read_inbox("test-team", "bob", mark_as_read=False, base_dir=tmp_base_dir)
+    assert [m.text for m in msgs] == ["m1", "m2", "fresh"]
+    assert _cache_delta(before) == {"hits": 1, "misses": 0, "extends": 0}
+
+
+def test_external_append_extends_cache_incrementally(tmp_base_dir):
+    _fill(tmp_base_dir, "bob", 2)
+    read_inbox("test-team", "bob", mark_as_read=False, base_dir=tmp_base_dir)
+    path = inbox_path("test-team", "bob", base_dir=tmp_base_dir)
+    with open(path, "ab") as f:  # another process appending
+        f.write(json.dumps({"from": "x", "text": "ext", "timestamp": now_iso()}).encode() + b"\n")
+    before = inbox_cache_stats()
+    msgs = read_inbox("test-team", "bob", mark_as_read=False, base_dir=tmp_base_dir)
+    assert [m.text for m in msgs] == ["m1", "m2", "ext"]
+    assert _cache_delta(before) == {"hits": 0, "misses": 0, "extends": 1}
+
+
+def test_cached_unread_read_slices_from_cursor(tmp_base_dir):
+    _fill(tmp_base_dir, "bob", 3)
+    read_inbox("test-team", "bob", mark_as_read=False, base_dir=tmp_base_dir)
+    read_inbox("test-team", "bob", unread_only=True, limit=2, base_dir=tmp_base_dir)
+    msgs = read_inbox("test-team", "bob", unread_only=True, base_dir=tmp_base_dir)
+    assert [m.text for m in msgs] == ["m3"]
+
+
+def test_compaction_invalidates_cache(tmp_base_dir):
+    _fill(tmp_base_dir, "bob", 5)
+    read_inbox("test-team", "bob", base_dir=tmp_base_dir)
+    compact_inbox("test-team", "bob", retain_read=1, base_dir=tmp_base_dir)
+    msgs = read_inbox("test-team", "bob", mark_as_read=False, base_dir=tmp_base_dir)
+    assert [m.text for m in msgs] == ["m5"]
+
+
+def test_query_inbox_raw_matches_model_dump(tmp_base_dir):
+    _mixed_inbox(tmp_base_dir)
+    models, _ = query_inbox("test-team", "bob", mark_as_read=False, base_dir=tmp_base_dir)
+    raw, _ = query_inbox_raw("test-team", "bob", mark_as_read=False, base_dir=tmp_base_dir)
+    assert raw == [(seq, m.model_dump(by_alias=True, exclude_none=True)) for seq, m in models]
+
+
+def test_query_inbox_raw_does_not_mutate_cached_entries(tmp_base_dir):
+    _fill(tmp_base_dir, "bob", 2)
+    first, _ = query_inbox_raw("test-team", "bob", base_dir=tmp_base_dir)
+    assert all(entry["read"] for _seq, entry in first)
+    first[0][1]["text"] = "changed"
+    again, _ = query_inbox_raw("test-team", "bob", mark_as_read=False, base_dir=tmp_base_dir)
+    assert [entry["text"] for _seq, entry in again] == ["m1", "m2"]
+    assert _raw_lines(inbox_path("test-team", "bob", base_dir=tmp_base_dir))[0]["read"] is False
+
+
 def test_now_iso_format():
     ts = now_iso()
     assert re.match(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}Z$", ts)
+
+
+def test_append_message_only_appends_bytes(tmp_base_dir):
+    msg1 = InboxMessage(from_="lead", text="first", timestamp=now_iso(), read=False, summary="1")
+    append_message("test-team", "bob", msg1, base_dir=tmp_base_dir)
+    path = inbox_path("test-team", "bob", base_dir=tmp_base_dir)
+    before = path.read_bytes()
+    msg2 = InboxMessage(from_="lead", text="second", timestamp=now_iso(), read=False, summary="2")
+    append_message("test-team", "bob", msg2, base_dir=tmp_base_dir)
+    after = path.read_bytes()
+    assert after.startswith(before)
+    assert after.count(b"\n") == 2
+
+
+def test_mark_as_read_advances_cursor_without_rewriting_inbox(tmp_base_dir):
+    send_plain_message("test-team", "lead", "bob", "one", summary="s", base_dir=tmp_base_dir)
+    path = inbox_path("test-team", "bob", base_dir=tmp_base_dir)
+    before = path.read_bytes()
+    msgs = read_inbox("test-team", "bob", unread_only=True, base_dir=tmp_base_dir)
+    assert [m.text for m in msgs] == ["one"]
+    assert msgs[0].read is True
+    assert path.read_bytes() == before
+    cursor = json.loads(path.with_suffix(".cursor").read_text())
+    assert cursor == {"offset": len(before), "seq": 1, "base": 0}
+
+
+def test_read_flag_computed_from_cursor(tmp_base_dir):
+    send_plain_message("test-team", "lead", "bob", "old", summary="s", base_dir=tmp_base_dir)
+    read_inbox("test-team", "bob", base_dir=tmp_base_dir)
+    send_plain_message("test-team", "lead", "bob", "new", summary="s", base_dir=tmp_base_dir)
+    msgs = read_inbox("test-team", "bob", mark_as_read=False, base_dir=tmp_base_dir)
+    assert [(m.text, m.read) for m in msgs] == [("old", True), ("new", False)]
+    unread = read_inbox("test-team", "bob", unread_only=True, base_dir=tmp_base_dir)
+    assert [m.text for m in unread] == ["new"]
+
+
+def test_cursor_tracks_sequence_high_water_mark(tmp_base_dir):
+    for text in ("a", "b", "c"):
+        send_plain_message("test-team", "lead", "bob", text, summary="s", base_dir=tmp_base_dir)
+    read_inbox("test-team", "bob", unread_only=True, base_dir=tmp_base_dir)
+    send_plain_message("test-team", "lead", "bob", "d", summary="s", base_dir=tmp_base_dir)
+    msgs = read_inbox("test-team", "bob", unread_only=True, base_dir=tmp_base_dir)
+    assert [m.text for m in msgs] == ["d"]
+    path = inbox_path("test-team", "bob", base_dir=tmp_base_dir)
+    assert json.loads(path.with_suffix(".cursor").read_text())["seq"] == 4
+
+
+def test_offset_only_cursor_recovers_sequence(tmp_base_dir):
+    for text in ("a", "b"):
+        send_plain_message("test-team", "lead", "bob", text, summary="s", base_dir=tmp_base_dir)
+    path = inbox_path("test-team", "bob", base_dir=tmp_base_dir)
+    first_line = path.read_bytes().index(b"\n") + 1
+    path.with_suffix(".cursor").write_text(json.dumps({"offset": first_line}))
+    msgs = read_inbox("test-team", "bob", mark_as_read=False, base_dir=tmp_base_dir)
+    assert [(m.text, m.read) for m in msgs] == [("a", True), ("b", False)]
+    read_inbox("test-team", "bob", unread_only=True, base_dir=tmp_base_dir)
+    assert json.loads(path.with_suffix(".cursor").read_text())["seq"] == 2
+
+
+def test_read_inbox_ignores_partial_trailing_line(tmp_base_dir):
+    send_plain_message("test-team", "lead", "bob", "whole", summary="s", base_dir=tmp_base_dir)
+    path = inbox_path("test-team", "bob", base_dir=tmp_base_dir)
+    complete = path.stat().st_size
+    with open(path, "ab") as f:
+        f.write(b'{"from": "lead", "te')
+    msgs = read_inbox("test-team", "bob", unread_only=True, base_dir=tmp_base_dir)
+    assert [m.text for m in msgs] == ["whole"]
+    cursor = json.loads(path.with_suffix(".cursor").read_text())
+    assert cursor["offset"] == complete
+
+
+def test_legacy_json_inbox_migrated_on_first_read(tmp_base_dir):
+    legacy = tmp_base_dir / "teams" / "test-team" / "inboxes" / "old.json"
+    legacy.parent.mkdir(parents=True)
+    legacy.write_text(json.dumps([
+        {"from": "lead", "text": "seen", "timestamp": now_iso(), "read": True},
+        {"from": "lead", "text": "fresh", "timestamp": now_iso(), "read": False},
+    ]))
+    msgs = read_inbox("test-team", "old", unread_only=True, mark_as_read=False, base_dir=tmp_base_dir)
+    assert [m.text for m in msgs] == ["fresh"]
+    assert not legacy.exists()
+    raw = _raw_lines(inbox_path("test-team", "old", base_dir=tmp_base_dir))
+    assert [r["text"] for r in raw] == ["seen", "fresh"]
+
+
+def test_legacy_json_inbox_migrated_on_first_append(tmp_base_dir):
+    legacy = tmp_base_dir / "teams" / "test-team" / "inboxes" / "old.json"
+    legacy.parent.mkdir(parents=True)
+    legacy.write_text(json.dumps([
+        {"from": "lead", "text": "before", "timestamp": now_iso(), "read": False},
+    ]))
+    send_plain_message("test-team", "lead", "old", "after", summary="s", base_dir=tmp_base_dir)
+    msgs = read_inbox("test-team", "old", mark_as_read=False, base_dir=tmp_base_dir)
+    assert [m.text for m in msgs] == ["before", "after"]
+    assert not legacy.exists()
@@ -2,12 +2,17 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
+import time
 from pathlib import Path
 from typing import Any
 
 import pytest
 
+from opencode_teams import model_discovery
 from opencode_teams.model_discovery import (
+    ModelCatalog,
     discover_models,
     filter_models,
     is_deprecated_model,
@@ -403,3 +408,58 @@ class TestModelFiltering:
             runtime_available={"google/gemini-2.5-pro"},
         )
         assert [m.full_model_string for m in filtered] == ["google/gemini-2.5-pro"]
+
+
+class TestModelCatalog:
+    """Tests for the cached model catalog."""
+
+    @pytest.fixture
+    def project(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+        monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "xdg"))
+        self.runtime_calls = 0
+
+        def runtime(binary: str | None) -> set[str]:
+            self.runtime_calls += 1
+            return set()
+
+        monkeypatch.setattr(model_discovery, "get_runtime_available_model_strings", runtime)
+        self._write(tmp_path, ["gpt-5.2"])
+        return tmp_path
+
+    @staticmethod
+    def _write(project: Path, model_ids: list[str]) -> None:
+        config = {"provider": {"openai": {"models": {m: {} for m in model_ids}}}}
+        (project / "opencode.json").write_text(json.dumps(config), encoding="utf-8")
+
+    def test_get_serves_the_cache(self, project: Path) -> None:
+        catalog = ModelCatalog(project_dir=project)
+        assert [m.model_id for m in catalog.get()] == ["gpt-5.2"]
+        assert [m.model_id for m in catalog.get()] == ["gpt-5.2"]
+        assert self.runtime_calls == 1
+        assert catalog.stats()["refreshes"] == 1 and not catalog.stats()["stale"]
+
+    def test_config_change_serves_stale_until_refreshed(self, project: Path) -> None:
+        catalog = ModelCatalog(project_dir=project)
+        catalog.get()
+        self._write(project, ["gpt-5.2", "gpt-5.3-codex"])
+        os.utime(project / "opencode.json", ns=(0, time.time_ns() + 10**9))
+        assert catalog.is_stale()
+        assert [m.model_id for m in catalog.get()] == ["gpt-5.2"]
+        assert [m.model_id for m in catalog.refresh()] == ["gpt-5.2", "gpt-5.3-codex"]
+        assert catalog.refresh() is catalog.get() and self.runtime_calls == 2
+
+    def test_ttl_expiry_marks_stale(self, project: Path) -> None:
+        catalog = ModelCatalog(ttl=0.0, project_dir=project)
+        catalog.get()
+        assert catalog.is_stale()
+        catalog.refresh()
+        assert self.runtime_calls == 2
+
+    def test_concurrent_refreshes_share_one_discovery(self, project: Path) -> None:
+        catalog = ModelCatalog(project_dir=project)
+        threads = [threading.Thread(target=catalog.refresh) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert self.runtime_calls == 1
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import time
 import unittest.mock
@@ -9,6 +10,7 @@ import pytest
 from fastmcp import Client
 
 from opencode_teams import messaging, tasks, teams
+from opencode_teams.executors import ToolExecutors
 from opencode_teams.models import AgentHealthStatus, TeammateMember
 from opencode_teams.server import mcp
 
@@ -489,6 +491,330 @@ class TestPollInbox:
         assert len(result) == 1
         assert result[0]["text"] == "instant"
 
+    async def test_should_wake_when_message_arrives_during_wait(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "t6d"})
+        teams.add_member("t6d", _make_teammate("carol", "t6d"))
+
+        async def send_later():
+            await asyncio.sleep(0.2)
+            messaging.send_plain_message("t6d", "team-lead", "carol", "late", summary="s")
+
+        start = time.monotonic()
+        result, _ = await asyncio.gather(
+            client.call_tool(
+                "poll_inbox",
+                {"team_name": "t6d", "agent_name": "carol", "timeout_ms": 10000},
+            ),
+            send_later(),
+        )
+        elapsed = time.monotonic() - start
+        assert [m["text"] for m in _data(result)] == ["late"]
+        assert elapsed < 5
+
+
+class TestServerStatus:
+    async def test_reports_inbox_cache_counters(self, client: Client):
+        status = _data(await client.call_tool("server_status", {}))
+        assert set(status["inbox_cache"]) >= {"hits", "misses", "entries"}
+
+    async def test_reports_executor_pools(self, client: Client):
+        status = _data(await client.call_tool("server_status", {}))
+        assert set(status["executors"]) == {"disk", "subprocess"}
+        # server_status only reads cached state, so it runs on the disk pool.
+        assert status["executors"]["disk"]["pending"] == 1
+        assert status["executors"]["subprocess"]["pending"] == 0
+
+
+class TestModelCache:
+    async def test_model_tools_answer_from_the_cache(self, tmp_path: Path, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            "opencode_teams.model_discovery.get_runtime_available_model_strings",
+            lambda binary: calls.append(binary) or set(),
+        )
+        monkeypatch.setattr(
+            "opencode_teams.server.discover_opencode_binary", lambda: "/usr/bin/echo"
+        )
+        async with Client(mcp) as c:
+            await c.call_tool("list_available_models", {})
+            status = _data(await c.call_tool("server_status", {}))
+        assert calls == ["/usr/bin/echo"]  # only the startup discovery
+        assert status["model_cache"]["refreshes"] == 1
+        assert status["model_cache"]["age_seconds"] >= 0
+        assert status["model_cache"]["refresh_seconds"] >= 0
+
+    async def test_refresher_rediscovers_stale_catalogs(self):
+        from opencode_teams.executors import ToolExecutors
+        from opencode_teams.server import _model_refresher
+
+        catalog = unittest.mock.Mock()
+        catalog.is_stale.return_value = True
+        catalog.refresh.return_value = []
+        catalog.refresh_seconds = 0.0
+        executors = ToolExecutors()
+        refresher = asyncio.create_task(_model_refresher(catalog, executors, 0.01))
+        await asyncio.sleep(0.1)
+        refresher.cancel()
+        executors.shutdown()
+        assert catalog.refresh.call_count >= 2
+
+
+class TestBlockingTools:
+    async def test_slow_subprocess_calls_do_not_hold_up_disk_tools(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "tb"})
+        teams.add_member("tb", _make_teammate("worker", "tb"))
+
+        def slow_health(member, **kwargs):
+            time.sleep(0.25)
+            return _make_alive_status(member.name, member.tmux_pane_id)
+
+        with unittest.mock.patch(
+            "opencode_teams.server.check_single_agent_health", side_effect=slow_health
+        ):
+            checks = [
+                asyncio.create_task(
+                    client.call_tool("check_agent_health", {"team_name": "tb", "agent_name": "worker"})
+                )
+                # More than anyio's default 40 threads, which would otherwise
+                # all be taken by health checks.
+                for _ in range(45)
+            ]
+            await asyncio.sleep(0.05)
+            start = time.monotonic()
+            await client.call_tool("task_create", {"team_name": "tb", "subject": "A", "description": "d"})
+            listed = _data(await client.call_tool("task_list", {"team_name": "tb"}))
+            elapsed = time.monotonic() - start
+            await asyncio.gather(*checks)
+        assert [t["subject"] for t in listed] == ["A"]
+        assert elapsed < 0.15
+
+
+class TestInboxSelectors:
+    async def test_read_inbox_returns_page_when_limited(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "tsel"})
+        for i in range(3):
+            messaging.send_plain_message("tsel", "bob", "team-lead", f"m{i}", summary="s")
+        page = _data(await client.call_tool(
+            "read_inbox", {"team_name": "tsel", "agent_name": "team-lead", "limit": 2},
+        ))
+        assert [(m["seq"], m["text"]) for m in page["messages"]] == [(1, "m0"), (2, "m1")]
+        assert page["next_since_seq"] == 2
+        rest = _data(await client.call_tool(
+            "read_inbox",
+            {"team_name": "tsel", "agent_name": "team-lead", "since_seq": 2},
+        ))
+        assert [m["text"] for m in rest["messages"]] == ["m2"]
+        assert rest["next_since_seq"] is None
+
+    async def test_poll_inbox_waits_for_matching_type(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "tsel2"})
+        messaging.send_plain_message("tsel2", "bob", "team-lead", "chatter", summary="s")
+        result = _data(await client.call_tool(
+            "poll_inbox",
+            {
+                "team_name": "tsel2",
+                "agent_name": "team-lead",
+                "timeout_ms": 100,
+                "message_types": ["shutdown_approved"],
+            },
+        ))
+        assert result == []
+        unread = _data(await client.call_tool(
+            "read_inbox",
+            {"team_name": "tsel2", "agent_name": "team-lead", "unread_only": True},
+        ))
+        assert [m["text"] for m in unread] == ["chatter"]
+
+
+class TestInboxHistory:
+    async def test_should_page_archived_messages(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "th"})
+        for i in range(5):
+            messaging.send_plain_message("th", "team-lead", "alice", f"m{i}", summary="s")
+        messaging.read_inbox("th", "alice")
+        messaging.compact_inbox("th", "alice", retain_read=1)
+        first = _data(await client.call_tool(
+            "inbox_history", {"team_name": "th", "agent_name": "alice", "limit": 3},
+        ))
+        assert [m["text"] for m in first["messages"]] == ["m0", "m1", "m2"]
+        assert first["next_since_seq"] == 3
+        second = _data(await client.call_tool(
+            "inbox_history",
+            {"team_name": "th", "agent_name": "alice", "since_seq": 3, "limit": 3},
+        ))
+        assert [m["text"] for m in second["messages"]] == ["m3"]
+        assert second["next_since_seq"] is None
+
+    async def test_should_return_empty_without_archive(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "th2"})
+        result = _data(await client.call_tool(
+            "inbox_history", {"team_name": "th2", "agent_name": "nobody"},
+        ))
+        assert result == {"messages": [], "next_since_seq": None}
+
+
+class TestTaskCreateBatch:
+    async def test_should_create_batch_with_refs(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "tb"})
+        result = _data(await client.call_tool("task_create_batch", {
+            "team_name": "tb",
+            "items": [
+                {"ref": "a", "subject": "A"},
+                {"ref": "b", "subject": "B", "blockedBy": ["a"]},
+            ],
+        }))
+        assert result == {"ids": ["1", "2"], "refs": {"a": "1", "b": "2"}}
+        task = _data(await client.call_tool("task_get", {"team_name": "tb", "task_id": "2"}))
+        assert task["blockedBy"] == ["1"]
+
+    async def test_should_reject_cyclic_batch(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "tb2"})
+        result = await client.call_tool("task_create_batch", {
+            "team_name": "tb2",
+            "items": [
+                {"ref": "a", "subject": "A", "blockedBy": ["b"]},
+                {"ref": "b", "subject": "B", "blockedBy": ["a"]},
+            ],
+        }, raise_on_error=False)
+        assert result.is_error is True
+        assert "cycle" in result.content[0].text
+
+
+class TestClaimNextTask:
+    async def test_should_claim_distinct_tasks_concurrently(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "tc"})
+        for i in range(3):
+            tasks.create_task("tc", f"t{i}", "d")
+        results = await asyncio.gather(*(
+            client.call_tool("claim_next_task", {"team_name": "tc", "agent_name": f"w{i}"})
+            for i in range(4)
+        ))
+        claimed = [_data(r)["task"] for r in results]
+        ids = sorted(t["id"] for t in claimed if t is not None)
+        assert ids == ["1", "2", "3"]
+        assert sum(t is None for t in claimed) == 1
+
+
+class TestLeaseReaper:
+    async def test_should_requeue_expired_claims_for_active_team(
+        self, client: Client, monkeypatch
+    ):
+        from opencode_teams import server
+
+        await client.call_tool("team_create", {"team_name": "tl"})
+        tasks.create_task("tl", "A", "d")
+        monkeypatch.setattr("opencode_teams.task_planning.TASK_LEASE_SECONDS", 0)
+        await client.call_tool("claim_next_task", {"team_name": "tl", "agent_name": "w"})
+        executors = ToolExecutors()
+        reaper = asyncio.create_task(
+            server._lease_reaper({"active_team": "tl"}, executors, 0.01)
+        )
+        try:
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if tasks.get_task("tl", "1").status == "pending":
+                    break
+        finally:
+            reaper.cancel()
+            executors.shutdown()
+        assert tasks.get_task("tl", "1").owner is None
+
+    async def test_heartbeat_reports_renewed_tasks(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "th3"})
+        tasks.create_task("th3", "A", "d")
+        await client.call_tool("claim_next_task", {"team_name": "th3", "agent_name": "w"})
+        result = _data(await client.call_tool(
+            "task_heartbeat", {"team_name": "th3", "agent_name": "w"},
+        ))
+        assert result["renewed"] == ["1"]
+        assert result["leaseExpiresAt"] > 0
+
+
+class TestTaskListQuery:
+    async def test_should_page_and_project(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "tq"})
+        for i in range(3):
+            tasks.create_task("tq", f"t{i}", "long description")
+        first = _data(await client.call_tool("task_list", {
+            "team_name": "tq", "limit": 2, "fields": ["id", "subject"],
+        }))
+        assert first == {
+            "tasks": [{"id": "1", "subject": "t0"}, {"id": "2", "subject": "t1"}],
+            "next_cursor": "2",
+        }
+        second = _data(await client.call_tool("task_list", {
+            "team_name": "tq", "cursor": "2", "fields": ["id", "subject"],
+        }))
+        assert second == {"tasks": [{"id": "3", "subject": "t2"}], "next_cursor": None}
+
+    async def test_should_keep_full_list_without_paging(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "tq2"})
+        tasks.create_task("tq2", "only", "desc")
+        result = _data(await client.call_tool("task_list", {"team_name": "tq2"}))
+        assert result[0]["description"] == "desc"
+
+
+class TestTaskChanges:
+    async def test_should_return_deltas_since_seq(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "tch"})
+        tasks.create_task("tch", "first", "d")
+        first = _data(await client.call_tool("task_changes", {"team_name": "tch"}))
+        assert [c["action"] for c in first["changes"]] == ["create"]
+        assert "tasks" not in first
+        tasks.update_task("tch", "1", owner="w")
+        second = _data(await client.call_tool("task_changes", {
+            "team_name": "tch", "since_seq": first["seq"],
+        }))
+        assert [c["tasks"][0]["owner"] for c in second["changes"]] == ["w"]
+        assert second["seq"] == first["seq"] + 1
+
+
+class TestTopics:
+    async def test_should_publish_to_subscribers_only(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "tp"})
+        teams.add_member("tp", _make_teammate("alice", "tp"))
+        teams.add_member("tp", _make_teammate("bob", "tp"))
+        subs = _data(await client.call_tool(
+            "topic_subscribe", {"team_name": "tp", "agent_name": "alice", "topic": "deploy"},
+        ))
+        assert subs == {"agent": "alice", "subscriptions": ["deploy"]}
+        result = _data(await client.call_tool(
+            "topic_publish",
+            {"team_name": "tp", "topic": "deploy", "content": "shipped", "summary": "d"},
+        ))
+        assert result["success"] is True
+        assert result["routing"]["delivery"] == {"alice": "delivered"}
+        inbox = _data(await client.call_tool(
+            "read_inbox", {"team_name": "tp", "agent_name": "alice"},
+        ))
+        assert inbox[0]["topic"] == "deploy"
+        assert messaging.read_inbox("tp", "bob") == []
+
+    async def test_should_unsubscribe_and_reject_bad_topic(self, client: Client):
+        await client.call_tool("team_create", {"team_name": "tp2"})
+        await client.call_tool(
+            "topic_subscribe", {"team_name": "tp2", "agent_name": "team-lead", "topic": "x"},
+        )
+        subs = _data(await client.call_tool(
+            "topic_unsubscribe", {"team_name": "tp2", "agent_name": "team-lead", "topic": "x"},
+        ))
+        assert subs["subscriptions"] == []
+        result = await client.call_tool(
+            "topic_subscribe",
+            {"team_name": "tp2", "agent_name": "team-lead", "topic": "no spaces"},
+            raise_on_error=False,
+        )
+        assert result.is_error is True
+
+    async def test_should_reject_publish_to_unknown_team(self, client: Client):
+        result = await client.call_tool(
+            "topic_publish",
+            {"team_name": "ghost", "topic": "x", "content": "c", "summary": "s"},
+            raise_on_error=False,
+        )
+        assert result.is_error is True
+        assert "does not exist" in result.content[0].text
+
 
 class TestTeamDeleteErrorWrapping:
     async def test_should_reject_delete_with_active_members(self, client: Client):
@@ -579,7 +905,7 @@ class TestModelTranslationWiring:
             )
         ]
         with unittest.mock.patch("opencode_teams.server.is_tmux_available", return_value=True), \
-             unittest.mock.patch("opencode_teams.server._refresh_available_models", return_value=known_models), \
+             unittest.mock.patch("opencode_teams.server._available_models", return_value=known_models), \
              unittest.mock.patch("opencode_teams.server.spawn_teammate") as mock_spawn:
             mock_spawn.return_value = TeammateMember(
                 agent_id="worker@tm2", name="worker", agent_type="general-purpose",
@@ -610,6 +936,18 @@ class TestModelTranslationWiring:
         assert "Unknown model" in result.content[0].text
 
 
+    async def test_spawn_refused_under_memory_engine(self, client: Client, monkeypatch):
+        await client.call_tool("team_create", {"team_name": "tm4"})
+        monkeypatch.setenv("OPENCODE_TEAMS_STORAGE", "memory")
+        result = await client.call_tool(
+            "spawn_teammate",
+            {"team_name": "tm4", "name": "worker", "prompt": "do work"},
+            raise_on_error=False,
+        )
+        assert result.is_error is True
+        assert "opencode-teams-daemon --storage memory" in result.content[0].text
+
+
 class TestSpawnWithDynamicInstructions:
     """Tests for dynamic instruction generation (no predefined templates)."""
 
@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from opencode_teams.inbox_watch import InboxWatcher
+from opencode_teams.models import InboxMessage, TaskSpec, TeammateMember
+from opencode_teams.sqlite import messaging, tasks, teams
+from opencode_teams.sqlite.db import (
+    MemoryDatabase,
+    active_memory,
+    close_all,
+    db_path,
+    use_memory,
+)
+
+
+@pytest.fixture(autouse=True, params=["sqlite", "memory"])
+def engine(request):
+    if request.param == "sqlite":
+        yield request.param
+        close_all()
+        return
+    memory = MemoryDatabase()
+    with use_memory(memory):
+        yield request.param
+    memory.close()
+
+
+@pytest.fixture
+def team(tmp_base_dir):
+    teams.create_team("test-team", "sess-test", base_dir=tmp_base_dir)
+    return "test-team"
+
+
+def _member(name: str) -> TeammateMember:
+    return TeammateMember(
+        agent_id=f"{name}@test-team",
+        name=name,
+        agent_type="general-purpose",
+        model="m",
+        prompt="p",
+        color="blue",
+        joined_at=0,
+        tmux_pane_id="",
+        cwd="/tmp",
+    )
+
+
+def _msg(text: str, sender: str = "lead") -> InboxMessage:
+    return InboxMessage(from_=sender, text=text, timestamp=messaging.now_iso(), read=False)
+
+
+def test_team_lives_in_one_database(tmp_base_dir, team, engine):
+    assert db_path(tmp_base_dir).exists() == (engine == "sqlite")
+    assert not (tmp_base_dir / "teams" / team / "config.json").exists()
+    teams.add_member(team, _member("alice"), base_dir=tmp_base_dir)
+    config = teams.read_config(team, base_dir=tmp_base_dir)
+    assert [m.name for m in config.members] == ["team-lead", "alice"]
+    with pytest.raises(ValueError, match="already exists"):
+        teams.add_member(team, _member("alice"), base_dir=tmp_base_dir)
+
+
+def test_delete_team_removes_every_row(tmp_base_dir, team):
+    tasks.create_task(team, "A", "d", base_dir=tmp_base_dir)
+    messaging.send_plain_message(team, "lead", "team-lead", "hi", "s", base_dir=tmp_base_dir)
+    teams.delete_team(team, base_dir=tmp_base_dir)
+    assert not teams.team_exists(team, base_dir=tmp_base_dir)
+    with pytest.raises(FileNotFoundError):
+        teams.read_config(team, base_dir=tmp_base_dir)
+    teams.create_team(team, "sess", base_dir=tmp_base_dir)
+    assert tasks.list_tasks(team, base_dir=tmp_base_dir) == []
+    assert messaging.read_inbox(team, "team-lead", base_dir=tmp_base_dir) == []
+
+
+def test_task_dependencies_and_claims(tmp_base_dir, team):
+    a, b, c = tasks.create_tasks(
+        team,
+        [
+            TaskSpec(ref="a", subject="A", metadata={"priority": 1}),
+            TaskSpec(ref="b", subject="B", blocked_by=["a"]),
+            TaskSpec(ref="c", subject="C", metadata={"priority": 5}),
+        ],
+        base_dir=tmp_base_dir,
+    )
+    assert tasks.get_task(team, a.id, base_dir=tmp_base_dir).blocks == [b.id]
+    with pytest.raises(ValueError, match="circular"):
+        tasks.update_task(team, a.id, add_blocked_by=[b.id], base_dir=tmp_base_dir)
+    assert tasks.claim_next_task(team, "w1", base_dir=tmp_base_dir).id == c.id
+    assert tasks.claim_next_task(team, "w2", base_dir=tmp_base_dir).id == a.id
+    assert tasks.claim_next_task(team, "w3", base_dir=tmp_base_dir) is None
+    tasks.update_task(team, a.id, status="completed", base_dir=tmp_base_dir)
+    assert tasks.claim_next_task(team, "w3", base_dir=tmp_base_dir).id == b.id
+
+
+def test_delete_strips_references_and_ids_are_not_reused(tmp_base_dir, team):
+    tasks.create_task(team, "A", "d", base_dir=tmp_base_dir)
+    tasks.create_task(team, "B", "d", base_dir=tmp_base_dir)
+    tasks.update_task(team, "2", add_blocked_by=["1"], base_dir=tmp_base_dir)
+    tasks.update_task(team, "1", status="deleted", base_dir=tmp_base_dir)
+    assert tasks.get_task(team, "2", base_dir=tmp_base_dir).blocked_by == []
+    assert tasks.create_task(team, "C", "d", base_dir=tmp_base_dir).id == "3"
+
+
+def test_query_owner_map_and_reset(tmp_base_dir, team):
+    for name in ("A", "B", "C"):
+        tasks.create_task(team, name, "d", base_dir=tmp_base_dir)
+    tasks.claim_next_task(team, "w1", base_dir=tmp_base_dir)
+    tasks.claim_next_task(team, "w2", base_dir=tmp_base_dir)
+    page, cursor = tasks.query_tasks(team, limit=2, fields=["status"], base_dir=tmp_base_dir)
+    assert page == [{"id": "1", "status": "in_progress"}, {"id": "2", "status": "in_progress"}]
+    assert cursor == "2"
+    assert tasks.query_tasks(team, cursor=cursor, base_dir=tmp_base_dir)[0][0]["subject"] == "C"
+    by_owner = tasks.tasks_by_owner(team, base_dir=tmp_base_dir)
+    assert {o: [t["id"] for t in ts] for o, ts in by_owner.items()} == {"w1": ["1"], "w2": ["2"]}
+    tasks.reset_owner_tasks(team, "w1", base_dir=tmp_base_dir)
+    assert tasks.get_task(team, "1", base_dir=tmp_base_dir).status == "pending"
+    assert tasks.tasks_by_owner(team, "w1", base_dir=tmp_base_dir) == {"w1": []}
+
+
+def test_leases_expire_back_to_pending(tmp_base_dir, team):
+    tasks.create_task(team, "A", "d", base_dir=tmp_base_dir)
+    claimed = tasks.claim_next_task(team, "w", base_dir=tmp_base_dir)
+    assert tasks.renew_leases(team, "w", base_dir=tmp_base_dir)[0].id == claimed.id
+    requeued = tasks.expire_leases(team, now_ms=claimed.lease_expires_at + 10**9,
+                                   base_dir=tmp_base_dir)
+    assert [t.owner for t in requeued] == ["w"]
+    task = tasks.get_task(team, claimed.id, base_dir=tmp_base_dir)
+    assert task.status == "pending" and task.owner is None
+
+
+def test_task_changes_follow_mutations_and_resync(tmp_base_dir, team, monkeypatch):
+    tasks.create_task(team, "A", "d", base_dir=tmp_base_dir)
+    tasks.claim_next_task(team, "w", base_dir=tmp_base_dir)
+    changes, seq, snapshot = tasks.task_changes(team, 0, base_dir=tmp_base_dir)
+    assert [c["action"] for c in changes] == ["create", "claim"] and seq == 2
+    assert snapshot is None
+    assert tasks.task_changes(team, seq, base_dir=tmp_base_dir) == ([], 2, None)
+    monkeypatch.setattr(tasks, "TASK_EVENTS_KEEP", 1)
+    tasks.create_task(team, "B", "d", base_dir=tmp_base_dir)
+    changes, seq, snapshot = tasks.task_changes(team, 1, base_dir=tmp_base_dir)
+    assert changes == [] and seq == 3
+    assert [t["subject"] for t in snapshot] == ["A", "B"]
+
+
+def test_inbox_read_marks_and_filters(tmp_base_dir, team):
+    messaging.ensure_inbox(team, "alice", base_dir=tmp_base_dir)
+    for i in range(3):
+        messaging.append_message(team, "alice", _msg(f"m{i}", sender=f"s{i % 2}"),
+                                 base_dir=tmp_base_dir)
+    page, next_seq = messaging.query_inbox(team, "alice", from_="s0", limit=1,
+                                           base_dir=tmp_base_dir)
+    assert [(seq, m.text) for seq, m in page] == [(1, "m0")] and next_seq == 1
+    unread = messaging.read_inbox(team, "alice", unread_only=True, base_dir=tmp_base_dir)
+    assert [m.text for m in unread] == ["m1", "m2"]
+    assert messaging.read_inbox(team, "alice", unread_only=True, base_dir=tmp_base_dir) == []
+
+
+def test_inbox_type_filter_pages_in_sql(tmp_base_dir, team):
+    for i in range(3):
+        messaging.send_plain_message(team, "lead", "alice", f"m{i}", "s",
+                                     base_dir=tmp_base_dir)
+        messaging.send_shutdown_request(team, "alice", base_dir=tmp_base_dir)
+    page, next_seq = messaging.query_inbox_raw(
+        team, "alice", message_types=["shutdown_request"], limit=2, mark_as_read=False,
+        base_dir=tmp_base_dir,
+    )
+    assert [seq for seq, _e in page] == [2, 4] and next_seq == 4
+    page, next_seq = messaging.query_inbox_raw(
+        team, "alice", message_types=["shutdown_request"], since_seq=next_seq, limit=2,
+        base_dir=tmp_base_dir,
+    )
+    assert [seq for seq, _e in page] == [6] and next_seq is None
+    plain = messaging.read_inbox(team, "alice", message_types=["message"], base_dir=tmp_base_dir)
+    assert [m.text for m in plain] == ["m0", "m1", "m2"]
+
+
+
+def test_inbox_limit_below_one_is_rejected(tmp_base_dir, team):
+    messaging.send_plain_message(team, "lead", "alice", "m0", "s", base_dir=tmp_base_dir)
+    with pytest.raises(ValueError, match="limit must be at least 1"):
+        messaging.query_inbox_raw(team, "alice", limit=0, base_dir=tmp_base_dir)
+    with pytest.raises(ValueError, match="limit must be at least 1"):
+        messaging.read_inbox_history(team, "alice", limit=0, base_dir=tmp_base_dir)
+    assert len(messaging.read_inbox(team, "alice", unread_only=True, base_dir=tmp_base_dir)) == 1
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+async def test_delivery_wakes_inbox_watchers(tmp_base_dir, team, use_inotify, engine):
+    memory = active_memory()
+    watcher = InboxWatcher(
+        use_inotify=use_inotify, poll_interval=0.01, watch_files=memory is None
+    )
+    if memory is not None:
+        memory.on_delivery = watcher.notify
+    path = messaging.ensure_inbox(team, "alice", base_dir=tmp_base_dir)
+    assert path == messaging.inbox_path(team, "alice", base_dir=tmp_base_dir)
+    ticket = watcher.subscribe(path)
+    try:
+        asyncio.get_running_loop().call_later(
+            0.05,
+            messaging.send_plain_message, team, "lead", "alice", "hi", "s", None, tmp_base_dir,
+        )
+        assert await watcher.wait(ticket, 2.0)
+    finally:
+        watcher.unsubscribe(path, ticket)
+        watcher.close()
+    # The in-memory engine rings no doorbell files.
+    assert path.exists() == (engine == "sqlite")
+
+
+def test_publish_and_archive_history(tmp_base_dir, team):
+    teams.add_member(team, _member("alice"), base_dir=tmp_base_dir)
+    teams.subscribe_topic(team, "alice", "builds", base_dir=tmp_base_dir)
+    assert messaging.publish(team, "lead", "builds", "green", "s", base_dir=tmp_base_dir) == {
+        "alice": "delivered"
+    }
+    for i in range(4):
+        messaging.append_message(team, "alice", _msg(f"m{i}"), base_dir=tmp_base_dir)
+    messaging.read_inbox(team, "alice", base_dir=tmp_base_dir)
+    assert messaging.compact_inbox(team, "alice", retain_read=2, base_dir=tmp_base_dir) == 3
+    history, next_seq = messaging.read_inbox_history(team, "alice", limit=2,
+                                                     base_dir=tmp_base_dir)
+    assert [r["seq"] for r in history] == [1, 2] and next_seq == 2
+    assert [r["text"] for r in history] == ["green", "m0"]
+    live = messaging.read_inbox(team, "alice", base_dir=tmp_base_dir)
+    assert [m.text for m in live] == ["m2", "m3"]
+
+
+def test_concurrent_claims_hand_out_each_task_once(tmp_base_dir, team):
+    for i in range(20):
+        tasks.create_task(team, f"t{i}", "d", base_dir=tmp_base_dir)
+    claimed: list[str] = []
+
+    def worker(n: int) -> None:
+        while (task := tasks.claim_next_task(team, f"w{n}", base_dir=tmp_base_dir)) is not None:
+            claimed.append(task.id)
+        close_all()
+
+    threads = [
+        threading.Thread(target=contextvars.copy_context().run, args=(worker, n))
+        for n in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(claimed, key=int) == [str(i) for i in range(1, 21)]
+
+
+def test_memory_state_restores_from_a_snapshot(tmp_path, engine):
+    if engine != "memory":
+        pytest.skip("in-memory engine only")
+    snap = tmp_path / "state.snapshot.db"
+    teams.create_team("snap", "sess")
+    tasks.create_task("snap", "A", "d")
+    active_memory().save_snapshot(snap)
+    restored = MemoryDatabase(snap)
+    try:
+        with use_memory(restored):
+            assert [t.subject for t in tasks.list_tasks("snap")] == ["A"]
+            assert tasks.create_task("snap", "B", "d").id == "2"
+    finally:
+        restored.close()
+    # The original database is untouched by the restored copy's write.
+    assert [t.subject for t in tasks.list_tasks("snap")] == ["A"]
+
+
+def test_each_memory_database_is_its_own_state(engine):
+    if engine != "memory":
+        pytest.skip("in-memory engine only")
+    teams.create_team("mine", "sess")
+    other = MemoryDatabase()
+    try:
+        with use_memory(other):
+            assert not teams.team_exists("mine")
+    finally:
+        other.close()
+    assert teams.team_exists("mine")
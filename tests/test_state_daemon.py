@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import multiprocessing
+import sys
+import threading
+
+import pytest
+
+from opencode_teams import storage
+from opencode_teams.models import InboxMessage, TaskFile, TaskSpec
+from opencode_teams.sqlite.db import DB_ENV, STORAGE_ENV, MemoryDatabase, close_all, ring_doorbell
+from opencode_teams.state_daemon import SOCKET_ENV, StateDaemon, call, main
+from opencode_teams.storage import messaging, tasks, teams
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="the state daemon needs Unix domain sockets"
+)
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    """A daemon on its own loop thread; this process is its remote client."""
+    monkeypatch.setenv(DB_ENV, str(tmp_path / "state.db"))
+    monkeypatch.setenv(SOCKET_ENV, str(tmp_path / "state.sock"))
+    monkeypatch.setenv(STORAGE_ENV, "remote")
+    d = StateDaemon()
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def run() -> None:
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(d.start())
+        started.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    started.wait(5)
+    yield d
+    asyncio.run_coroutine_threadsafe(d.close(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+    close_all()
+
+
+def test_calls_run_in_the_daemon(daemon, tmp_path):
+    teams.create_team("t", "sess")
+    created = tasks.create_tasks("t", [TaskSpec(ref="a", subject="A"),
+                                       TaskSpec(subject="B", blocked_by=["a"])])
+    assert all(isinstance(t, TaskFile) for t in created)
+    claimed = tasks.claim_next_task("t", "w")
+    assert claimed.id == "1" and claimed.owner == "w"
+    page, cursor = tasks.query_tasks("t", limit=1, fields=["status"])
+    assert page == [{"id": "1", "status": "in_progress"}] and cursor == "1"
+    changes, seq, snapshot = tasks.task_changes("t", 0)
+    assert seq == 2 and snapshot is None
+    assert (tmp_path / "state.db").exists()
+
+
+def test_errors_keep_their_type(daemon):
+    with pytest.raises(ValueError, match="does not exist"):
+        tasks.create_task("nope", "A", "d")
+    with pytest.raises(FileNotFoundError):
+        teams.read_config("nope")
+    with pytest.raises(ValueError, match="Unknown state call"):
+        call("tasks", "_commit")
+    # Public, but imported by the engine rather than part of its API.
+    for module, fn in [("tasks", "transaction"), ("teams", "db_path"), ("tasks", "team_exists")]:
+        with pytest.raises(ValueError, match="Unknown state call"):
+            call(module, fn)
+
+
+def test_messages_round_trip_with_doorbell(daemon):
+    teams.create_team("t", "sess")
+    bell = messaging.ensure_inbox("t", "alice")
+    assert bell == messaging.inbox_path("t", "alice")
+    messaging.append_message(
+        "t", "alice", InboxMessage(from_="lead", text="hi", timestamp=messaging.now_iso())
+    )
+    page, next_seq = messaging.query_inbox_raw("t", "alice", unread_only=True)
+    assert [(seq, e["text"], e["read"]) for seq, e in page] == [(1, "hi", True)]
+    assert next_seq is None
+    assert bell.exists()
+
+
+def _drain(name: str) -> list[str]:
+    claimed = []
+    while (task := tasks.claim_next_task("t", name)) is not None:
+        claimed.append(task.id)
+    return claimed
+
+
+# The children only talk to the socket, never to the daemon thread's state.
+@pytest.mark.filterwarnings("ignore:This process .* is multi-threaded")
+def test_forked_clients_open_their_own_connection(daemon):
+    teams.create_team("t", "sess")
+    tasks.create_tasks("t", [TaskSpec(subject=f"t{i}") for i in range(30)])
+    with multiprocessing.get_context("fork").Pool(4) as pool:
+        claimed = [i for ids in pool.map(_drain, ["a", "b", "c", "d"]) for i in ids]
+    assert sorted(claimed, key=int) == [str(i) for i in range(1, 31)]
+
+
+def test_second_daemon_on_a_live_socket_is_refused(daemon):
+    with pytest.raises(RuntimeError, match="already serving"):
+        asyncio.run(StateDaemon(daemon.path).start())
+
+
+def test_client_reports_a_missing_daemon(tmp_path, monkeypatch):
+    monkeypatch.setenv(SOCKET_ENV, str(tmp_path / "none.sock"))
+    monkeypatch.setenv(STORAGE_ENV, "remote")
+    with pytest.raises(ConnectionError, match="not reachable"):
+        tasks.list_tasks("t")
+
+
+def test_spawned_servers_inherit_the_storage_settings(tmp_path, monkeypatch):
+    monkeypatch.setenv(STORAGE_ENV, "remote")
+    monkeypatch.setenv(SOCKET_ENV, str(tmp_path / "s.sock"))
+    monkeypatch.delenv(DB_ENV, raising=False)
+    assert storage.server_env() == {STORAGE_ENV: "remote", SOCKET_ENV: str(tmp_path / "s.sock")}
+    monkeypatch.setenv(STORAGE_ENV, "memory")
+    assert storage.server_env() == {}
+
+
+def test_memory_daemon_can_snapshot_after_every_write(tmp_path, monkeypatch):
+    monkeypatch.setenv(DB_ENV, str(tmp_path / "state.db"))
+    snap = tmp_path / "snap.db"
+    memory = MemoryDatabase()
+    memory.on_delivery = ring_doorbell
+    d = StateDaemon(tmp_path / "s.sock", memory, snapshot_each_write=snap)
+
+    def request(module: str, fn: str, *args) -> dict:
+        line = json.dumps({"module": module, "fn": fn, "args": list(args)}).encode()
+        return json.loads(d._call(line))
+
+    try:
+        assert request("teams", "team_exists", "t") == {"ok": True, "result": False}
+        assert not snap.exists()  # reads change nothing
+        assert request("teams", "create_team", "t", "sess")["ok"]
+        assert snap.exists()
+        # Remote clients wake on the doorbell files the daemon rings.
+        assert request("messaging", "send_plain_message", "t", "lead", "alice", "hi", "s")["ok"]
+        assert (tmp_path / "doorbells" / "t" / "alice").exists()
+        assert not (tmp_path / "state.db").exists()
+    finally:
+        d._executor.shutdown()
+        memory.close()
+
+
+def test_refuses_to_start_on_windows(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, "platform", "win32")
+    with pytest.raises(SystemExit):
+        main(["--socket", str(tmp_path / "state.sock")])
+    with pytest.raises(RuntimeError, match="Unix domain sockets"):
+        asyncio.run(StateDaemon(tmp_path / "state.sock").start())
+    assert not (tmp_path / "state.sock").exists()
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from fastmcp import Client
+
+from opencode_teams import messaging, storage, tasks, teams
+from opencode_teams.models import InboxMessage
+from opencode_teams.server import mcp
+from opencode_teams.sqlite import messaging as sqlite_messaging
+from opencode_teams.sqlite import tasks as sqlite_tasks
+from opencode_teams.sqlite import teams as sqlite_teams
+from opencode_teams.sqlite.db import (
+    SNAPSHOT_ENV,
+    MemoryDatabase,
+    close_all,
+    db_path,
+    use_memory,
+)
+
+
+@pytest.fixture(autouse=True)
+def _close_connections():
+    yield
+    close_all()
+
+
+def _msg(text: str) -> InboxMessage:
+    return InboxMessage(from_="lead", text=text, timestamp=messaging.now_iso(), read=False)
+
+
+def test_json_is_the_default_engine(monkeypatch):
+    monkeypatch.delenv(storage.STORAGE_ENV, raising=False)
+    assert storage.engine_name() == "json"
+    assert storage.tasks.create_task is tasks.create_task
+
+
+def test_namespaces_follow_the_environment(monkeypatch):
+    monkeypatch.setenv(storage.STORAGE_ENV, "sqlite")
+    assert storage.tasks.create_task is sqlite_tasks.create_task
+    assert storage.messaging.inbox_path is sqlite_messaging.inbox_path
+    monkeypatch.setenv(storage.STORAGE_ENV, "postgres")
+    with pytest.raises(ValueError, match="Unknown storage engine"):
+        storage.teams.read_config
+
+
+def test_import_then_export_round_trips(tmp_base_dir, tmp_path):
+    teams.create_team("t", "sess", base_dir=tmp_base_dir)
+    tasks.create_task("t", "A", "d", base_dir=tmp_base_dir)
+    tasks.create_task("t", "B", "d", base_dir=tmp_base_dir)
+    tasks.create_task("t", "C", "d", base_dir=tmp_base_dir)
+    tasks.update_task("t", "2", add_blocked_by=["1"], base_dir=tmp_base_dir)
+    tasks.update_task("t", "3", status="deleted", base_dir=tmp_base_dir)
+    tasks.claim_next_task("t", "w", base_dir=tmp_base_dir)
+    for i in range(5):
+        messaging.append_message("t", "alice", _msg(f"m{i}"), base_dir=tmp_base_dir)
+    messaging.query_inbox("t", "alice", limit=3, base_dir=tmp_base_dir)
+    messaging.compact_inbox("t", "alice", retain_read=1, base_dir=tmp_base_dir)
+
+    db_dir = tmp_path / "db"
+    assert storage.import_json(tmp_base_dir, db_dir) == {"teams": 1, "tasks": 2, "messages": 5}
+    assert sqlite_tasks.next_task_id("t", base_dir=db_dir) == "4"
+    assert sqlite_tasks.get_task("t", "1", base_dir=db_dir).owner == "w"
+    assert sqlite_tasks.get_task("t", "2", base_dir=db_dir).blocked_by == ["1"]
+    changes, seq, _ = sqlite_tasks.task_changes("t", 0, base_dir=db_dir)
+    assert [c["action"] for c in changes] == ["create"] and seq == 1
+    unread = sqlite_messaging.read_inbox("t", "alice", unread_only=True, mark_as_read=False,
+                                         base_dir=db_dir)
+    assert [m.text for m in unread] == ["m3", "m4"]
+    history, _ = sqlite_messaging.read_inbox_history("t", "alice", base_dir=db_dir)
+    assert [r["seq"] for r in history] == [1, 2]
+    with pytest.raises(ValueError, match="already exists"):
+        storage.import_json(tmp_base_dir, db_dir)
+
+    out = tmp_path / "out"
+    assert storage.export_json(out, db_dir)["tasks"] == 2
+    assert [t.model_dump() for t in tasks.list_tasks("t", base_dir=out)] == [
+        t.model_dump() for t in tasks.list_tasks("t", base_dir=tmp_base_dir)
+    ]
+    assert tasks.next_task_id("t", base_dir=out) == "4"
+    page, _ = messaging.query_inbox_raw("t", "alice", mark_as_read=False, base_dir=out)
+    assert [(seq, e["text"], e["read"]) for seq, e in page] == [
+        (3, "m2", True), (4, "m3", False), (5, "m4", False)
+    ]
+    history, _ = messaging.read_inbox_history("t", "alice", base_dir=out)
+    assert [r["text"] for r in history] == ["m0", "m1"]
+
+
+def test_cli_reports_counts(tmp_base_dir, tmp_path, capsys):
+    teams.create_team("t", "sess", base_dir=tmp_base_dir)
+    storage.main(["import", "--json-dir", str(tmp_base_dir), "--db-dir", str(tmp_path / "db")])
+    assert capsys.readouterr().out.strip() == "imported 1 team(s), 0 task(s), 0 message(s)"
+    with pytest.raises(SystemExit):
+        storage.main(["import", "--json-dir", str(tmp_base_dir), "--db-dir", str(tmp_path / "db")])
+
+
+async def test_server_runs_on_the_sqlite_engine(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv(storage.STORAGE_ENV, "sqlite")
+    monkeypatch.setenv("OPENCODE_TEAMS_DB", str(tmp_path / "state.db"))
+    monkeypatch.setattr(sqlite_teams, "TEAMS_DIR", tmp_path / "teams")
+    monkeypatch.setattr(
+        "opencode_teams.server.discover_opencode_binary", lambda: "/usr/bin/echo"
+    )
+    async with Client(mcp) as c:
+        await c.call_tool("team_create", {"team_name": "sq"})
+        await c.call_tool("task_create", {"team_name": "sq", "subject": "A", "description": "d"})
+        claimed = await c.call_tool("claim_next_task", {"team_name": "sq", "agent_name": "w"})
+        assert json.loads(claimed.content[0].text)["task"]["id"] == "1"
+        listed = await c.call_tool("task_list", {"team_name": "sq"})
+        assert json.loads(listed.content[0].text)[0]["owner"] == "w"
+    assert db_path().exists()
+    assert not (tmp_path / "teams").exists()
+
+
+async def test_memory_server_snapshots_on_shutdown(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv(storage.STORAGE_ENV, "memory")
+    monkeypatch.setenv(SNAPSHOT_ENV, str(tmp_path / "snap.db"))
+    monkeypatch.setattr(sqlite_teams, "TEAMS_DIR", tmp_path / "teams")
+    monkeypatch.setattr(
+        "opencode_teams.server.discover_opencode_binary", lambda: "/usr/bin/echo"
+    )
+    async with Client(mcp) as c:
+        await c.call_tool("team_create", {"team_name": "mem"})
+        await c.call_tool("task_create", {"team_name": "mem", "subject": "A", "description": "d"})
+    assert (tmp_path / "snap.db").exists()
+    restored = MemoryDatabase(tmp_path / "snap.db")
+    try:
+        with use_memory(restored):
+            assert [t.subject for t in sqlite_tasks.list_tasks("mem")] == ["A"]
+    finally:
+        restored.close()
+
+
+async def test_memory_server_wakes_poll_inbox_without_doorbells(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv(storage.STORAGE_ENV, "memory")
+    monkeypatch.setenv("OPENCODE_TEAMS_DB", str(tmp_path / "state.db"))
+    monkeypatch.setattr(sqlite_teams, "TEAMS_DIR", tmp_path / "teams")
+    monkeypatch.setattr(
+        "opencode_teams.server.discover_opencode_binary", lambda: "/usr/bin/echo"
+    )
+    async with Client(mcp) as c:
+        await c.call_tool("team_create", {"team_name": "mem"})
+        poll = asyncio.create_task(c.call_tool(
+            "poll_inbox", {"team_name": "mem", "agent_name": "team-lead", "timeout_ms": 10000}
+        ))
+        await asyncio.sleep(0.1)
+        assert not poll.done()
+        await c.call_tool("send_message", {
+            "team_name": "mem", "type": "message", "recipient": "team-lead",
+            "content": "hi", "summary": "s", "sender": "bob",
+        })
+        page = json.loads((await asyncio.wait_for(poll, 2.0)).content[0].text)
+        assert [m["text"] for m in page] == ["hi"]
+    # Neither the database file nor any doorbell was written.
+    assert list(tmp_path.iterdir()) == []
+    # The state went with the server; nothing falls back to the file.
+    with pytest.raises(RuntimeError, match="none is open here"):
+        storage.tasks.list_tasks("mem")
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from opencode_teams import task_events, task_index
+from opencode_teams.task_events import events_path, replay
+from opencode_teams.tasks import (
+    claim_next_task,
+    create_task,
+    get_task,
+    list_tasks,
+    task_changes,
+    update_task,
+)
+
+
+@pytest.fixture
+def team_tasks_dir(tmp_base_dir):
+    from opencode_teams.teams import create_team
+    create_team("test-team", "sess-test", base_dir=tmp_base_dir)
+    return tmp_base_dir / "tasks" / "test-team"
+
+
+def _records(team_tasks_dir) -> list[dict]:
+    return [json.loads(line) for line in events_path(team_tasks_dir).read_text().splitlines()]
+
+
+def test_every_mutation_appends_one_record(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    create_task("test-team", "B", "d", base_dir=tmp_base_dir)
+    update_task("test-team", "2", add_blocked_by=["1"], base_dir=tmp_base_dir)
+    claim_next_task("test-team", "w", base_dir=tmp_base_dir)
+    update_task("test-team", "2", status="deleted", base_dir=tmp_base_dir)
+    records = _records(team_tasks_dir)
+    assert [(r["seq"], r["action"]) for r in records] == [
+        (1, "create"), (2, "create"), (3, "update"), (4, "claim"), (5, "delete"),
+    ]
+    # The dependency edit carries both ends of the edge.
+    assert sorted(t["id"] for t in records[2]["tasks"]) == ["1", "2"]
+    assert records[4]["removed"] == ["2"]
+    assert [t["blocks"] for t in records[4]["tasks"]] == [[]]
+
+
+def test_replay_matches_task_files(tmp_base_dir, team_tasks_dir):
+    for name in ("A", "B", "C"):
+        create_task("test-team", name, "d", base_dir=tmp_base_dir)
+    update_task("test-team", "3", add_blocked_by=["1", "2"], base_dir=tmp_base_dir)
+    update_task("test-team", "1", status="completed", base_dir=tmp_base_dir)
+    update_task("test-team", "2", status="deleted", base_dir=tmp_base_dir)
+    seq, state = replay(team_tasks_dir)
+    assert seq == 6
+    on_disk = {t.id: t.model_dump(by_alias=True, exclude_none=True) for t in list_tasks(
+        "test-team", base_dir=tmp_base_dir
+    )}
+    assert state == on_disk
+
+
+def test_snapshot_folds_the_log(tmp_base_dir, team_tasks_dir, monkeypatch):
+    monkeypatch.setattr(task_events, "TASK_EVENTS_SNAPSHOT_BYTES", 1)
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    create_task("test-team", "B", "d", base_dir=tmp_base_dir)
+    assert not events_path(team_tasks_dir).exists()
+    seq, state = replay(team_tasks_dir)
+    assert seq == 2 and sorted(state) == ["1", "2"]
+    update_task("test-team", "1", owner="w", base_dir=tmp_base_dir)
+    assert task_events.last_seq(team_tasks_dir) == 3
+
+
+def test_log_starts_from_tasks_written_before_it(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    events_path(team_tasks_dir).unlink()
+    (team_tasks_dir / "events.snapshot.json").unlink()
+    create_task("test-team", "B", "d", base_dir=tmp_base_dir)
+    assert sorted(replay(team_tasks_dir)[1]) == ["1", "2"]
+
+
+def test_recovery_redoes_a_torn_mutation(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    create_task("test-team", "B", "d", base_dir=tmp_base_dir)
+    update_task("test-team", "2", add_blocked_by=["1"], base_dir=tmp_base_dir)
+    # Simulate a crash after task 2 was written back but before task 1 was.
+    torn = json.loads((team_tasks_dir / "1.json").read_text())
+    torn["blocks"] = []
+    (team_tasks_dir / "1.json").write_text(json.dumps(torn))
+    (team_tasks_dir / "index.dirty").write_text("3")
+    task_index._loaded.clear()
+    task_index.load_index(team_tasks_dir)
+    assert get_task("test-team", "1", base_dir=tmp_base_dir).blocks == ["2"]
+    assert not (team_tasks_dir / "index.dirty").exists()
+
+
+def test_recovery_drops_a_torn_record(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    with open(events_path(team_tasks_dir), "ab") as f:
+        f.write(b'{"seq":2,"ts":0,"act')
+    (team_tasks_dir / "index.dirty").write_text("2")
+    task_index._loaded.clear()
+    task_index.load_index(team_tasks_dir)
+    create_task("test-team", "B", "d", base_dir=tmp_base_dir)
+    assert [r["seq"] for r in _records(team_tasks_dir)] == [1, 2]
+
+
+def test_task_changes_pages_through_the_log(tmp_base_dir, team_tasks_dir):
+    for name in ("A", "B", "C"):
+        create_task("test-team", name, "d", base_dir=tmp_base_dir)
+    changes, seq, snapshot = task_changes("test-team", 0, limit=2, base_dir=tmp_base_dir)
+    assert [c["seq"] for c in changes] == [1, 2] and seq == 2 and snapshot is None
+    changes, seq, _ = task_changes("test-team", seq, base_dir=tmp_base_dir)
+    assert [c["tasks"][0]["subject"] for c in changes] == ["C"] and seq == 3
+    assert task_changes("test-team", seq, base_dir=tmp_base_dir) == ([], 3, None)
+
+
+def test_task_changes_resyncs_from_before_the_snapshot(tmp_base_dir, team_tasks_dir, monkeypatch):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    monkeypatch.setattr(task_events, "TASK_EVENTS_SNAPSHOT_BYTES", 1)
+    create_task("test-team", "B", "d", base_dir=tmp_base_dir)
+    changes, seq, snapshot = task_changes("test-team", 1, base_dir=tmp_base_dir)
+    assert changes == [] and seq == 2
+    assert [t["subject"] for t in snapshot] == ["A", "B"]
+    # A seq from the future (the team was recreated) also resyncs.
+    assert task_changes("test-team", 99, base_dir=tmp_base_dir)[2] is not None
+
+
+def test_task_changes_rejects_nonexistent_team(tmp_base_dir):
+    with pytest.raises(ValueError, match="does not exist"):
+        task_changes("nope", base_dir=tmp_base_dir)
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from opencode_teams import task_index
+from opencode_teams.task_index import index_path, load_index
+from opencode_teams.tasks import create_task, get_task, update_task
+
+
+@pytest.fixture
+def team_tasks_dir(tmp_base_dir):
+    from opencode_teams.teams import create_team
+    create_team("test-team", "sess-test", base_dir=tmp_base_dir)
+    return tmp_base_dir / "tasks" / "test-team"
+
+
+def _index(team_tasks_dir) -> dict:
+    return load_index(team_tasks_dir).to_json()
+
+
+def _fresh_load(team_tasks_dir):
+    """Load as a process that has never seen this team would."""
+    task_index._loaded.clear()
+    return load_index(team_tasks_dir)
+
+
+def test_index_tracks_status_owner_and_reverse_edges(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    create_task("test-team", "B", "d", base_dir=tmp_base_dir)
+    update_task("test-team", "2", add_blocked_by=["1"], owner="w", base_dir=tmp_base_dir)
+    raw = _index(team_tasks_dir)
+    assert raw["tasks"]["2"] == {
+        "subject": "B", "status": "pending", "owner": "w", "priority": 0, "leaseExpiresAt": None,
+        "blocks": [], "blockedBy": ["1"],
+    }
+    assert raw["dependents"] == {"1": ["2"]}
+    assert raw["blockers"] == {"2": ["1"]}
+
+
+def test_complete_only_opens_dependents(tmp_base_dir, team_tasks_dir):
+    for name in ("A", "B", "C"):
+        create_task("test-team", name, "d", base_dir=tmp_base_dir)
+    update_task("test-team", "2", add_blocked_by=["1"], base_dir=tmp_base_dir)
+    # An unrelated task file that a directory scan would choke on.
+    (team_tasks_dir / "3.json").write_text("not json")
+    update_task("test-team", "1", status="completed", base_dir=tmp_base_dir)
+    assert get_task("test-team", "2", base_dir=tmp_base_dir).blocked_by == []
+    assert "1" not in _index(team_tasks_dir)["dependents"]
+
+
+def test_delete_strips_refs_in_both_directions(tmp_base_dir, team_tasks_dir):
+    for name in ("A", "B", "C"):
+        create_task("test-team", name, "d", base_dir=tmp_base_dir)
+    update_task("test-team", "2", add_blocked_by=["1"], add_blocks=["3"], base_dir=tmp_base_dir)
+    update_task("test-team", "2", status="deleted", base_dir=tmp_base_dir)
+    raw = _index(team_tasks_dir)
+    assert sorted(raw["tasks"]) == ["1", "3"]
+    assert raw["dependents"] == {} and raw["blockers"] == {}
+    assert get_task("test-team", "1", base_dir=tmp_base_dir).blocks == []
+    assert get_task("test-team", "3", base_dir=tmp_base_dir).blocked_by == []
+
+
+def test_missing_index_is_rebuilt_from_task_files(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    create_task("test-team", "B", "d", base_dir=tmp_base_dir)
+    update_task("test-team", "2", add_blocked_by=["1"], base_dir=tmp_base_dir)
+    index_path(team_tasks_dir).unlink()
+    index = _fresh_load(team_tasks_dir)
+    assert index.dependents == {"1": {"2"}}
+    assert index_path(team_tasks_dir).exists()
+
+
+def test_dirty_marker_forces_rebuild(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    # Simulate a crash after a task file was written but before the index.
+    (team_tasks_dir / "index.dirty").touch()
+    (team_tasks_dir / "2.json").write_text(
+        json.dumps({"id": "2", "subject": "B", "description": "", "status": "pending"})
+    )
+    index = _fresh_load(team_tasks_dir)
+    assert sorted(index.tasks) == ["1", "2"]
+    assert not (team_tasks_dir / "index.dirty").exists()
+
+
+def test_changes_are_appended_to_the_log(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    snapshot = index_path(team_tasks_dir).read_bytes()
+    create_task("test-team", "B", "d", base_dir=tmp_base_dir)
+    update_task("test-team", "2", owner="w", base_dir=tmp_base_dir)
+    assert index_path(team_tasks_dir).read_bytes() == snapshot
+    log = (team_tasks_dir / "index.log").read_text().splitlines()
+    assert [json.loads(line).get("put") for line in log] == ["1", "2", "2"]
+    assert _fresh_load(team_tasks_dir).tasks["2"]["owner"] == "w"
+
+
+def test_other_process_changes_are_replayed(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    mine = load_index(team_tasks_dir)
+    task_index._loaded.clear()  # another process takes the next write
+    update_task("test-team", "1", owner="w", base_dir=tmp_base_dir)
+    task_index._loaded[team_tasks_dir] = task_index._Loaded(
+        mine, task_index._snapshot_key(team_tasks_dir), 0, 0
+    )
+    assert load_index(team_tasks_dir).tasks["1"]["owner"] == "w"
+
+
+def test_log_is_folded_into_snapshot(tmp_base_dir, team_tasks_dir, monkeypatch):
+    monkeypatch.setattr(task_index, "INDEX_LOG_MIN_RECORDS", 2)
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    for owner in ("w1", "w2"):
+        update_task("test-team", "1", owner=owner, base_dir=tmp_base_dir)
+    assert not (team_tasks_dir / "index.log").exists()
+    assert json.loads(index_path(team_tasks_dir).read_text())["tasks"]["1"]["owner"] == "w2"
+
+
+def _reachable(index, start: str, goal: str) -> bool:
+    seen, stack = set(), [start]
+    while stack:
+        t = stack.pop()
+        if t == goal:
+            return True
+        if t not in seen:
+            seen.add(t)
+            stack.extend(index.tasks[t]["blockedBy"])
+    return False
+
+
+def test_incremental_cycle_check_matches_graph_search(tmp_base_dir, team_tasks_dir):
+    import random
+
+    rng = random.Random(7)
+    for i in range(30):
+        create_task("test-team", f"t{i}", "d", base_dir=tmp_base_dir)
+    index = load_index(team_tasks_dir)
+    for _ in range(200):
+        a, b = (str(rng.randint(1, 30)) for _ in range(2))
+        if a == b:
+            continue
+        expected = _reachable(index, b, a)
+        assert (index.would_create_cycle([(a, b)]) is not None) == expected
+        if not expected and b not in index.tasks[a]["blockedBy"]:
+            update_task("test-team", a, add_blocked_by=[b], base_dir=tmp_base_dir)
+    order = index._ensure_order()
+    for t, entry in index.tasks.items():
+        assert all(order[b] < order[t] for b in entry["blockedBy"])
+
+
+def test_cycle_check_sees_edges_added_in_the_same_call(tmp_base_dir, team_tasks_dir):
+    for name in ("A", "B", "C"):
+        create_task("test-team", name, "d", base_dir=tmp_base_dir)
+    index = load_index(team_tasks_dir)
+    assert index.would_create_cycle([("2", "1"), ("3", "2")]) is None
+    assert index.would_create_cycle([("2", "1"), ("3", "2"), ("1", "3")]) == ("1", "3")
+    # Nothing was stored, so the reverse chain is still allowed.
+    assert index.would_create_cycle([("1", "3")]) is None
+
+
+def test_every_mutation_bumps_the_version(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    start = task_index.read_version(team_tasks_dir)
+    update_task("test-team", "1", owner="w", base_dir=tmp_base_dir)
+    update_task("test-team", "1", owner="v", base_dir=tmp_base_dir)
+    assert task_index.read_version(team_tasks_dir) == start + 2
+    assert load_index(team_tasks_dir).version == start + 2
+    (team_tasks_dir / "index.dirty").touch()
+    assert task_index.read_version(team_tasks_dir) is None
+    _fresh_load(team_tasks_dir)  # rebuild after the simulated crash
+    assert task_index.read_version(team_tasks_dir) == start + 3
+
+
+def test_index_tracks_the_highest_id(tmp_base_dir, team_tasks_dir):
+    for name in ("A", "B", "C"):
+        create_task("test-team", name, "d", base_dir=tmp_base_dir)
+    update_task("test-team", "3", owner="w", base_dir=tmp_base_dir)
+    assert load_index(team_tasks_dir).max_id == 3
+    update_task("test-team", "3", status="deleted", base_dir=tmp_base_dir)
+    assert load_index(team_tasks_dir).max_id == 2
+    assert _fresh_load(team_tasks_dir).max_id == 2
@@ -5,12 +5,19 @@ from pathlib import Path
 
 import pytest
 
+from opencode_teams.models import TaskSpec
 from opencode_teams.tasks import (
+    claim_next_task,
     create_task,
+    create_tasks,
+    expire_leases,
     get_task,
     list_tasks,
     next_task_id,
+    query_tasks,
+    renew_leases,
     reset_owner_tasks,
+    tasks_by_owner,
     update_task,
 )
 
@@ -190,6 +197,35 @@ def test_reset_owner_tasks_only_affects_matching_owner(tmp_base_dir, team_tasks_
     assert after2.owner == "w2"
 
 
+def test_reset_owner_tasks_only_opens_owned_tasks(tmp_base_dir, team_tasks_dir):
+    for name in ("A", "B", "C"):
+        create_task("test-team", name, "d", base_dir=tmp_base_dir)
+    update_task("test-team", "2", owner="w", base_dir=tmp_base_dir)
+    # A task file that a directory scan would choke on.
+    (team_tasks_dir / "3.json").write_text("not json")
+    reset_owner_tasks("test-team", "w", base_dir=tmp_base_dir)
+    assert get_task("test-team", "2", base_dir=tmp_base_dir).owner is None
+    assert tasks_by_owner("test-team", base_dir=tmp_base_dir) == {}
+
+
+def test_tasks_by_owner_groups_and_filters(tmp_base_dir, team_tasks_dir):
+    for name in ("A", "B", "C"):
+        create_task("test-team", name, "d", base_dir=tmp_base_dir)
+    claim_next_task("test-team", "w1", base_dir=tmp_base_dir)
+    update_task("test-team", "2", owner="w2", base_dir=tmp_base_dir)
+    update_task("test-team", "3", owner="w1", status="completed", base_dir=tmp_base_dir)
+    by_owner = tasks_by_owner("test-team", base_dir=tmp_base_dir)
+    assert sorted(by_owner) == ["w1", "w2"]
+    assert [(t["id"], t["status"]) for t in by_owner["w1"]] == [
+        ("1", "in_progress"), ("3", "completed"),
+    ]
+    assert "leaseExpiresAt" in by_owner["w1"][0]
+    assert tasks_by_owner("test-team", status="in_progress", base_dir=tmp_base_dir) == {
+        "w1": [by_owner["w1"][0]],
+    }
+    assert tasks_by_owner("test-team", owner="idle", base_dir=tmp_base_dir) == {"idle": []}
+
+
 def test_create_task_rejects_empty_subject(tmp_base_dir, team_tasks_dir):
     with pytest.raises(ValueError, match="subject must not be empty"):
         create_task("test-team", "", "desc", base_dir=tmp_base_dir)
@@ -429,3 +465,270 @@ def test_reset_owner_tasks_preserves_completed_status(tmp_base_dir, team_tasks_d
     after = get_task("test-team", task.id, base_dir=tmp_base_dir)
     assert after.status == "completed"
     assert after.owner is None
+
+
+def test_task_ids_come_from_persisted_counter(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    create_task("test-team", "B", "d", base_dir=tmp_base_dir)
+    assert (team_tasks_dir / ".next_id").read_text() == "3"
+    assert next_task_id("test-team", base_dir=tmp_base_dir) == "3"
+
+
+def test_task_ids_are_not_reused_after_delete(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    create_task("test-team", "B", "d", base_dir=tmp_base_dir)
+    update_task("test-team", "2", status="deleted", base_dir=tmp_base_dir)
+    assert create_task("test-team", "C", "d", base_dir=tmp_base_dir).id == "3"
+
+
+def test_counter_heals_when_missing_or_behind(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    create_task("test-team", "B", "d", base_dir=tmp_base_dir)
+    (team_tasks_dir / ".next_id").unlink()
+    assert create_task("test-team", "C", "d", base_dir=tmp_base_dir).id == "3"
+    (team_tasks_dir / ".next_id").write_text("2")
+    assert create_task("test-team", "D", "d", base_dir=tmp_base_dir).id == "4"
+
+
+def test_counter_heals_past_higher_ids_when_its_own_id_was_deleted(
+    tmp_base_dir, team_tasks_dir
+):
+    for name in ("A", "B", "C"):
+        create_task("test-team", name, "d", base_dir=tmp_base_dir)
+    update_task("test-team", "2", status="deleted", base_dir=tmp_base_dir)
+    (team_tasks_dir / ".next_id").write_text("2")
+    assert next_task_id("test-team", base_dir=tmp_base_dir) == "4"
+    assert create_task("test-team", "D", "d", base_dir=tmp_base_dir).id == "4"
+
+
+def test_create_tasks_wires_local_refs_and_existing_ids(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "Existing", "d", base_dir=tmp_base_dir)
+    created = create_tasks("test-team", [
+        TaskSpec(ref="design", subject="Design", blocked_by=["1"]),
+        TaskSpec(ref="build", subject="Build", blocked_by=["design"]),
+        TaskSpec(subject="Ship", blocked_by=["build", "design"]),
+    ], base_dir=tmp_base_dir)
+    assert [t.id for t in created] == ["2", "3", "4"]
+    assert get_task("test-team", "1", base_dir=tmp_base_dir).blocks == ["2"]
+    assert get_task("test-team", "2", base_dir=tmp_base_dir).blocks == ["3", "4"]
+    assert get_task("test-team", "4", base_dir=tmp_base_dir).blocked_by == ["3", "2"]
+    update_task("test-team", "1", status="completed", base_dir=tmp_base_dir)
+    assert get_task("test-team", "2", base_dir=tmp_base_dir).blocked_by == []
+
+
+def test_create_tasks_rejects_cycle_without_writing(tmp_base_dir, team_tasks_dir):
+    with pytest.raises(ValueError, match="cycle among: a, b"):
+        create_tasks("test-team", [
+            TaskSpec(ref="a", subject="A", blocked_by=["b"]),
+            TaskSpec(ref="b", subject="B", blocked_by=["a"]),
+            TaskSpec(ref="c", subject="C"),
+        ], base_dir=tmp_base_dir)
+    assert list_tasks("test-team", base_dir=tmp_base_dir) == []
+
+
+def test_create_tasks_rejects_unknown_dependency(tmp_base_dir, team_tasks_dir):
+    with pytest.raises(ValueError, match="'nope' does not exist"):
+        create_tasks("test-team", [TaskSpec(subject="A", blocked_by=["nope"])], base_dir=tmp_base_dir)
+
+
+def test_claim_next_task_takes_oldest_ready_task(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    create_task("test-team", "B", "d", base_dir=tmp_base_dir)
+    update_task("test-team", "1", add_blocked_by=["2"], base_dir=tmp_base_dir)
+    task = claim_next_task("test-team", "w1", base_dir=tmp_base_dir)
+    assert (task.id, task.status, task.owner) == ("2", "in_progress", "w1")
+    assert claim_next_task("test-team", "w2", base_dir=tmp_base_dir) is None
+    update_task("test-team", "2", status="completed", base_dir=tmp_base_dir)
+    assert claim_next_task("test-team", "w2", base_dir=tmp_base_dir).id == "1"
+
+
+def test_claim_next_task_prefers_priority(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "low", "d", metadata={"priority": "low"}, base_dir=tmp_base_dir)
+    create_task("test-team", "plain", "d", base_dir=tmp_base_dir)
+    create_task("test-team", "urgent", "d", metadata={"priority": 5}, base_dir=tmp_base_dir)
+    order = [claim_next_task("test-team", "w", base_dir=tmp_base_dir).subject for _ in range(3)]
+    assert order == ["urgent", "plain", "low"]
+
+
+def test_claim_next_task_filters_on_metadata(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "ui", "d", metadata={"area": "ui"}, base_dir=tmp_base_dir)
+    create_task("test-team", "db", "d", metadata={"area": "db"}, base_dir=tmp_base_dir)
+    task = claim_next_task("test-team", "w", metadata={"area": "db"}, base_dir=tmp_base_dir)
+    assert task.subject == "db"
+
+
+def test_claim_next_task_skips_assigned_tasks(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    update_task("test-team", "1", owner="someone", base_dir=tmp_base_dir)
+    assert claim_next_task("test-team", "w", base_dir=tmp_base_dir) is None
+    reset_owner_tasks("test-team", "someone", base_dir=tmp_base_dir)
+    assert claim_next_task("test-team", "w", base_dir=tmp_base_dir).id == "1"
+
+
+def test_claim_sets_lease_and_completion_clears_it(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    task = claim_next_task("test-team", "w", base_dir=tmp_base_dir)
+    assert task.lease_expires_at is not None
+    done = update_task("test-team", "1", status="completed", base_dir=tmp_base_dir)
+    assert done.lease_expires_at is None
+
+
+def test_expired_lease_requeues_task(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    create_task("test-team", "B", "d", base_dir=tmp_base_dir)
+    claim_next_task("test-team", "w1", base_dir=tmp_base_dir)
+    claim_next_task("test-team", "w2", base_dir=tmp_base_dir)
+    renew_leases("test-team", "w2", base_dir=tmp_base_dir)
+    lease = get_task("test-team", "1", base_dir=tmp_base_dir).lease_expires_at
+    assert expire_leases("test-team", now_ms=lease - 1, base_dir=tmp_base_dir) == []
+    requeued = expire_leases("test-team", now_ms=lease, base_dir=tmp_base_dir)
+    assert [(t.id, t.owner) for t in requeued] == [("1", "w1")]
+    task = get_task("test-team", "1", base_dir=tmp_base_dir)
+    assert (task.status, task.owner, task.lease_expires_at) == ("pending", None, None)
+    assert claim_next_task("test-team", "w3", base_dir=tmp_base_dir).id == "1"
+
+
+def test_update_from_owner_renews_lease(tmp_base_dir, team_tasks_dir, monkeypatch):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    first = claim_next_task("test-team", "w", base_dir=tmp_base_dir).lease_expires_at
+    monkeypatch.setattr("opencode_teams.task_planning.TASK_LEASE_SECONDS", 3600)
+    task = update_task("test-team", "1", owner="w", active_form="Working", base_dir=tmp_base_dir)
+    assert task.lease_expires_at > first
+    assert renew_leases("test-team", "nobody", base_dir=tmp_base_dir) == []
+
+
+def test_query_tasks_filters_and_pages_from_index(tmp_base_dir, team_tasks_dir):
+    for name in ("A", "B", "C", "D"):
+        create_task("test-team", name, "d", base_dir=tmp_base_dir)
+    update_task("test-team", "2", owner="w", base_dir=tmp_base_dir)
+    update_task("test-team", "4", add_blocked_by=["3"], base_dir=tmp_base_dir)
+    page, cursor = query_tasks("test-team", limit=3, fields=["subject"], base_dir=tmp_base_dir)
+    assert page == [{"id": "1", "subject": "A"}, {"id": "2", "subject": "B"}, {"id": "3", "subject": "C"}]
+    rest, cursor = query_tasks("test-team", cursor=cursor, fields=["subject"], base_dir=tmp_base_dir)
+    assert (rest, cursor) == ([{"id": "4", "subject": "D"}], None)
+    owned, _ = query_tasks("test-team", owner="w", fields=["owner"], base_dir=tmp_base_dir)
+    assert owned == [{"id": "2", "owner": "w"}]
+    ready, _ = query_tasks("test-team", ready_only=True, fields=["id"], base_dir=tmp_base_dir)
+    assert [t["id"] for t in ready] == ["1", "3"]
+
+
+def test_query_tasks_projection_avoids_task_files(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    (team_tasks_dir / "1.json").write_text("not json")
+    page, _ = query_tasks("test-team", fields=["id", "status"], base_dir=tmp_base_dir)
+    assert page == [{"id": "1", "status": "pending"}]
+
+
+def test_query_tasks_reads_files_for_other_fields(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "long text", metadata={"k": 1}, base_dir=tmp_base_dir)
+    page, _ = query_tasks("test-team", fields=["description"], base_dir=tmp_base_dir)
+    assert page == [{"id": "1", "description": "long text"}]
+    full, _ = query_tasks("test-team", status="pending", base_dir=tmp_base_dir)
+    assert full[0]["metadata"] == {"k": 1}
+
+
+
+def test_query_tasks_skips_the_lock_until_version_moves(
+    tmp_base_dir, team_tasks_dir, monkeypatch
+):
+    import opencode_teams.tasks as tasks_module
+
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    create_task("test-team", "B", "d", base_dir=tmp_base_dir)
+    query_tasks("test-team", base_dir=tmp_base_dir)
+    real_lock = tasks_module.file_lock
+    locked = []
+    monkeypatch.setattr(
+        tasks_module, "file_lock", lambda path: locked.append(path) or real_lock(path)
+    )
+    page, _ = query_tasks("test-team", fields=["id", "subject"], base_dir=tmp_base_dir)
+    assert page == [{"id": "1", "subject": "A"}, {"id": "2", "subject": "B"}]
+    full, _ = query_tasks("test-team", status="pending", base_dir=tmp_base_dir)
+    assert [t["description"] for t in full] == ["d", "d"]
+    assert locked == []
+    update_task("test-team", "1", status="in_progress", base_dir=tmp_base_dir)
+    locked.clear()
+    page, _ = query_tasks("test-team", status="in_progress", fields=["id"], base_dir=tmp_base_dir)
+    assert page == [{"id": "1"}]
+    assert len(locked) == 1
+
+def _other_process_write(team_tasks_dir, task_id: str, **changes) -> None:
+    path = team_tasks_dir / f"{task_id}.json"
+    raw = json.loads(path.read_text()) | changes
+    path.write_text(json.dumps(raw))
+    version = team_tasks_dir / "index.version"
+    version.write_text(str(int(version.read_text()) + 1))
+
+
+def test_list_tasks_is_served_from_cache_until_version_moves(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    create_task("test-team", "B", "d", base_dir=tmp_base_dir)
+    assert [t.subject for t in list_tasks("test-team", base_dir=tmp_base_dir)] == ["A", "B"]
+    # An unversioned edit is invisible: the cache answered without reading.
+    (team_tasks_dir / "2.json").write_text("not json")
+    assert [t.subject for t in list_tasks("test-team", base_dir=tmp_base_dir)] == ["A", "B"]
+    (team_tasks_dir / "2.json").write_text(
+        json.dumps({"id": "2", "subject": "B", "description": "d", "status": "pending"})
+    )
+    _other_process_write(team_tasks_dir, "1", subject="A2")
+    assert [t.subject for t in list_tasks("test-team", base_dir=tmp_base_dir)] == ["A2", "B"]
+    assert get_task("test-team", "1", base_dir=tmp_base_dir).subject == "A2"
+
+
+def test_own_writes_keep_the_cache_warm(tmp_base_dir, team_tasks_dir):
+    for name in ("A", "B", "C"):
+        create_task("test-team", name, "d", base_dir=tmp_base_dir)
+    list_tasks("test-team", base_dir=tmp_base_dir)
+    (team_tasks_dir / "3.json").write_text("not json")
+    update_task("test-team", "1", owner="w", base_dir=tmp_base_dir)
+    update_task("test-team", "2", status="deleted", base_dir=tmp_base_dir)
+    create_task("test-team", "D", "d", base_dir=tmp_base_dir)
+    listed = list_tasks("test-team", base_dir=tmp_base_dir)
+    assert [(t.id, t.owner) for t in listed] == [("1", "w"), ("3", None), ("4", None)]
+
+
+def test_cached_task_is_not_shared_with_callers(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    get_task("test-team", "1", base_dir=tmp_base_dir).blocks.append("99")
+    assert get_task("test-team", "1", base_dir=tmp_base_dir).blocks == []
+
+
+def test_cache_is_bypassed_while_a_write_is_in_flight(tmp_base_dir, team_tasks_dir):
+    create_task("test-team", "A", "d", base_dir=tmp_base_dir)
+    get_task("test-team", "1", base_dir=tmp_base_dir)
+    (team_tasks_dir / "index.dirty").touch()
+    path = team_tasks_dir / "1.json"
+    path.write_text(json.dumps(json.loads(path.read_text()) | {"subject": "mid-write"}))
+    assert get_task("test-team", "1", base_dir=tmp_base_dir).subject == "mid-write"
+
+
+def test_recreated_team_does_not_see_the_old_cache(tmp_base_dir, team_tasks_dir):
+    from opencode_teams.teams import create_team, delete_team
+
+    for name in ("A", "B", "C"):
+        create_task("test-team", name, "d", base_dir=tmp_base_dir)
+    list_tasks("test-team", base_dir=tmp_base_dir)
+    delete_team("test-team", base_dir=tmp_base_dir)
+    create_team("test-team", "sess-2", base_dir=tmp_base_dir)
+    # The new team's index.version climbs back to the cached one.
+    for name in ("X", "Y", "Z"):
+        create_task("test-team", name, "d", base_dir=tmp_base_dir)
+    assert [t.subject for t in list_tasks("test-team", base_dir=tmp_base_dir)] == ["X", "Y", "Z"]
+    assert get_task("test-team", "1", base_dir=tmp_base_dir).subject == "X"
+
+
+def test_team_recreated_by_another_process_invalidates_the_cache(tmp_base_dir, team_tasks_dir):
+    import shutil
+
+    from opencode_teams.teams import create_team
+
+    for name in ("A", "B", "C"):
+        create_task("test-team", name, "d", base_dir=tmp_base_dir)
+    list_tasks("test-team", base_dir=tmp_base_dir)
+    # Another process deletes and recreates the team: this cache is not told.
+    shutil.rmtree(tmp_base_dir / "teams" / "test-team")
+    shutil.rmtree(team_tasks_dir)
+    create_team("test-team", "sess-2", base_dir=tmp_base_dir)
+    for name in ("X", "Y", "Z"):
+        create_task("test-team", name, "d", base_dir=tmp_base_dir)
+    assert [t.subject for t in list_tasks("test-team", base_dir=tmp_base_dir)] == ["X", "Y", "Z"]
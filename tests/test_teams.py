@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import threading
 import time
 import unittest.mock
 from pathlib import Path
@@ -15,6 +16,8 @@ from opencode_teams.teams import (
     get_project_dir,
     read_config,
     remove_member,
+    subscribe_topic,
+    unsubscribe_topic,
     write_config,
 )
 
@@ -279,3 +282,52 @@ class TestRemoveMemberCleansUpConfig:
         remove_member("cleanup-nofile", "worker", base_dir=tmp_base_dir)
         cfg = read_config("cleanup-nofile", base_dir=tmp_base_dir)
         assert len(cfg.members) == 1
+
+
+class TestTopicSubscriptions:
+    def test_subscribe_persists_to_member(self, tmp_base_dir: Path) -> None:
+        create_team("subs", "sess-1", base_dir=tmp_base_dir)
+        add_member("subs", _make_teammate("worker", "subs"), base_dir=tmp_base_dir)
+        assert subscribe_topic("subs", "worker", "build.status", base_dir=tmp_base_dir) == [
+            "build.status"
+        ]
+        subscribe_topic("subs", "worker", "build.status", base_dir=tmp_base_dir)
+        cfg = read_config("subs", base_dir=tmp_base_dir)
+        worker = next(m for m in cfg.members if m.name == "worker")
+        assert worker.subscriptions == ["build.status"]
+
+    def test_unsubscribe_removes_topic(self, tmp_base_dir: Path) -> None:
+        create_team("unsubs", "sess-1", base_dir=tmp_base_dir)
+        subscribe_topic("unsubs", "team-lead", "a", base_dir=tmp_base_dir)
+        subscribe_topic("unsubs", "team-lead", "b", base_dir=tmp_base_dir)
+        assert unsubscribe_topic("unsubs", "team-lead", "a", base_dir=tmp_base_dir) == ["b"]
+        assert unsubscribe_topic("unsubs", "team-lead", "a", base_dir=tmp_base_dir) == ["b"]
+
+    def test_concurrent_add_member_and_subscribe_keep_both(self, tmp_base_dir: Path) -> None:
+        create_team("subs-race", "sess-1", base_dir=tmp_base_dir)
+        topics = [f"t{i}" for i in range(10)]
+
+        def add_all() -> None:
+            for i in range(10):
+                add_member("subs-race", _make_teammate(f"w{i}", "subs-race"),
+                           base_dir=tmp_base_dir)
+
+        def subscribe_all() -> None:
+            for topic in topics:
+                subscribe_topic("subs-race", "team-lead", topic, base_dir=tmp_base_dir)
+
+        threads = [threading.Thread(target=add_all), threading.Thread(target=subscribe_all)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        cfg = read_config("subs-race", base_dir=tmp_base_dir)
+        assert {m.name for m in cfg.members} == {"team-lead"} | {f"w{i}" for i in range(10)}
+        assert cfg.members[0].subscriptions == topics
+
+    def test_rejects_unknown_member_and_bad_topic(self, tmp_base_dir: Path) -> None:
+        create_team("subs-bad", "sess-1", base_dir=tmp_base_dir)
+        with pytest.raises(ValueError, match="not a member"):
+            subscribe_topic("subs-bad", "ghost", "t", base_dir=tmp_base_dir)
+        with pytest.raises(ValueError, match="Invalid topic"):
+            subscribe_topic("subs-bad", "team-lead", "bad topic", base_dir=tmp_base_dir)